@@ -0,0 +1,166 @@
+"""
+학생 답변 이벤트 기록 (SQLite WAL, 추가 전용)
+
+- "피드백 보기"를 누를 때마다 (카드 id, 분류, 시각, 익명 세션)을 남깁니다.
+  답변 원문은 저장하지 않습니다.
+- record()는 큐에 넣기만 하고 바로 돌아옵니다. 백그라운드 스레드가 모아서 한 트랜잭션으로 씁니다.
+- 카드별/분류별 누적 개수는 메모리와 DB에서 함께 갱신되므로, 통계를 볼 때 기록 전체를 다시 훑지 않습니다.
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+
+from resource_store import connect
+
+_LOGGER = logging.getLogger(__name__)
+
+ANSWER_LOG_PATH = Path("answer_log.db")
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5  # 초
+
+# 세션 id를 그대로 남기지 않도록 섞는 값 (설정하지 않으면 프로세스마다 새로 만듭니다)
+_SALT = os.environ.get("LESSON_LOG_SALT") or secrets.token_hex(16)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS answer_events (
+        id       INTEGER PRIMARY KEY AUTOINCREMENT,
+        card_id  TEXT NOT NULL,
+        category TEXT NOT NULL,
+        ts       REAL NOT NULL,
+        session  TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS answer_counts (
+        card_id  TEXT NOT NULL,
+        category TEXT NOT NULL,
+        n        INTEGER NOT NULL,
+        PRIMARY KEY (card_id, category)
+    )
+    """,
+)
+
+
+def anonymize_session(session_id: str) -> str:
+    return hashlib.sha256((_SALT + session_id).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class AnswerEvent:
+    card_id: str
+    category: str
+    ts: float
+    session: str
+
+
+class AnswerLog:
+    def __init__(self, path: Path = ANSWER_LOG_PATH, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = connect(self.path)
+        for stmt in _SCHEMA:
+            self._conn.execute(stmt)
+
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        for card_id, category, n in self._conn.execute("SELECT card_id, category, n FROM answer_counts"):
+            self._counts[(card_id, category)] = n
+
+        self._queue: "queue.Queue[Optional[AnswerEvent]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="answer-log-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # --- 기록 (화면 스레드에서 호출) ---
+    def record(self, card_id: str, category: str, session_id: str = "") -> None:
+        """이벤트를 큐에 넣고 메모리 누적값을 올립니다. 디스크 쓰기를 기다리지 않습니다."""
+        event = AnswerEvent(card_id, category, time.time(), anonymize_session(session_id) if session_id else "")
+        with self._lock:
+            self._counts[(card_id, category)] += 1
+        self._queue.put_nowait(event)
+
+    # --- 통계 (기록을 다시 훑지 않음) ---
+    def counts(self, card_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """{card_id: {category: n}}. card_id를 주면 그 카드만."""
+        result: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for (cid, category), n in self._counts.items():
+                if card_id is None or cid == card_id:
+                    result.setdefault(cid, {})[category] = n
+        return result
+
+    def rate(self, card_id: str, category: str) -> Tuple[int, int, float]:
+        """(해당 분류 수, 전체 수, 비율)"""
+        per_card = self.counts(card_id).get(card_id, {})
+        total = sum(per_card.values())
+        hits = per_card.get(category, 0)
+        return hits, total, (hits / total if total else 0.0)
+
+    # --- 백그라운드 쓰기 ---
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[AnswerEvent] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if item is None:
+                stopping = True
+            if batch:
+                try:
+                    self._write(batch)
+                except sqlite3.Error as e:
+                    _LOGGER.warning("답변 이벤트 %d건을 쓰지 못했습니다: %s", len(batch), e)
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self._queue.task_done()
+
+    def _write(self, batch: List[AnswerEvent]) -> None:
+        per_key = Counter((e.card_id, e.category) for e in batch)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "INSERT INTO answer_events (card_id, category, ts, session) VALUES (?, ?, ?, ?)",
+                [(e.card_id, e.category, e.ts, e.session) for e in batch],
+            )
+            self._conn.executemany(
+                "INSERT INTO answer_counts (card_id, category, n) VALUES (?, ?, ?) "
+                "ON CONFLICT (card_id, category) DO UPDATE SET n = n + excluded.n",
+                [(c, cat, n) for (c, cat), n in per_key.items()],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def flush(self) -> None:
+        """큐에 남은 이벤트가 모두 쓰일 때까지 기다립니다. (테스트/종료용)"""
+        self._queue.join()
+
+    def close(self) -> None:
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+        self._conn.close()
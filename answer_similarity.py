@@ -0,0 +1,122 @@
+"""
+학생 답변과 카드별 예상 답변(expected_answers)의 유사도 (문자 n-gram TF-IDF, NumPy)
+
+- 모든 카드의 예상 답변을 문자 2~3-gram으로 잘라 해시 공간(HASH_DIM)에 넣은 TF-IDF 행렬을
+  프로세스당 한 번 만듭니다. 행은 L2 정규화되어 있어서 내적이 곧 코사인 유사도입니다.
+- 답변 묶음은 (답변 수 × HASH_DIM) 행렬 하나로 만든 뒤 예상 답변 행렬과 한 번 곱해서 점수를 냅니다.
+  30명 답변이면 30 × N 번 비교하는 대신 행렬 곱 한 번입니다.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+import re
+import zlib
+
+import numpy as np
+
+from card_registry import CardRegistry
+from korean_text import normalize_korean
+
+HASH_DIM = 1 << 12  # 예상 답변 n-gram이 수백 개 수준이라 충돌이 거의 없습니다.
+NGRAM_RANGE = (2, 3)
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=65536)
+def _bucket(gram: str) -> int:
+    # 프로세스마다 값이 바뀌는 hash() 대신 crc32를 써서 작업 프로세스끼리도 같은 칸을 씁니다.
+    return zlib.crc32(gram.encode("utf-8")) % HASH_DIM
+
+
+def char_ngrams(text: str, ngram_range: Tuple[int, int] = NGRAM_RANGE) -> List[str]:
+    """정규화한 문장을 앞뒤 공백을 붙여 문자 n-gram으로 자릅니다."""
+    text = " " + _SPACES_RE.sub(" ", normalize_korean(text)).strip() + " "
+    lo, hi = ngram_range
+    return [text[i:i + n] for n in range(lo, hi + 1) for i in range(len(text) - n + 1)]
+
+
+@dataclass(frozen=True)
+class SimilarityMatch:
+    card_id: str
+    expected: str
+    score: float  # 코사인 유사도 0.0 ~ 1.0
+
+
+class ExpectedAnswerIndex:
+    """
+    카드별 예상 답변 TF-IDF 행렬.
+    matrix 의 행은 카드 순서대로 이어 붙인 예상 답변이고, spans[card_id] 가 그 카드의 행 범위입니다.
+    """
+
+    def __init__(self, registry: CardRegistry):
+        texts: List[str] = []
+        owners: List[int] = []
+        self.spans: Dict[str, Tuple[int, int]] = {}
+        self._card_ids: List[str] = []
+        for card in registry.cards:
+            start = len(texts)
+            texts.extend(card.expected_answers)
+            owners.extend([len(self._card_ids)] * len(card.expected_answers))
+            self.spans[card.id] = (start, len(texts))
+            self._card_ids.append(card.id)
+
+        self.expected: Tuple[str, ...] = tuple(texts)
+        self._owner = np.asarray(owners, dtype=np.int32)
+        self._card_pos = {card_id: i for i, card_id in enumerate(self._card_ids)}
+
+        counts = self._counts(texts)
+        df = np.count_nonzero(counts, axis=0)
+        # 예상 답변에 없던 n-gram도 가장 드문 것으로 보고 가중치를 줍니다. (답변 쪽 노름 계산용)
+        self.idf = (np.log((1 + len(texts)) / (1 + df)) + 1.0).astype(np.float32)
+        self.matrix = self._normalize(counts * self.idf)
+
+    # --- 벡터화 ---
+    @staticmethod
+    def _counts(texts: Sequence[str]) -> np.ndarray:
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, text in enumerate(texts):
+            grams = char_ngrams(text) if text else []
+            rows.extend([row] * len(grams))
+            cols.extend(_bucket(g) for g in grams)
+        flat = np.asarray(rows, dtype=np.intp) * HASH_DIM + np.asarray(cols, dtype=np.intp)
+        counts = np.bincount(flat, minlength=len(texts) * HASH_DIM).astype(np.float32)
+        return counts.reshape(len(texts), HASH_DIM)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def vectorize(self, answers: Sequence[str]) -> np.ndarray:
+        """답변 묶음을 (답변 수 × HASH_DIM) 정규화 TF-IDF 행렬로 만듭니다."""
+        return self._normalize(self._counts(answers) * self.idf)
+
+    # --- 점수 ---
+    def score_batch(self, answers: Sequence[str], card_ids: Sequence[str]) -> List[Optional[SimilarityMatch]]:
+        """
+        answers[i] 를 card_ids[i] 카드의 예상 답변과 비교해 가장 가까운 것을 돌려줍니다.
+        모든 답변 × 모든 예상 답변을 행렬 곱 한 번으로 계산한 뒤, 다른 카드 열은 가려서 고릅니다.
+        예상 답변이 없는 카드이거나 빈 답변이면 None.
+        """
+        if not self.expected:
+            return [None] * len(answers)
+        scores = self.vectorize(answers) @ self.matrix.T  # (답변 수, 예상 답변 수)
+        row_cards = np.asarray([self._card_pos.get(c, -1) for c in card_ids], dtype=np.int32)
+        masked = np.where(self._owner[None, :] == row_cards[:, None], scores, -1.0)
+        best = masked.argmax(axis=1)
+        best_scores = masked[np.arange(len(answers)), best]
+
+        results: List[Optional[SimilarityMatch]] = []
+        for answer, card_id, idx, score in zip(answers, card_ids, best.tolist(), best_scores.tolist()):
+            if score < 0 or not answer or not answer.strip():
+                results.append(None)
+            else:
+                results.append(SimilarityMatch(card_id, self.expected[idx], float(score)))
+        return results
+
+    def score(self, answer: str, card_id: str) -> Optional[SimilarityMatch]:
+        """답변 하나를 그 카드의 예상 답변과 비교합니다."""
+        return self.score_batch([answer], [card_id])[0]
@@ -1,459 +1,352 @@
-import streamlit as st
-from typing import Dict, List
-import json
-from pathlib import Path
-import re
-
-# -----------------------------
-# config.json 저장/불러오기
-# -----------------------------
-CONFIG_PATH = Path("config.json")
-
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import Future, TimeoutError as FutureTimeout, as_completed
+import copy
+import time
 
-def load_resource_urls() -> Dict:
-    """config.json에서 자료 URL 설정을 불러옵니다."""
-    if CONFIG_PATH.exists():
-        try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data.get("resource_urls", {}) or {}
-        except Exception:
-            return {}
-    return {}
-
-
-def save_resource_urls(resource_urls: Dict) -> None:
-    """자료 URL 설정을 config.json에 저장합니다."""
-    payload = {"resource_urls": resource_urls}
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+import streamlit as st
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import requests
+
+import profiling
+from answer_log import ANSWER_LOG_PATH, AnswerLog
+from card_registry import Card, CardRegistry, Resource
+from feedback_backend import SOURCE_RULES, make_feedback_backend
+from image_cache import IMAGE_CACHE_DIR, ImageCache
+from lesson_bundle import get_bundle
+from lesson_catalog import get_catalog
+from lesson_export import EXPORT_DIR, PDF_AVAILABLE, ExportRequest, LessonExporter, sniff_image_type
+from lesson_engine import (
+    CATEGORY_LABELS,
+    SUMMARY_CHECKLIST,
+    SUMMARY_MARKDOWN,
+    classify_answer,
+    load_resource_urls_snapshot,
+    reset_resource_urls,
+    resource_urls_version,
+    sanitize_url,
+    save_resource_urls,
+)
+from link_health import LinkHealthMonitor, collect_targets
+from live_classroom import LiveClassroom
+from profiling import span, timed
+from resource_loader import LOAD_TIMEOUT, LoadedImage, ResourceLoader
+from resource_store import merge_resource_urls
+from session_store import SESSION_DIR, SessionStore, changed_values, class_shard, new_token, token_shard
+from url_resolver import (
+    STRATEGY_IFRAME,
+    STRATEGY_IMAGE,
+    STRATEGY_VIDEO,
+    ResolvedResource,
+    resolve_url,
+)
 
 
 # -----------------------------
-# URL 유틸
+# 성능 측정 (LESSON_PROFILE=1)
 # -----------------------------
-def looks_like_placeholder(url: str) -> bool:
-    """예시 링크/placeholder를 감지합니다."""
-    if not url:
-        return True
-    u = url.strip().lower()
-    return ("example.com" in u) or (u in {"", "http://", "https://"})
+def _current_session_id() -> str:
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else ""
 
 
-def is_http_url(url: str) -> bool:
-    if not url:
-        return False
-    return bool(re.match(r"^https?://", url.strip(), flags=re.IGNORECASE))
+profiling.set_session_provider(_current_session_id)
 
 
 # -----------------------------
-# 유튜브 링크 정규화(Shorts/공유 링크 대응)
+# 세션 상태 초기화
 # -----------------------------
-def normalize_youtube_url(url: str) -> str:
-    """
-    Streamlit st.video에서 잘 재생되도록 유튜브 URL을 embed 형태로 변환합니다.
-    - https://www.youtube.com/shorts/VIDEO_ID
-    - https://youtu.be/VIDEO_ID
-    - https://www.youtube.com/watch?v=VIDEO_ID
-    등을 모두 지원
-    """
-    if not url:
-        return url
-
-    u = url.strip()
-
-    m = re.search(r"youtu\.be/([A-Za-z0-9_-]{6,})", u)
-    if m:
-        vid = m.group(1)
-        return f"https://www.youtube.com/embed/{vid}"
-
-    m = re.search(r"youtube\.com/shorts/([A-Za-z0-9_-]{6,})", u)
-    if m:
-        vid = m.group(1)
-        return f"https://www.youtube.com/embed/{vid}"
-
-    m = re.search(r"youtube\.com/watch\?v=([A-Za-z0-9_-]{6,})", u)
-    if m:
-        vid = m.group(1)
-        return f"https://www.youtube.com/embed/{vid}"
-
-    # 이미 embed면 그대로
-    return u
-
-
-def is_youtube_url(url: str) -> bool:
-    if not url:
-        return False
-    u = url.lower()
-    return ("youtube.com" in u) or ("youtu.be" in u)
-
-
-def sanitize_url(saved_url: str, default_url: str) -> str:
+def saved_resource_urls() -> Tuple[int, Dict]:
+    """(저장소 버전, 저장된 자료 URL). 묶음 모드면 묶음의 URL 위에 저장값을 덮어씁니다."""
+    version, saved = load_resource_urls_snapshot()
+    bundle = get_bundle()
+    if bundle is not None:
+        saved = {
+            card_id: {**bundle.resource_urls.get(card_id, {}), **saved.get(card_id, {})}
+            for card_id in {*bundle.resource_urls, *saved}
+        }
+    return version, saved
+
+
+def init_session_state() -> None:
+    if "resource_urls" not in st.session_state:
+        version, saved = saved_resource_urls()
+        st.session_state.resource_urls = saved
+        # 다른 선생님/다른 서버가 저장한 것을 알아채기 위한 기준값
+        st.session_state.resource_urls_base = copy.deepcopy(saved)
+        st.session_state.resource_urls_version = version
+
+    if st.session_state.get("selected_unit") not in get_catalog():
+        st.session_state.selected_unit = get_catalog().units[0].id
+        st.session_state.selected_card_index = 0
+
+    if "selected_card_index" not in st.session_state:
+        st.session_state.selected_card_index = 0
+    # 이어 하기로 복원한 번호가 지금 단원보다 크면 (단원 파일이 바뀐 경우) 처음 카드로
+    if st.session_state.selected_card_index >= len(get_cards()):
+        st.session_state.selected_card_index = 0
+
+
+def sync_resource_urls() -> None:
     """
-    - config.json에 placeholder(example.com)나 비정상 URL이 저장되어 있으면 기본값으로 복구
-    - 정상 URL이면 그대로 사용
+    저장소 버전이 바뀌었으면(다른 세션이나 다른 앱 프로세스가 저장) 새 URL을 이 세션에 반영합니다.
+    버전이 같으면 행 하나만 읽고 끝나고, 이 세션에서 고치고 아직 저장하지 않은 URL은 덮어쓰지 않습니다.
     """
-    # 저장된 값이 없거나 placeholder면 기본으로
-    if looks_like_placeholder(saved_url):
-        return default_url or ""
-
-    # http(s) 아니면 기본으로
-    if not is_http_url(saved_url):
-        return default_url or ""
-
-    return saved_url.strip()
+    if resource_urls_version() == st.session_state.resource_urls_version:
+        return
+    version, latest = saved_resource_urls()
+    merged, changed = merge_resource_urls(st.session_state.resource_urls_base, st.session_state.resource_urls, latest)
+    st.session_state.resource_urls = merged
+    st.session_state.resource_urls_base = latest
+    st.session_state.resource_urls_version = version
+    # 입력 칸은 위젯 상태를 지우면 다음에 그릴 때 새 URL로 다시 채워집니다.
+    for card_id, res in changed.items():
+        for res_id in res:
+            st.session_state.pop(f"url_{card_id}_{res_id}", None)
 
 
 # -----------------------------
-# 발문 카드 데이터
+# 이어 하기 (새로 고침/서버 재시작 후에도 답, 카드, 체크리스트 유지)
 # -----------------------------
-def get_default_cards() -> List[Dict]:
-    """수업에서 사용할 발문 카드를 정의합니다."""
-    return [
-        {
-            "id": "obs_sun_appearance",
-            "stage": "생각해보기",
-            "label": "계절 변화의 까닭",
-            "question": "계절의 변화가 생기는 까닭은 무엇일까요?",
-            "expected_answers": [
-                "여름에는 태양이 더 높이 떠 있고, 겨울에는 낮게 떠요.",
-                "여름에는 햇빛이 강하고 눈이 부시고, 겨울에는 햇빛이 약하게 느껴져요.",
-                "여름에는 하늘 가운데 쪽에서 비추고, 겨울에는 옆쪽에서 비추는 느낌이에요.",
-            ],
-            "feedback_rules": {},
-            "resources": [
-                {
-                    "id": "axis_tilt",
-                    "title": "지구 자전축 23.5도 기울기 그림",
-                    "type": "image",
-                    "default_url": "https://blog.kakaocdn.net/dna/doM62b/btsJXYwTxbx/AAAAAAAAAAAAAAAAAAAAACkh66jHRVAuJuZUNXWiTpgXEoHXXbJvF-B--_urBXeo/img.webp?credential=yqXZFxpELC7KVnFOS48ylbz2pIh7yKj8&expires=1767193199&allow_ip=&allow_referer=&signature=HZ%2FEJBS2ZsxegP4O5C%2BUWi8coXg%3D",
-                    "description": "지구가 자전축이 기울어진 채로 태양 주위를 도는 모습을 보여 주는 그림입니다.",
-                },
-                {
-                    "id": "sun_height",
-                    "title": "여름/겨울 태양 높이 비교 그림",
-                    "type": "image",
-                    "default_url": "https://www.home-learn.co.kr/common/image.do?imgPath=newsroom&imgName=CK20230202092852423.png&imgGubun=D",
-                    "description": "같은 장소에서 여름과 겨울에 태양이 어느 높이까지 올라가는지 비교한 그림입니다.",
-                },
-            ],
-            "teacher_notes": {
-                "extra_questions": [
-                    "여름과 겨울에 그림자 길이도 함께 떠올려 보면 어떤 차이가 있을까요?",
-                    "태양이 뜨고 지는 위치도 계절마다 달라지는지 이야기해 볼까요?",
-                ],
-                "teacher_point": "학생들의 말 속에서 '태양 높이', '햇빛의 느낌', '그림자 길이' 같은 표현을 끌어내어, 나중에 태양 고도 개념으로 연결할 준비를 합니다.",
-            },
-        },
-        {
-            "id": "obs_shadow_length",
-            "stage": "관찰",
-            "label": "그림자 길이",
-            "question": "여름과 겨울에 같은 시간에 서 있으면, 그림자 길이는 어떻게 달라질까요?",
-            "expected_answers": [
-                "여름에는 그림자가 짧고, 겨울에는 그림자가 길어요.",
-                "겨울에는 해가 낮게 있어서 그림자가 훨씬 길어져요.",
-                "계절이 바뀔 때마다 놀이터에서 생기는 그림자 길이도 조금씩 달라져요.",
-            ],
-            "feedback_rules": {},
-            "resources": [
-                {
-                    "id": "shadow_compare",
-                    "title": "여름/겨울 그림자 길이 비교 사진",
-                    "type": "image",
-                    "default_url": "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcRNZU4uiSOMiiRvWfPsNhQoPCLbDg2PR-8NQg&s",
-                    "description": "같은 시간에 찍은 여름과 겨울의 그림자 길이를 비교한 사진입니다.",
-                }
-            ],
-            "teacher_notes": {
-                "extra_questions": [
-                    "그림자가 길다는 것은 태양이 하늘에서 어느 쪽에 있다는 뜻일까요?",
-                    "그림자 길이와 태양 높이는 어떤 관계가 있을지 스스로 말해 보게 해 주세요.",
-                ],
-                "teacher_point": "그림자 길이 경험을 통해 태양 고도가 낮을수록 그림자가 길어진다는 직관을 쌓게 합니다.",
-            },
-        },
-        {
-            "id": "obs_day_length",
-            "stage": "관찰",
-            "label": "낮의 길이",
-            "question": "낮의 길이는 계절에 따라 어떻게 달라질까요?",
-            "expected_answers": [
-                "여름에는 낮이 길고 밤이 짧아요.",
-                "겨울에는 낮이 짧고 밤이 길어요.",
-                "봄과 가을은 여름과 겨울의 중간 정도 길이라고 느껴져요.",
-            ],
-            "feedback_rules": {},
-            "resources": [
-                {
-                    "id": "daylength_chart",
-                    "title": "계절에 따른 낮 길이 변화 그래프",
-                    "type": "image",
-                    "default_url": "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcTHNbhrKiUFY1Q82K_M1_SBajnuuaS-tRaN1A&s",
-                    "description": "계절에 따라 낮 시간이 어떻게 길어졌다가 짧아지는지 보여 주는 그래프입니다.",
-                }
-            ],
-            "teacher_notes": {
-                "extra_questions": [
-                    "학생들이 실제로 느끼는 '해가 빨리 진다/늦게 진다' 경험을 떠올리게 해 주세요.",
-                    "하루 동안 태양이 떠 있는 시간이 길어지면 기온에는 어떤 영향을 줄지 함께 이야기해 보세요.",
-                ],
-                "teacher_point": "낮과 밤의 길이 변화를 자전축 기울기와 공전과 연결하기 위한 기초 경험을 확인합니다.",
-            },
-        },
-        {
-            "id": "reason_sunlight",
-            "stage": "생각해보기",
-            "label": "햇빛이 더 강하게 느껴지는 까닭",
-            "question": "왜 여름에는 햇빛이 더 강하게 느껴질까요?",
-            "expected_answers": [
-                "여름에는 태양이 높이 떠 있어서 햇빛이 더 세게 내려와요.",
-                "햇빛이 더 위에서 바로 내려와서 같은 곳에 더 많이 모여요.",
-                "여름에는 태양빛이 거의 바로 내려와서 그림자도 짧게 보여요.",
-            ],
-            "feedback_rules": {},
-            "resources": [
-                {
-                    "id": "angle_energy",
-                    "title": "수직/비스듬한 햇빛과 에너지 분포 그림",
-                    "type": "image",
-                    "default_url": "https://mblogthumb-phinf.pstatic.net/20121024_208/msy879_1351057881359nbj8s_JPEG/%C0%A7%B5%B5%BA%B0_%C5%C2%BE%E7%BA%B9%BB%E7%BF%A1%B3%CA%C1%F6.jpg?type=w420",
-                    "description": "같은 양의 햇빛이 수직으로 들어올 때와 비스듬히 들어올 때, 단위 면적에 도달하는 에너지 차이를 보여 주는 그림입니다.",
-                }
-            ],
-            "teacher_notes": {
-                "extra_questions": [
-                    "손전등을 책상에 비출 때, 바로 위에서 비출 때와 비스듬히 비출 때의 밝기는 어떻게 다른가요?",
-                    "같은 양의 빛이 더 작은 곳에 모이면 어떻게 느껴질지 학생이 말해 보게 해 주세요.",
-                ],
-                "teacher_point": "빛의 입사각과 단위 면적당 에너지 양을 연결하여, 단순히 '여름이니까 뜨겁다'가 아니라 '빛의 각도'로 사고하게 돕습니다.",
-            },
-        },
-        {
-            "id": "reason_oblique",
-            "stage": "생각해보기",
-            "label": "비스듬한 햇빛",
-            "question": "햇빛이 비스듬히 들어오면 어떤 일이 생길까요?",
-            "expected_answers": [
-                "빛이 넓게 퍼져서 한 곳에 도달하는 양이 줄어들 것 같아요.",
-                "같은 양의 빛이라도 비스듬히 들어오면 덜 뜨겁게 느껴질 거예요.",
-                "그림자가 길어지고, 땅이 덜 데워질 것 같다고 느껴요.",
-            ],
-            "feedback_rules": {},
-            "resources": [
-                {
-                    "id": "flashlight_demo",
-                    "title": "손전등 비스듬히 비추기 실험(자료 링크)",
-                    "type": "image",
-                    "default_url": "https://cloudfront-ap-northeast-1.images.arcpublishing.com/chosun/MUXVC2EQKDKWZF7FIZCP36AWGY.jpg",
-                    "description": "손전등을 수직/비스듬히 비출 때 빛이 퍼지는 모습을 비교하는 자료입니다.",
-                }
-            ],
-            "teacher_notes": {
-                "extra_questions": [
-                    "종이에 손전등을 수직/비스듬히 비춰 보면서 밝기 차이를 실제로 관찰해 보게 하세요.",
-                    "이 실험 결과를 계절이 바뀌는 이유와 어떻게 연결할 수 있을지 학생에게 먼저 말해 보게 해 주세요.",
-                ],
-                "teacher_point": "‘빛이 퍼지면 힘이 약해진다’는 직관을 만들도록 돕습니다.",
-            },
-        },
-        {
-            "id": "misconception_distance",
-            "stage": "더 생각해보기",
-            "label": "거리 오개념 확인",
-            "question": "계절은 지구가 태양에 가까워져서 또는 멀어져서 생긴다고 말해도 될까요?",
-            "expected_answers": [
-                "가까워서 덥고, 멀어서 추운 거라고 생각했어요.",
-                "조금은 거리도 관계가 있을 것 같은데, 그것만으로는 설명이 안 되는 것 같아요.",
-            ],
-            "feedback_rules": {},
-            "resources": [
-                {
-                    "id": "orbit_shape",
-                    "title": "지구 공전 궤도와 거리 변화 그림",
-                    "type": "image",
-                    "default_url": "https://flexible.img.hani.co.kr/flexible/normal/800/453/imgdb/original/2025/0104/20250104500223.jpg",
-                    "description": "지구가 타원 궤도로 돌지만, 거리 차이는 계절을 설명하기엔 크지 않다는 점을 보여 주는 자료입니다.",
-                }
-            ],
-            "teacher_notes": {
-                "extra_questions": [
-                    "만약 거리가 정말 크게 달라진다면, 봄과 가을의 온도는 어떻게 되어야 할까요?",
-                    "우리나라가 겨울일 때, 지구의 다른 지역은 어떤 계절인지 함께 생각해 보게 해 주세요.",
-                ],
-                "teacher_point": "거리 오개념을 바로 ‘틀렸다’고 말하기보다, 거리만으로는 설명이 어려운 사례를 떠올리게 합니다.",
-            },
-        },
-        {
-            "id": "elab_tilt",
-            "stage": "더 생각해보기",
-            "label": "자전축 기울기 의미",
-            "question": "‘지구의 자전축이 기울어져 있다’는 말은 어떤 뜻일까요?",
-            "expected_answers": [
-                "지구가 세워져서 도는 게 아니라 약간 기울어진 채로 돌고 있어요.",
-                "연필을 약간 비스듬히 세워서 돌리는 것처럼, 지구도 기울어진 채로 태양 주위를 돌아요.",
-            ],
-            "feedback_rules": {},
-            "resources": [
-                {
-                    "id": "tilt_demo",
-                    "title": "자전축 기울기 모형 영상(유튜브)",
-                    "type": "video",
-                    "default_url": "https://www.youtube.com/shorts/WOEU2LEl5ug?feature=share",
-                    "description": "자전축이 기울어진 지구본을 활용한 간단한 설명 영상입니다.",
-                }
-            ],
-            "teacher_notes": {
-                "extra_questions": [
-                    "자전축이 기울어진 채로 태양 주위를 돈다면, 어느 쪽 반구가 더 햇빛을 많이 받을까요?",
-                    "기울기가 없다면 계절은 어떻게 될지 상상해 보게 해 주세요.",
-                ],
-                "teacher_point": "‘기울어짐’과 ‘공전’을 함께 언급하여, 자전축 기울기가 계절과 어떻게 연결되는지 정교화합니다.",
-            },
-        },
-        {
-            "id": "summary_sentence",
-            "stage": "정리",
-            "label": "한 문장으로 계절 설명",
-            "question": "계절이 생기는 까닭을 한 문장으로 말해 볼까요?",
-            "expected_answers": [
-                "지구의 자전축이 기울어진 채로 태양 주위를 공전하기 때문에 계절이 생겨요.",
-                "지구가 기울어진 채로 도는 동안 태양빛이 비추는 각도와 낮의 길이가 달라져서 계절이 생겨요.",
-            ],
-            "feedback_rules": {},
-            "resources": [
-                {
-                    "id": "summary_card",
-                    "title": "계절 개념 한 장 정리 카드(이미지)",
-                    "type": "image",
-                    "default_url": "https://www.home-learn.co.kr/common/image.do?imgPath=newsroom&imgName=CK20230202093400748.png&imgGubun=D",
-                    "description": "수업 최종 정리용 계절 개념 요약 이미지입니다.",
-                }
-            ],
-            "teacher_notes": {
-                "extra_questions": [
-                    "방금 말해 준 문장에서 꼭 들어가야 한다고 생각하는 단어를 밑줄 그어 볼까요? (예: 자전축, 기울기, 공전)",
-                    "친구에게 설명하듯이, 조금 더 쉽게 풀어서 다시 말해 볼 수 있을까요?",
-                ],
-                "teacher_point": "학생이 만든 문장을 존중하고, 빠진 핵심어(자전축, 기울기, 공전, 태양빛 각도)를 하나씩 보완해 줍니다.",
-            },
-        },
-    ]
+RESUME_PARAM = "s"
+RESUME_KEYS = ("selected_unit", "selected_card_index", "live_role", "live_code", "live_name")
+
+
+@st.cache_resource
+def get_session_store() -> SessionStore:
+    """이어 하기 저장소. 쓰기는 모든 세션을 합쳐 백그라운드 스레드 하나가 모아서 합니다."""
+    return SessionStore(SESSION_DIR)
+
+
+def resumable_values() -> Dict:
+    """저장할 세션 값: 카드 위치, 실시간 수업 설정, 카드별 답(answer_*), 체크리스트(chk_*)."""
+    return {
+        key: value for key, value in st.session_state.items()
+        if key in RESUME_KEYS or key.startswith("chk_") or (key.startswith("answer_") and isinstance(value, str))
+    }
+
+
+def resume_session() -> None:
+    """세션의 첫 실행에서만: 주소의 토큰으로 저장값을 한 번 읽어 오고, 토큰이 없으면 새로 만듭니다."""
+    if "resume_token" in st.session_state:
+        return
+    token = st.query_params.get(RESUME_PARAM, "")
+    if token_shard(token) is None:
+        token = new_token()
+    values = get_session_store().load(token)
+    for key, value in values.items():
+        if key in RESUME_KEYS or key.startswith(("answer_", "chk_")):
+            st.session_state[key] = value
+    st.session_state.resume_token = token
+    st.session_state.resume_saved = values
+    st.query_params[RESUME_PARAM] = token
+
+
+def persist_session() -> None:
+    """지난번 이후 바뀐 값만 저장소에 넘깁니다. (디스크 쓰기는 기다리지 않음)"""
+    store = get_session_store()
+    token = st.session_state.resume_token
+    last = st.session_state.resume_saved
+    current = resumable_values()
+    delta = changed_values(last, current)
+    code = current.get("live_code", "")
+    if token_shard(token) != class_shard(code):
+        # 수업 코드가 바뀌면 그 반 조각의 새 토큰으로 전부 옮깁니다.
+        store.forget(token)
+        token = new_token(code)
+        st.session_state.resume_token = token
+        st.query_params[RESUME_PARAM] = token
+        delta = {**last, **current}
+    store.save(token, delta)
+    st.session_state.resume_saved = {**last, **current}
+
+
+def get_cards() -> CardRegistry:
+    """지금 고른 단원의 카드 색인 (이전/다음은 이 단원 안에서만 움직입니다)"""
+    return get_catalog().unit(st.session_state.selected_unit)
+
+
+def select_card(unit_id: str, index: int) -> None:
+    st.session_state.selected_unit = unit_id
+    st.session_state.selected_card_index = index
+    # 사이드바 목록은 새 카드가 있는 쪽으로 다시 맞춥니다.
+    st.session_state.catalog_page = None
+
+
+@timed("get_resource_url")
+def get_resource_url(card_id: str, res: Resource) -> str:
+    card_urls = st.session_state.resource_urls.setdefault(card_id, {})
+    saved = card_urls.get(res.id, "")
+    default_url = res.default_url
+    # 저장값이 placeholder/비정상이면 기본값으로 자동 복구
+    url = sanitize_url(saved, default_url)
+    return url
 
 
-# -----------------------------
-# 피드백 규칙 엔진
-# -----------------------------
-def classify_answer(answer: str) -> str:
-    """학생 답변을 간단한 키워드 기반으로 분류합니다."""
-    if not answer or not answer.strip():
-        return "empty"
+def set_resource_url(card_id: str, res_id: str, url: str) -> None:
+    card_urls = st.session_state.resource_urls.setdefault(card_id, {})
+    card_urls[res_id] = url
 
-    text = answer.replace(" ", "").lower()
 
-    distance_keywords = ["거리", "가까워", "가까워서", "멀어", "멀어서", "distance"]
-    tilt_keywords = ["자전축", "기울", "23.5", "23도", "축이기울어", "axis", "tilt"]
-    angle_keywords = ["각도", "비스듬", "수직", "남중고도", "태양고도", "높이"]
-    daylength_keywords = ["낮이", "밤이", "낮길이", "밤길이", "낮과밤", "해가길게", "해가짧게"]
+@st.cache_resource
+def get_image_cache() -> ImageCache:
+    """자료 이미지 디스크 캐시. 모든 세션이 함께 씁니다."""
+    return ImageCache(IMAGE_CACHE_DIR)
 
-    if any(k in text for k in distance_keywords):
-        return "distance"
-    if any(k in text for k in tilt_keywords):
-        return "tilt"
-    if any(k in text for k in angle_keywords):
-        return "angle"
-    if any(k in text for k in daylength_keywords):
-        return "daylength"
 
-    return "other"
+@st.cache_resource
+def get_resource_loader() -> ResourceLoader:
+    """추가 자료 이미지를 받는 작업 스레드 묶음 (스레드 수 제한). 모든 세션이 함께 씁니다."""
+    return ResourceLoader(get_image_cache(), get_bundle())
 
 
-def build_feedback(answer: str, card: Dict) -> str:
+def render_image(slot, loaded: LoadedImage) -> None:
     """
-    규칙 기반으로 피드백 문단을 생성합니다.
+    받아 둔 WebP 썸네일을 보여 줍니다. 서버에서 받지 못했으면 원격 URL을 그대로 넘기고,
+    받았지만 이미지가 아니면(SVG/HTML 등) 링크만 보여 줍니다.
     """
-    category = classify_answer(answer)
-
-    if answer and answer.strip():
-        head = f"“{answer}”라고 생각해 주신 점이 정말 좋습니다. 스스로 계절이 생기는 까닭을 고민해 본 것만으로도 큰 배움이에요."
+    if loaded.link_only:
+        slot.markdown(f"🔗 미리 보기를 만들 수 없는 자료입니다. [자료 열기]({loaded.url})")
     else:
-        head = "아직 생각을 적지 않았네요. 떠오르는 생각을 편하게 한 문장이라도 적어 보면 좋겠습니다."
+        slot.image(loaded.data if loaded.data is not None else loaded.url, use_container_width=True)
 
-    lines: List[str] = [head]
 
-    if category == "distance":
-        lines.append("태양과 지구 사이의 거리를 떠올린 것은 아주 자연스러운 생각이에요.")
-        lines.append("하지만 실제로는 지구가 1년 동안 태양을 도는 동안 **거리 차이는 그리 크지 않아서**, 여름과 겨울처럼 큰 온도 차이를 만들 만큼의 이유가 되지는 않습니다.")
-        lines.append("더 중요한 까닭은 **자전축이 기울어진 채로 공전**하면서 태양빛의 각도와 낮의 길이가 달라지기 때문이에요.")
-        lines.append("만약 거리가 계절의 주된 이유라면, 지구가 태양에서 가장 멀어질 때 우리나라에는 어떤 계절이 와야 할까요?")
+ImageSlots = Dict[Future, List[Tuple[object, ResolvedResource]]]
 
-    elif category == "tilt":
-        lines.append("자전축이 기울어져 있다는 말을 해 주신 것은 아주 중요한 핵심을 잘 짚은 거예요.")
-        lines.append("자전축이 약 23.5도 기울어진 채로 **태양 주위를 공전**하기 때문에, 계절마다 햇빛이 들어오는 각도와 낮의 길이가 달라집니다.")
-        lines.append("그래서 여름과 겨울 같은 계절 차이가 나타나게 돼요.")
-        lines.append("‘자전축 기울기’와 ‘공전’을 넣어서 한 문장으로 다시 말해 볼 수 있을까요?")
 
-    elif category == "angle":
-        lines.append("햇빛이 **수직에 가깝게** 혹은 **비스듬히** 들어온다는 점을 떠올린 것은 과학적으로 매우 예리한 관찰이에요.")
-        lines.append("같은 양의 햇빛이라도 수직에 가깝게 들어오면 **작은 면적에 에너지가 모여서** 더 뜨겁게 느껴지고, 비스듬히 들어오면 **넓은 면적에 퍼져서** 약하게 느껴집니다.")
-        lines.append("즉, 빛이 비스듬히 들어올수록 단위 면적당 받는 에너지가 줄어드는 셈이에요.")
-        lines.append("그렇다면 겨울에는 왜 여름보다 햇빛이 덜 강하게 느껴지는지, ‘각도’라는 말을 넣어서 다시 말해 볼까요?")
-
-    elif category == "daylength":
-        lines.append("낮의 길이와 밤의 길이를 떠올린 것은 계절을 이해하는 데 아주 중요한 관찰이에요.")
-        lines.append("자전축이 기울어진 채로 공전하면서, 어떤 때에는 우리나라가 태양을 더 오래 바라보게 되어 **낮이 길어지고**, 어떤 때에는 **밤이 길어지게** 됩니다.")
-        lines.append("낮이 길어질수록 더 따뜻하게, 낮이 짧아질수록 더 선선하게 느껴질 수 있어요.")
-        lines.append("‘낮 길이 변화’ + ‘자전축 기울기/공전’을 넣어서 한 문장으로 정리해 볼까요?")
-
-    elif category == "other":
-        lines.append("지금 적어 주신 생각 속에도 중요한 단서가 있어요. 다만 아직은 조금 막연할 수 있습니다.")
-        lines.append("**태양의 높이**, **햇빛이 비추는 각도**, **낮과 밤의 길이** 중에서 무엇과 가장 관련이 있을지 하나를 골라서 다시 설명해 보면 좋아요.")
-        lines.append("“어떤 계절에는 태양이 어떻게 보이고, 그래서 무엇이 달라진다”처럼 문장을 한 번 더 만들어 볼까요?")
-
-    else:  # empty
-        lines.append("떠오르는 단어 두세 개만 적어 보는 것도 좋은 시작입니다.")
-        lines.append("예를 들어 ‘태양빛의 각도’, ‘자전축 기울기’, ‘낮의 길이’처럼 계절과 관련이 있을 것 같은 말을 하나 골라 적어 보세요.")
-        lines.append("이 중에서 어떤 단어가 계절과 가장 깊은 관련이 있을지 다음 차례에 말로 설명해 볼 수 있을까요?")
-
-    return "\n\n".join(lines)
+def prefetch_neighbors(card: Card) -> None:
+    """
+    카드가 바뀌었을 때만: 앞뒤 카드 자료의 URL 해석, 링크 점검, 이미지 썸네일을 미리 해 둡니다.
+    이전 카드를 위해 걸어 두고 아직 시작하지 않은 미리 받기는 취소합니다. (빠르게 넘길 때)
+    """
+    if st.session_state.get("prefetched_for") == card.id:
+        return
+    st.session_state.prefetched_for = card.id
+    loader = get_resource_loader()
+    loader.cancel(st.session_state.get("prefetch_futures", ()))
 
+    cards = get_cards()
+    index = cards.index_of(card.id)
+    neighbor_ids = dict.fromkeys(cards[(index + step) % len(cards)].id for step in (1, -1))
+    urls, images = [], []
+    for card_id in neighbor_ids:
+        if card_id == card.id:
+            continue
+        for res in cards.get(card_id).resources:
+            url = get_resource_url(card_id, res)
+            if not url:
+                continue
+            urls.append(url)
+            resolved = resolve_url(url, res.type)
+            if resolved.strategy == STRATEGY_IMAGE:
+                images.append(resolved.url)
+    get_link_monitor().request(urls)
+    st.session_state.prefetch_futures = loader.prefetch(images)
+
+
+def image_slot(slots: ImageSlots, resolved: ResolvedResource) -> None:
+    """자리만 먼저 그려 두고 썸네일 받기를 작업 스레드에 맡깁니다."""
+    slot = st.empty()
+    slot.caption("⏳ 자료를 불러오는 중...")
+    slots.setdefault(get_resource_loader().submit_image(resolved.url), []).append((slot, resolved))
+
+
+def fill_image_slots(slots: ImageSlots, timeout: float = LOAD_TIMEOUT) -> None:
+    """끝나는 순서대로 자리를 채웁니다. 시간 안에 받지 못한 자리는 링크로 바꿉니다."""
+    try:
+        for future in as_completed(list(slots), timeout=timeout):
+            waiting = slots.pop(future)
+            try:
+                loaded = future.result()
+            except Exception as e:  # 예상 못 한 실패도 조각 전체를 죽이지 않고 원격 URL로
+                loaded = LoadedImage(waiting[0][1].url, None, str(e))
+            for slot, _ in waiting:
+                render_image(slot, loaded)
+    except FutureTimeout:
+        for waiting in slots.values():
+            for slot, resolved in waiting:
+                slot.markdown(f"⏱️ 자료 서버가 늦게 응답합니다. [자료 열기]({resolved.source_url})")
+
+
+@st.cache_resource
+def get_exporter() -> LessonExporter:
+    """인쇄용 내보내기 (내용 해시별 파일 캐시 + 작업 스레드). 모든 세션이 함께 씁니다."""
+    images = get_image_cache()
+    bundle = get_bundle()
+
+    def load_image(url: str) -> Optional[Tuple[bytes, str]]:
+        thumb = bundle.thumbnail(url) if bundle is not None else None
+        if thumb is not None:
+            return bytes(thumb), "image/webp"
+        try:
+            data = images.thumbnail(url)
+        except (requests.RequestException, ValueError, OSError):
+            return None
+        if data is None:
+            return None
+        mime = sniff_image_type(data)
+        return (data, mime) if mime else None
 
-# -----------------------------
-# 세션 상태 초기화
-# -----------------------------
-if "cards" not in st.session_state:
-    st.session_state.cards = get_default_cards()
+    return LessonExporter(EXPORT_DIR, load_image=load_image)
 
-if "resource_urls" not in st.session_state:
-    st.session_state.resource_urls = load_resource_urls()
 
-if "selected_card_index" not in st.session_state:
-    st.session_state.selected_card_index = 0
+@st.cache_resource
+def get_answer_log() -> AnswerLog:
+    """답변 이벤트 기록. 모든 세션이 함께 씁니다."""
+    return AnswerLog(ANSWER_LOG_PATH)
 
 
-def get_cards() -> List[Dict]:
-    return st.session_state.cards
+@st.cache_resource
+def get_feedback_backend():
+    """피드백 백엔드(규칙/LLM). LLM 연결 풀과 응답 캐시를 모든 세션이 함께 씁니다."""
+    return make_feedback_backend()
 
 
-def get_resource_url(card_id: str, res: Dict) -> str:
-    card_urls = st.session_state.resource_urls.setdefault(card_id, {})
-    saved = card_urls.get(res["id"], "")
-    default_url = res.get("default_url", "")
-    # 저장값이 placeholder/비정상이면 기본값으로 자동 복구
-    url = sanitize_url(saved, default_url)
-    return url
+@st.cache_resource
+def get_link_monitor() -> LinkHealthMonitor:
+    """자료 링크 점검 결과(TTL 캐시). 모든 세션이 함께 씁니다."""
+    return LinkHealthMonitor()
 
 
-def set_resource_url(card_id: str, res_id: str, url: str) -> None:
-    card_urls = st.session_state.resource_urls.setdefault(card_id, {})
-    card_urls[res_id] = url
+def link_health_caption(monitor: LinkHealthMonitor, url: str) -> str:
+    if not url:
+        return ""
+    result = monitor.get(url)
+    if result is None:
+        monitor.request([url])
+        return "⏳ 링크 점검 중..."
+    if result.ok:
+        return f"{result.badge} 링크 정상 (HTTP {result.status}, {result.elapsed_ms:.0f}ms)"
+    return f"{result.badge} 링크 확인 필요 ({result.error or f'HTTP {result.status}'})"
+
+
+RESOURCE_IFRAME_HEIGHT = 420
+
+
+def render_resource(resolved: ResolvedResource) -> None:
+    """해석된 자료를 render 전략에 맞게 보여 줍니다."""
+    if resolved.strategy == STRATEGY_VIDEO:
+        bundle = get_bundle()
+        media = bundle.original(resolved.url) if bundle is not None else None
+        if media is not None:
+            data, content_type = media
+            st.video(bytes(data), format=content_type or "video/mp4", start_time=resolved.start)
+        else:
+            st.video(resolved.url, start_time=resolved.start)
+    elif resolved.strategy == STRATEGY_IMAGE:
+        slots: ImageSlots = {}
+        image_slot(slots, resolved)
+        fill_image_slots(slots)
+    elif resolved.strategy == STRATEGY_IFRAME:
+        components.iframe(resolved.url, height=RESOURCE_IFRAME_HEIGHT)
+    else:
+        st.markdown(f"[자료 열기]({resolved.source_url})")
 
 
 # -----------------------------
 # UI 스타일 (버튼 한 줄/줄바꿈 방지/동일 간격)
 # -----------------------------
-st.markdown(
-    """
+APP_CSS = """
 <style>
 /* 버튼 텍스트 줄바꿈 방지 + 동일 폭 느낌 */
 div.stButton > button {
@@ -467,167 +360,563 @@ div.stButton > button {
 /* 탭/본문 여백 약간 정돈 */
 .block-container { padding-top: 2.0rem; }
 </style>
-""",
-    unsafe_allow_html=True,
-)
+"""
 
 # -----------------------------
-# 레이아웃: 사이드바
+# 화면 조각 (st.fragment)
+# - 조각 안의 위젯을 누르면 그 조각만 다시 실행됩니다.
+# - 카드가 바뀌는 경우(이전/다음, 카드 선택)에만 전체 화면을 다시 그립니다.
 # -----------------------------
-with st.sidebar:
-    st.header("⚙️ 수업 설정")
-
-    cards = get_cards()
-    labels = [f"[{c['stage']}] {c['label']}" for c in cards]
-
-    selected_index = st.selectbox(
-        "사용할 발문 카드를 선택하세요.",
-        options=list(range(len(labels))),
-        format_func=lambda i: labels[i],
-        index=st.session_state.selected_card_index,
-    )
-    st.session_state.selected_card_index = selected_index
-    current_card = cards[selected_index]
-
-    st.markdown("---")
+@st.fragment
+@timed("ui.resource_settings")
+def resource_settings_panel(card: Card) -> None:
+    """사이드바: 자료 링크 설정"""
     st.subheader("📎 자료 링크 설정")
     st.caption("학교에서 사용 가능한 이미지/영상 URL로 바꾸어 사용하실 수 있습니다.")
+    sync_resource_urls()
+
+    # 전체 자료 링크 점검은 백그라운드에서만 돌고, 화면은 기다리지 않습니다.
+    monitor = get_link_monitor()
+    monitor.request(t.url for t in collect_targets(get_cards(), get_resource_url))
 
-    for res in current_card.get("resources", []):
-        current_url = get_resource_url(current_card["id"], res)
+    for res in card.resources:
+        current_url = get_resource_url(card.id, res)
         new_url = st.text_input(
-            f"{res['title']} URL",
+            f"{res.title} URL",
             value=current_url,
-            key=f"url_{current_card['id']}_{res['id']}",
+            key=f"url_{card.id}_{res.id}",
         )
-        set_resource_url(current_card["id"], res["id"], new_url)
+        # 고친 칸만 세션에 적어 둡니다. (그대로인 칸은 다른 곳에서 저장한 새 URL을 받을 수 있게)
+        if new_url != current_url:
+            set_resource_url(card.id, res.id, new_url)
+        st.caption(link_health_caption(monitor, get_resource_url(card.id, res)))
 
     st.markdown("---")
     col_a, col_b = st.columns(2)
     with col_a:
         if st.button("💾 저장", use_container_width=True):
-            save_resource_urls(st.session_state.resource_urls)
-            st.success("저장되었습니다! (config.json)")
+            saved = save_resource_urls(st.session_state.resource_urls)
+            st.success(f"저장되었습니다! (변경 {saved}건)")
     with col_b:
         if st.button("🧹 초기화", use_container_width=True):
             st.session_state.resource_urls = {}
-            save_resource_urls(st.session_state.resource_urls)
+            reset_resource_urls()
             st.warning("초기화되었습니다. 기본 URL로 다시 시작합니다.")
 
     st.caption("※ 저장 후 새로고침해도 유지됩니다.")
 
 
-# -----------------------------
-# 메인 레이아웃
-# -----------------------------
-st.title("🌍 지구, 태양 주위를 떠도는 여정")
-st.markdown("---")
-
-tab_lesson, tab_summary = st.tabs(["발문 카드 활용", "한 장 정리"])
-
-
-# -----------------------------
-# 탭 1: 발문 카드 활용
-# -----------------------------
-with tab_lesson:
+@st.fragment
+@timed("ui.lesson_card")
+def lesson_card_panel(card: Card) -> None:
+    """탭 1: 발문, 학생 답 입력, 버튼 4개"""
     cards = get_cards()
-    current_index = st.session_state.selected_card_index
-    card = cards[current_index]
+    current_index = cards.index_of(card.id)
 
-    st.markdown(f"#### 단계: {card['stage']}")
-    st.markdown(f"**{card['question']}**")
+    st.markdown(f"#### 단계: {card.stage}")
+    st.markdown(f"**{card.question}**")
 
     st.markdown("##### 학생 답 입력")
     # ✅ 라벨 문구 제거(요청하신 문장 완전 삭제)
     answer = st.text_area(
         label="",
-        key=f"answer_{card['id']}",
+        key=f"answer_{card.id}",
         height=110,
         placeholder="예) 여름에는 태양이 가까워져서 더워지고, 겨울에는 멀어져서 추워진 것 같아요.",
     )
+    # 수업 코드가 바뀌었으면 persist_session()이 이어 하기 토큰을 먼저 옮기므로, 그 뒤에 올립니다.
+    persist_session()
+    publish_live_answer(card, answer)
 
     # ✅ 버튼 4개: 이전 → 피드백 → 추가자료 → 다음 (동일 간격/한 줄)
     col_prev, col_fb, col_res, col_next = st.columns(4, gap="small")
     with col_prev:
-        prev_step = st.button("이전 단계로 돌아가기", key=f"prev_btn_{card['id']}", use_container_width=True)
+        prev_step = st.button("이전 단계로 돌아가기", key=f"prev_btn_{card.id}", use_container_width=True)
     with col_fb:
-        show_feedback = st.button("피드백 보기", key=f"fb_btn_{card['id']}", use_container_width=True)
+        show_feedback = st.button("피드백 보기", key=f"fb_btn_{card.id}", use_container_width=True)
     with col_res:
-        show_resources = st.button("추가 자료 보기", key=f"res_btn_{card['id']}", use_container_width=True)
+        show_resources = st.button("추가 자료 보기", key=f"res_btn_{card.id}", use_container_width=True)
     with col_next:
-        next_step = st.button("다음 단계로 넘어가기", key=f"next_btn_{card['id']}", use_container_width=True)
+        next_step = st.button("다음 단계로 넘어가기", key=f"next_btn_{card.id}", use_container_width=True)
 
     if show_feedback:
-        st.markdown("---")
-        # ✅ 제목 변경
-        st.subheader("🧑‍🏫 선생님이 도와줄게요!")
-        st.write(build_feedback(answer, card))
+        feedback_panel(answer, card)
 
     if show_resources:
-        st.markdown("---")
-        st.subheader("📚 추가 자료")
-        resources = card.get("resources", [])
-        if not resources:
-            st.info("이 카드에 등록된 자료가 아직 없습니다. 사이드바에서 URL을 추가해 보세요.")
-        else:
-            for res in resources:
-                url = get_resource_url(card["id"], res)
-
-                st.markdown(f"**{res['title']}**")
-                if res.get("description"):
-                    st.caption(res["description"])
-
-                if url:
-                    # ✅ 항상 링크도 함께 보여줘서(차단/깨짐 대비)
-                    st.markdown(f"링크: {url}")
-
-                    # ✅ 유튜브는 정규화해서 st.video
-                    if is_youtube_url(url):
-                        st.video(normalize_youtube_url(url))
-                    else:
-                        # 타입 기반 처리
-                        rtype = (res.get("type") or "").lower()
-                        if rtype == "image":
-                            st.image(url, use_container_width=True)
-                        elif rtype == "video":
-                            st.video(url)
-                        else:
-                            st.markdown(f"[자료 열기]({url})")
-                else:
-                    st.info("URL이 비어 있습니다. 사이드바에서 주소를 입력해 주세요.")
-
-                st.markdown("---")
+        resources_panel(card)
 
+    # 카드가 바뀌면 사이드바 선택도 바뀌어야 하므로 전체를 다시 그립니다.
     if prev_step:
-        st.session_state.selected_card_index = (current_index - 1) % len(cards)
-        st.rerun()
+        select_card(st.session_state.selected_unit, (current_index - 1) % len(cards))
+        st.rerun(scope="app")
 
     if next_step:
-        st.session_state.selected_card_index = (current_index + 1) % len(cards)
-        st.rerun()
+        select_card(st.session_state.selected_unit, (current_index + 1) % len(cards))
+        st.rerun(scope="app")
+
+
+@st.fragment
+@timed("ui.feedback")
+def feedback_panel(answer: str, card: Card) -> None:
+    st.markdown("---")
+    # ✅ 제목 변경
+    st.subheader("🧑‍🏫 선생님이 도와줄게요!")
+    match = get_catalog().answer_index(st.session_state.selected_unit).score(answer, card.id)
+    # LLM 백엔드는 글자가 오는 대로 같은 자리를 다시 그리고, 늦으면 규칙 피드백으로 바꿉니다.
+    slot = st.empty()
+    draft = None
+    for draft in get_feedback_backend().stream(answer, card, match):
+        slot.markdown(draft.text if draft.done else draft.text + " ▌")
+    if draft is not None and draft.source != SOURCE_RULES:
+        st.caption("🤖 AI 도우미가 쓴 피드백이에요.")
+    # 큐에 넣기만 하므로 클릭 응답 시간에 디스크 쓰기가 끼어들지 않습니다.
+    get_answer_log().record(card.id, classify_answer(answer), _current_session_id())
+
+
+@st.fragment
+@timed("ui.answer_stats")
+def answer_stats_panel(card: Card) -> None:
+    """사이드바: 이 카드에서 학생 답이 어떻게 분류되었는지 (누적 개수만 읽음)"""
+    with st.expander("📊 답변 분류 현황", expanded=False):
+        per_card = get_answer_log().counts(card.id).get(card.id, {})
+        if not per_card:
+            st.caption("아직 기록된 답변이 없습니다.")
+            return
+        hits, total, rate = get_answer_log().rate(card.id, "distance")
+        st.metric("거리 오개념 비율", f"{rate:.0%}", help=f"{total}건 중 {hits}건")
+        st.bar_chart({"답변 수": {CATEGORY_LABELS.get(k, k): v for k, v in sorted(per_card.items())}})
+        st.button("새로 고침", key="answer_stats_refresh")
+
+
+@st.fragment
+@timed("ui.resources")
+def resources_panel(card: Card) -> None:
+    st.markdown("---")
+    st.subheader("📚 추가 자료")
+    sync_resource_urls()
+    if not card.resources:
+        st.info("이 카드에 등록된 자료가 아직 없습니다. 사이드바에서 URL을 추가해 보세요.")
+        return
+
+    # 이미지는 자리만 먼저 그리고 한꺼번에 받기 시작합니다. 느린 호스트 하나가 나머지 자료를 막지 않습니다.
+    slots: ImageSlots = {}
+    for res in card.resources:
+        url = get_resource_url(card.id, res)
+
+        st.markdown(f"**{res.title}**")
+        if res.description:
+            st.caption(res.description)
+
+        if url:
+            # ✅ 항상 링크도 함께 보여줘서(차단/깨짐 대비)
+            st.markdown(f"링크: {url}")
+            resolved = resolve_url(url, res.type)
+            if resolved.strategy == STRATEGY_IMAGE:
+                image_slot(slots, resolved)
+            else:
+                render_resource(resolved)
+        else:
+            st.info("URL이 비어 있습니다. 사이드바에서 주소를 입력해 주세요.")
+
+        st.markdown("---")
+    fill_image_slots(slots)
+
+
+@st.fragment
+@timed("ui.summary_checklist")
+def summary_checklist() -> None:
+    """탭 2: 수업 마무리 체크리스트"""
+    st.markdown("### 수업 마무리 체크리스트")
+    for key, text in SUMMARY_CHECKLIST:
+        st.checkbox(text, key=key)
+    persist_session()
+
+
+def export_request() -> ExportRequest:
+    """지금 단원의 카드와 이 세션의 자료 URL로 내보내기 요청을 만듭니다. (세션 값은 여기서만 읽음)"""
+    cards = get_cards()
+    return ExportRequest(
+        title=get_catalog().unit_info(st.session_state.selected_unit).title,
+        summary_markdown=SUMMARY_MARKDOWN,
+        checklist=tuple(text for _, text in SUMMARY_CHECKLIST),
+        cards=cards.cards,
+        resource_urls={(c.id, r.id): get_resource_url(c.id, r) for c in cards.cards for r in c.resources},
+    )
+
+
+@st.fragment
+@timed("ui.export")
+def export_panel() -> None:
+    """탭 2: 정리 + 체크리스트 + 모든 카드를 인쇄용 HTML/PDF로 내려받기"""
+    st.markdown("### 🖨 인쇄용 내려받기")
+    exporter = get_exporter()
+    request = export_request()
+    key = request.key
+    result = exporter.cached(key)
+
+    if result is None:
+        if not exporter.pending(key):
+            failure = exporter.failure(key)
+            if failure is not None:
+                st.error(f"인쇄용 파일을 만들지 못했습니다: {failure}")
+            if not st.button("다시 만들기" if failure is not None else "인쇄용 파일 만들기", key="export_build"):
+                st.caption("한 장 정리, 체크리스트, 모든 발문 카드와 자료 그림을 파일 하나로 묶습니다.")
+                if not PDF_AVAILABLE:
+                    st.caption("ℹ️ 이 서버에는 weasyprint가 없어 PDF는 만들지 않고 HTML만 만듭니다.")
+                return
+            exporter.submit(request)
+        export_progress(key)
+        return
+
+    col_html, col_pdf = st.columns(2)
+    with col_html:
+        st.download_button(
+            "HTML 내려받기", data=result.html.read_bytes(), file_name=f"{request.title}.html", mime="text/html",
+            use_container_width=True,
+        )
+    with col_pdf:
+        if result.pdf is not None:
+            st.download_button(
+                "PDF 내려받기", data=result.pdf.read_bytes(), file_name=f"{request.title}.pdf", mime="application/pdf",
+                use_container_width=True,
+            )
+        elif not PDF_AVAILABLE:
+            st.caption("PDF는 weasyprint를 설치하면 만들 수 있습니다. HTML을 브라우저에서 인쇄해도 됩니다.")
+        else:
+            st.caption(f"PDF를 만들지 못했습니다: {result.pdf_error}")
+
+
+@st.fragment(run_every=1)
+def export_progress(key: str) -> None:
+    """만드는 동안만 1초마다 확인하고, 끝나면 화면을 다시 그려 내려받기 버튼(실패면 오류와 다시 만들기)을 보여 줍니다."""
+    if get_exporter().pending(key):
+        st.caption("⏳ 인쇄용 파일을 만드는 중입니다...")
+    else:
+        st.rerun(scope="app")
+
+
+def debug_panel() -> None:
+    """숨은 성능 측정 패널 (LESSON_PROFILE=1 이고 주소에 ?debug=1 이 있을 때만)"""
+    profiler = profiling.PROFILER
+    with st.expander("🛠 성능 측정", expanded=False):
+        st.caption("이 세션")
+        st.table([{"span": name, **stats} for name, stats in profiler.snapshot(_current_session_id()).items()])
+        st.caption("프로세스 전체")
+        st.table([{"span": name, **stats} for name, stats in profiler.snapshot().items()])
+        st.download_button(
+            "Prometheus 형식으로 받기",
+            data=profiler.render_prometheus(),
+            file_name="lesson_metrics.prom",
+            mime="text/plain",
+        )
 
 
 # -----------------------------
-# 탭 2: 한 장 정리
+# 사이드바: 단원/카드 찾기 (한 쪽씩만 그림)
 # -----------------------------
-with tab_summary:
-    st.header("📄 계절이 생기는 까닭 - 한 장 정리")
-    st.markdown(
-        """
-- 지구의 **자전축은 약 23.5도 기울어져** 있습니다.  
-- 이 기울어진 상태로 지구가 **태양 주위를 1년에 한 바퀴 공전**합니다.  
-- 그래서 어떤 때에는 우리나라 쪽이 태양을 더 정면으로 바라보고, 어떤 때에는 더 비스듬히 바라보게 됩니다.  
-- 그 결과, 한 장소에서도 **태양의 높이(태양 고도)** 와 **햇빛이 비추는 각도**, **낮과 밤의 길이**가 계절에 따라 달라집니다.  
-- 태양빛이 더 **수직에 가깝게** 들어오고 낮이 길어질수록 여름처럼 더 **뜨겁고 밝게**,  
-  더 **비스듬히** 들어오고 낮이 짧아질수록 겨울처럼 더 **선선하고 어둡게** 느껴집니다.
-"""
+CATALOG_PAGE_SIZE = 20
+ALL_STAGES = "전체 단계"
+
+
+def _reset_catalog_page() -> None:
+    st.session_state.catalog_page = None
+
+
+def _on_unit_picked() -> None:
+    select_card(st.session_state.catalog_unit, 0)
+
+
+def _on_card_picked() -> None:
+    picked = st.session_state.catalog_pick
+    if picked is not None:
+        st.session_state.selected_unit, st.session_state.selected_card_index = st.session_state.catalog_page_keys[picked]
+
+
+@timed("ui.card_navigator")
+def card_navigator() -> None:
+    """
+    단원 선택, 검색, 단계 필터, 쪽 넘김으로 카드를 고릅니다.
+    카탈로그가 커져도 한 번에 CATALOG_PAGE_SIZE 개만 선택 상자에 넣습니다.
+    """
+    catalog = get_catalog()
+    unit_id = st.session_state.selected_unit
+
+    # 선택 상자 값은 항상 지금 카드에 맞춰 두고, 사용자가 바꾼 것은 on_change 에서 반영합니다.
+    # (이전/다음 버튼, 교사 push 로 카드가 바뀌어도 선택 상자가 따라옵니다)
+    if len(catalog.units) > 1:
+        st.session_state.catalog_unit = unit_id
+        st.selectbox(
+            "단원",
+            options=[u.id for u in catalog.units],
+            format_func=lambda u: f"{catalog.unit_info(u).title} ({catalog.unit_info(u).card_count}장)",
+            key="catalog_unit",
+            on_change=_on_unit_picked,
+        )
+
+    stages = [ALL_STAGES, *catalog.unit_info(unit_id).stages]
+    if st.session_state.get("catalog_stage") not in stages:
+        # 단원이 바뀌면 그 단원에 없는 단계 필터는 풉니다.
+        st.session_state.catalog_stage = ALL_STAGES
+
+    col_query, col_stage = st.columns([3, 2])
+    with col_query:
+        query = st.text_input(
+            "카드 찾기", key="catalog_query", placeholder="단계, 카드 이름, 발문, 키워드", on_change=_reset_catalog_page
+        )
+    with col_stage:
+        stage = st.selectbox("단계", stages, key="catalog_stage", on_change=_reset_catalog_page)
+    all_units = bool(query.strip()) and len(catalog.units) > 1 and st.checkbox(
+        "모든 단원에서 찾기", key="catalog_all_units", on_change=_reset_catalog_page
     )
 
-    st.markdown("---")
-    st.markdown("### 수업 마무리 체크리스트")
-    st.checkbox("여름과 겨울에 태양의 높이와 그림자 길이 차이를 설명할 수 있다.", key="chk_sun_height")
-    st.checkbox("햇빛의 입사각(수직/비스듬히)과 단위 면적당 에너지 양의 관계를 말할 수 있다.", key="chk_angle_energy")
-    st.checkbox("계절이 태양과의 거리 때문이라는 생각이 왜 정확하지 않은지 설명할 수 있다.", key="chk_distance_misconception")
-    st.checkbox("자전축 기울기와 공전이 계절과 어떻게 연결되는지 한 문장으로 말할 수 있다.", key="chk_tilt_orbit")
+    results = catalog.search(query, unit_id=None if all_units else unit_id, stage=None if stage == ALL_STAGES else stage)
+    if not results:
+        st.caption("찾는 카드가 없습니다.")
+        return
+
+    current = (unit_id, st.session_state.selected_card_index)
+    pages = (len(results) + CATALOG_PAGE_SIZE - 1) // CATALOG_PAGE_SIZE
+    page = st.session_state.get("catalog_page")
+    if page is None:
+        pos = next((i for i, e in enumerate(results) if (e.unit_id, e.index) == current), 0)
+        page = pos // CATALOG_PAGE_SIZE
+    page = min(page, pages - 1)
+
+    if pages > 1:
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀", key="catalog_prev_page", disabled=page == 0, use_container_width=True):
+                page -= 1
+        with col_next:
+            if st.button("▶", key="catalog_next_page", disabled=page >= pages - 1, use_container_width=True):
+                page += 1
+        with col_info:
+            st.caption(f"{page + 1} / {pages}쪽 · {len(results)}장")
+    st.session_state.catalog_page = page
+
+    shown = results[page * CATALOG_PAGE_SIZE:(page + 1) * CATALOG_PAGE_SIZE]
+    keys = [(e.unit_id, e.index) for e in shown]
+    if all_units:
+        labels = [f"{catalog.unit_info(e.unit_id).title} · {e.display_label}" for e in shown]
+    else:
+        labels = [e.display_label for e in shown]
+    st.session_state.catalog_page_keys = keys
+    st.session_state.catalog_pick = keys.index(current) if current in keys else None
+    st.selectbox(
+        "사용할 발문 카드를 선택하세요.",
+        options=range(len(shown)),
+        format_func=labels.__getitem__,
+        placeholder="카드를 고르세요",
+        key="catalog_pick",
+        on_change=_on_card_picked,
+    )
+
+
+# -----------------------------
+# 실시간 수업 모드
+# -----------------------------
+LIVE_POLL_SECONDS = 3
+LIVE_ROLES = ["끄기", "학생", "교사"]
+
+
+@st.cache_resource
+def get_live_classroom() -> LiveClassroom:
+    """실시간 수업 공유 저장소. 이 서버의 모든 세션이 함께 씁니다."""
+    return LiveClassroom()
+
+
+def live_role() -> str:
+    if not st.session_state.get("live_code", "").strip():
+        return "끄기"
+    return st.session_state.get("live_role", "끄기")
+
+
+def publish_live_answer(card: Card, answer: str) -> None:
+    """학생 모드면 답이 바뀌었을 때만 공유 저장소에 올립니다."""
+    if live_role() != "학생":
+        return
+    current = (card.id, answer)
+    if st.session_state.get("live_published") == current:
+        return
+    version = get_live_classroom().publish(
+        st.session_state.live_code.strip(),
+        st.session_state.resume_token,
+        st.session_state.get("live_name", "").strip() or "이름 없음",
+        card.id,
+        answer,
+        classify_answer(answer),
+    )
+    if version is not None:  # 교사가 아직 열지 않은 반이면 다음 실행에서 다시 올립니다.
+        st.session_state.live_published = current
+
+
+def follow_teacher_push() -> None:
+    """교사가 보낸 카드가 새로 있으면 그 카드로 이동합니다. (전체 다시 그리기 시작 때 호출)"""
+    if live_role() != "학생":
+        return
+    push_version, card_id = get_live_classroom().pushed_card(st.session_state.live_code.strip())
+    # 반을 치우고 다시 열면 push 버전이 0부터 시작하므로 크기가 아니라 달라졌는지를 봅니다.
+    if push_version != st.session_state.get("live_seen_push", 0):
+        st.session_state.live_seen_push = push_version
+        entry = get_catalog().find(card_id) if card_id else None
+        if entry is not None:
+            select_card(entry.unit_id, entry.index)
+
+
+def live_settings_panel() -> None:
+    """사이드바: 실시간 수업 참여 설정"""
+    with st.expander("🏫 실시간 수업", expanded=live_role() != "끄기"):
+        st.radio("역할", LIVE_ROLES, key="live_role", horizontal=True)
+        st.text_input("수업 코드", key="live_code", placeholder="예) 6-2")
+        if st.session_state.get("live_role") == "학생":
+            st.text_input("이름", key="live_name")
+        if live_role() == "학생":
+            live_student_poller()
+
+
+@st.fragment(run_every=LIVE_POLL_SECONDS)
+def live_student_poller() -> None:
+    """학생: 교사가 카드를 보냈는지 주기적으로 확인합니다. (확인만 하고, 바뀌었을 때만 전체 다시 그리기)"""
+    code = st.session_state.live_code.strip()
+    live = get_live_classroom()
+    if live.room(code) is None:
+        st.caption(f"⏳ '{code}' 수업이 아직 열리지 않았습니다. 선생님이 수업을 열면 참여됩니다.")
+        return
+    st.caption(f"🟢 '{code}' 수업에 참여 중입니다.")
+    push_version, _ = live.pushed_card(code)
+    if push_version != st.session_state.get("live_seen_push", 0):
+        st.rerun(scope="app")
+
+
+@st.fragment(run_every=LIVE_POLL_SECONDS)
+@timed("ui.live_dashboard")
+def live_dashboard(card: Card) -> None:
+    """교사: 마지막으로 본 이후 바뀐 학생만 받아서 화면용 목록을 갱신합니다."""
+    code = st.session_state.live_code.strip()
+    if st.session_state.get("live_students_code") != code:
+        st.session_state.live_students_code = code
+        st.session_state.live_students = {}
+        st.session_state.live_version = 0
+
+    live = get_live_classroom()
+    diff = live.changes_since(code, st.session_state.live_version)
+    students = st.session_state.live_students
+    if diff.full:
+        students.clear()
+    for state in diff.changed:
+        students[state.key] = state
+    for key in diff.removed:
+        students.pop(key, None)
+    st.session_state.live_version = diff.version
+
+    catalog = get_catalog()
+    col_info, col_push = st.columns([3, 2])
+    with col_info:
+        st.markdown(f"**수업 코드 '{code}'** · 참여 학생 {len(students)}명")
+    with col_push:
+        if st.button("📢 모든 학생을 이 카드로", use_container_width=True):
+            live.push_card(code, card.id)
+            st.success(f"'{card.label}' 카드로 보냈습니다.")
+
+    on_card = [s for s in students.values() if s.card_id == card.id]
+    st.caption(f"지금 카드({card.label})에 답한 학생: {len(on_card)}명")
+    if on_card:
+        by_category: Dict[str, int] = {}
+        for s in on_card:
+            label = CATEGORY_LABELS.get(s.category, s.category)
+            by_category[label] = by_category.get(label, 0) + 1
+        st.bar_chart({"학생 수": by_category})
+
+    rows = [
+        {
+            "이름": s.name,
+            "카드": entry.label if (entry := catalog.find(s.card_id)) is not None else s.card_id,
+            "분류": CATEGORY_LABELS.get(s.category, s.category),
+            "답": s.answer,
+            "시각": time.strftime("%H:%M:%S", time.localtime(s.updated_at)),
+        }
+        for s in sorted(students.values(), key=lambda s: s.updated_at, reverse=True)
+    ]
+    if rows:
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.info("아직 답을 올린 학생이 없습니다. 학생들에게 수업 코드를 알려 주세요.")
+
+
+# -----------------------------
+# 화면 구성 (streamlit run 으로 실행될 때만)
+# -----------------------------
+@timed("ui.rerun")
+def main() -> None:
+    resume_session()
+    init_session_state()
+    sync_resource_urls()
+    follow_teacher_push()
+
+    st.markdown(APP_CSS, unsafe_allow_html=True)
 
+    # -----------------------------
+    # 레이아웃: 사이드바
+    # -----------------------------
+    with st.sidebar, span("ui.sidebar"):
+        st.header("⚙️ 수업 설정")
+
+        card_navigator()
+        current_card = get_cards()[st.session_state.selected_card_index]
+
+        st.markdown("---")
+        resource_settings_panel(current_card)
+
+        st.markdown("---")
+        answer_stats_panel(current_card)
+
+        st.markdown("---")
+        live_settings_panel()
+
+        if profiling.PROFILER is not None and st.query_params.get("debug") == "1":
+            debug_panel()
+
+    # -----------------------------
+    # 메인 레이아웃
+    # -----------------------------
+    st.title("🌍 지구, 태양 주위를 떠도는 여정")
     st.markdown("---")
+
+    tab_names = ["발문 카드 활용", "한 장 정리"]
+    if live_role() == "교사":
+        tab_names.append("실시간 수업 현황")
+    tab_lesson, tab_summary, *tab_live = st.tabs(tab_names)
+
+    # -----------------------------
+    # 탭 1: 발문 카드 활용
+    # -----------------------------
+    with tab_lesson:
+        lesson_card_panel(current_card)
+
+    # -----------------------------
+    # 탭 2: 한 장 정리
+    # -----------------------------
+    with tab_summary, span("ui.summary"):
+        st.header("📄 계절이 생기는 까닭 - 한 장 정리")
+        st.markdown(SUMMARY_MARKDOWN)
+
+        st.markdown("---")
+        summary_checklist()
+        st.markdown("---")
+
+        export_panel()
+
+    # -----------------------------
+    # 탭 3: 실시간 수업 현황 (교사 모드에서만)
+    # -----------------------------
+    if tab_live:
+        with tab_live[0]:
+            live_dashboard(current_card)
+
+    # 화면을 다 그린 뒤에 맡깁니다. (지금 카드 요청이 먼저)
+    prefetch_neighbors(current_card)
+    persist_session()
+
+
+if __name__ == "__main__":
+    main()
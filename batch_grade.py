@@ -0,0 +1,219 @@
+"""
+수업 후 학생 답변 파일(CSV/JSONL)을 한꺼번에 다시 채점하는 명령줄 도구입니다.
+
+    python batch_grade.py answers.csv -o results.jsonl --workers 8
+
+- 입력 열: card_id, answer (그 밖의 열은 결과에 그대로 복사)
+- 여러 프로세스에서 classify_answer / build_feedback 을 실행하고, 입력 순서를 유지해 씁니다.
+- 결과에 예상 답변 중 가장 비슷한 것(nearest_expected)과 유사도(similarity)를 함께 씁니다.
+- 한 번에 처리 중인 묶음 수를 제한해서 파일 크기와 상관없이 메모리가 일정합니다.
+- CSV 결과는 모든 행에 나온 열을 다 씁니다. (행을 임시 파일에 모았다가 끝날 때 머리줄과 함께 씀)
+- 출력을 받는 쪽이 먼저 닫으면(예: | head) 조용히 끝납니다.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from pathlib import Path
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+from answer_similarity import SimilarityMatch
+from keyword_engine import get_automaton, get_fuzzy_index
+from lesson_catalog import LessonCatalog, get_catalog
+from lesson_engine import build_feedback, classify_answer_scores
+
+# _init_worker 가 채우는 수업 카탈로그
+_CATALOG: Optional[LessonCatalog] = None
+
+
+# -----------------------------
+# 입력/출력 형식
+# -----------------------------
+def read_rows(path: Path) -> Iterator[Dict]:
+    """CSV 또는 JSONL 파일을 한 줄씩 읽습니다. ('-'이면 표준 입력의 JSONL)"""
+    if str(path) == "-":
+        for line in sys.stdin:
+            if line.strip():
+                yield json.loads(line)
+        return
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class ResultWriter:
+    """
+    결과를 JSONL 또는 CSV로 씁니다. (출력 경로의 확장자로 결정)
+    CSV는 뒤쪽 행에만 있는 열도 빠지지 않도록, 행을 임시 파일에 JSONL로 모아 두고
+    close() 때 모든 열(처음 나온 순서)로 머리줄을 쓴 뒤 옮겨 씁니다.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.is_csv = bool(path) and path.suffix.lower() == ".csv"
+        self._f = open(path, "w", encoding="utf-8", newline="") if path else sys.stdout
+        self._fieldnames: Dict[str, None] = {}
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8") if self.is_csv else None
+
+    def write(self, row: Dict) -> None:
+        if self._spool is None:
+            self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            return
+        flat = dict(row)
+        flat["hits"] = json.dumps(flat.get("hits", {}), ensure_ascii=False)
+        self._fieldnames.update(dict.fromkeys(flat))
+        self._spool.write(json.dumps(flat, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        if self._spool is not None:
+            try:
+                self._spool.seek(0)
+                writer = csv.DictWriter(self._f, fieldnames=list(self._fieldnames), restval="")
+                writer.writeheader()
+                for line in self._spool:
+                    writer.writerow(json.loads(line))
+            finally:
+                self._spool.close()
+                self._spool = None
+        if self._f is not sys.stdout:
+            self._f.close()
+        else:
+            self._f.flush()
+
+
+# -----------------------------
+# 작업 프로세스
+# -----------------------------
+def _init_worker() -> None:
+    """작업 프로세스마다 한 번: 수업 카탈로그, 키워드 자동자, 오타 허용 색인을 준비합니다. (단원은 처음 쓸 때 엶)"""
+    global _CATALOG
+    _CATALOG = get_catalog()
+    get_automaton()
+    get_fuzzy_index()
+
+
+def grade_chunk(rows: List[Dict]) -> List[Dict]:
+    """답변 묶음 하나를 채점합니다. 예상 답변 유사도는 단원마다 행렬 곱 한 번으로 계산합니다."""
+    answers = [row.get("answer") or "" for row in rows]
+    card_ids = [row.get("card_id", "") for row in rows]
+    matches: List[Optional[SimilarityMatch]] = [None] * len(rows)
+    by_unit: Dict[str, List[int]] = {}
+    for i, card_id in enumerate(card_ids):
+        unit_id = _CATALOG.unit_of(card_id)
+        if unit_id is not None:
+            by_unit.setdefault(unit_id, []).append(i)
+    for unit_id, positions in by_unit.items():
+        scored = _CATALOG.answer_index(unit_id).score_batch([answers[i] for i in positions], [card_ids[i] for i in positions])
+        for i, match in zip(positions, scored):
+            matches[i] = match
+
+    results = []
+    for row, answer, match in zip(rows, answers, matches):
+        scored = classify_answer_scores(answer)
+        out = dict(row)
+        out["category"] = scored.category
+        out["confidence"] = round(scored.confidence, 4)
+        out["hits"] = scored.hits
+        out["similarity"] = round(match.score, 4) if match else 0.0
+        out["nearest_expected"] = match.expected if match else ""
+        out["feedback"] = ""
+        out["error"] = ""
+        card_id = row.get("card_id", "")
+        card = _CATALOG.card(card_id)
+        if card is None:
+            out["error"] = f"알 수 없는 카드 id: {card_id!r}"
+        else:
+            out["feedback"] = build_feedback(answer, card, match)
+        results.append(out)
+    return results
+
+
+def _chunked(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk: List[Dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def grade_stream(
+    rows: Iterable[Dict],
+    workers: int,
+    chunk_size: int = 256,
+    max_inflight: Optional[int] = None,
+) -> Iterator[Dict]:
+    """
+    답변을 묶음 단위로 프로세스 풀에 보내고, 입력 순서대로 결과를 돌려줍니다.
+    처리 중인 묶음은 최대 max_inflight 개(기본: 작업자 수의 2배)로 제한합니다.
+    """
+    max_inflight = max_inflight or workers * 2
+
+    if workers <= 1:
+        _init_worker()
+        for chunk in _chunked(rows, chunk_size):
+            yield from grade_chunk(chunk)
+        return
+
+    # fork 방식에서는 부모가 미리 만든 색인/자동자를 작업 프로세스가 그대로 물려받습니다.
+    _init_worker()
+    pending: "deque[Future]" = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for chunk in _chunked(rows, chunk_size):
+            pending.append(pool.submit(grade_chunk, chunk))
+            if len(pending) >= max_inflight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# -----------------------------
+# 명령줄 진입점
+# -----------------------------
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="학생 답변 일괄 채점 (CSV/JSONL)")
+    parser.add_argument("input", type=Path, help="입력 파일 (.csv 또는 .jsonl, '-'이면 표준 입력)")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="결과 파일 (.jsonl 또는 .csv, 생략하면 표준 출력)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="작업 프로세스 수")
+    parser.add_argument("--chunk-size", type=int, default=256, help="한 번에 넘기는 답변 수")
+    parser.add_argument("--max-inflight", type=int, default=None, help="동시에 처리 중인 묶음 수 상한")
+    args = parser.parse_args(argv)
+
+    writer = ResultWriter(args.output)
+    count = 0
+    started = time.perf_counter()
+    try:
+        try:
+            for result in grade_stream(read_rows(args.input), args.workers, args.chunk_size, args.max_inflight):
+                writer.write(result)
+                count += 1
+        finally:
+            writer.close()
+    except BrokenPipeError:
+        # 받는 쪽(head 등)이 먼저 닫았습니다. 종료 때 표준 출력을 다시 비우다 오류가 나지 않도록 막아 둡니다.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(
+        f"채점 완료: {count}개 답변, {elapsed:.2f}초, 초당 {rate:,.0f}개 (작업자 {args.workers}개)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
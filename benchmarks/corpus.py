@@ -0,0 +1,69 @@
+"""
+벤치마크용 답변/URL 말뭉치 (시드 고정으로 항상 같은 데이터를 만듭니다)
+"""
+from typing import List
+import random
+
+_SUBJECTS = ["여름에는", "겨울에는", "봄과 가을은", "우리나라는", "지구가", "태양이", "햇빛이", "그림자가"]
+_PHRASES = [
+    "태양이 가까워져서 더워지고",
+    "태양에서 멀어져서 추워지고",
+    "자전축이 23.5도 기울어져 있어서",
+    "축이 기울어진 채로 공전해서",
+    "햇빛이 비스듬히 들어와서",
+    "햇빛이 수직에 가깝게 들어와서",
+    "남중고도가 높아서",
+    "태양 높이가 낮아서",
+    "낮이 길고 밤이 짧아서",
+    "밤이 길어져서",
+    "해가 길게 떠 있어서",
+    "그냥 날씨가 바뀌어서",
+    "잘 모르겠지만",
+    "구름이 많아서",
+]
+_ENDINGS = ["계절이 생기는 것 같아요.", "덥다고 느껴요.", "추운 것 같아요.", "그렇다고 생각해요.", ""]
+
+_URL_TEMPLATES = [
+    "https://www.youtube.com/watch?v={vid}",
+    "https://www.youtube.com/watch?v={vid}&t={sec}s",
+    "https://youtu.be/{vid}?t={sec}",
+    "https://www.youtube.com/shorts/{vid}?feature=share",
+    "https://www.youtube.com/embed/{vid}",
+    "https://www.youtube.com/playlist?list=PL{vid}",
+    "https://vimeo.com/{num}",
+    "https://drive.google.com/file/d/{vid}/view?usp=sharing",
+    "https://docs.google.com/presentation/d/{vid}/edit",
+    "https://img.example.org/{num}/photo.jpg",
+    "https://blog.kakaocdn.net/dna/{vid}/img.webp?credential={vid}&expires={num}",
+    "https://cdn.school.kr/media/{num}.mp4",
+    "http://example.com/placeholder",
+    "https://",
+    "ftp://files.school.kr/{num}",
+    "",
+]
+
+
+def make_answers(n: int, seed: int = 20240101) -> List[str]:
+    """n개의 한국어 학생 답변을 만듭니다. (빈 답변과 긴 답변 포함)"""
+    rng = random.Random(seed)
+    answers = []
+    for i in range(n):
+        if i % 50 == 0:
+            answers.append("")
+            continue
+        parts = [rng.choice(_SUBJECTS)]
+        parts += rng.sample(_PHRASES, k=rng.randint(1, 4))
+        parts.append(rng.choice(_ENDINGS))
+        answers.append(" ".join(p for p in parts if p))
+    return answers
+
+
+def make_urls(n: int, seed: int = 20240101) -> List[str]:
+    """n개의 자료 URL(유튜브/드라이브/직접 링크/잘못된 링크 섞임)을 만듭니다."""
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-"
+    urls = []
+    for _ in range(n):
+        vid = "".join(rng.choice(alphabet) for _ in range(11))
+        urls.append(rng.choice(_URL_TEMPLATES).format(vid=vid, sec=rng.randint(0, 600), num=rng.randint(1, 10**6)))
+    return urls
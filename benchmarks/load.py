@@ -0,0 +1,436 @@
+"""
+동시 접속 부하 시험 (한 app.py 서버가 학생 몇 명까지 버티는지)
+
+    python -m benchmarks.load                           # 학생 10명, 한 명당 5바퀴
+    python -m benchmarks.load --sessions 1,10,30,60     # 인원을 늘려 가며 비교
+    python -m benchmarks.load --sessions 30 --iterations 10 --think 1.0 -o load.json
+    python -m benchmarks.load --baseline load.json      # 기준보다 느려지면 종료 코드 1
+    python -m benchmarks.load --url ws://교실서버:8501   # 이미 떠 있는 서버 (메모리는 잴 수 없음)
+
+- 임시 폴더에서 `streamlit run app.py`를 따로 띄우고, 학생 한 명마다 브라우저처럼 웹소켓을 하나 열어
+  위젯 값을 보냅니다. (AppTest는 프로세스 전역 런타임을 바꿔 가며 돌아서 여러 개를 동시에 돌릴 수 없습니다)
+- 한 바퀴: 카드 고르기 → 답 입력 → 피드백 보기 → 추가 자료 보기 → 다음 카드.
+  단계마다 보낸 뒤 다시 그리기가 끝날 때까지의 시간을 잽니다. 단계 사이에는 0 ~ --think 초 쉽니다.
+- 보고: 단계별 p50/p95/p99, 초당 다시 그리기 수, 오류 수, 서버 RSS와 학생 한 명당 증가량, 서버 CPU 시간.
+"""
+from typing import Dict, List, Optional
+from dataclasses import dataclass
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.corpus import make_answers
+from benchmarks.run import APP_PATH, DEFAULT_THRESHOLD, compare
+
+STEPS = ("initial_load", "pick_card", "type_answer", "feedback_click", "resources_click", "card_navigation")
+CARD_PICKER_LABEL = "사용할 발문 카드를 선택하세요."
+ANSWER_KEY_PREFIX = "answer_"  # 답 입력 칸은 라벨이 비어 있어서 위젯 key(answer_<카드 id>)로 찾습니다.
+RERUN_TIMEOUT = 60.0  # 초
+SERVER_START_TIMEOUT = 60.0  # 초
+RSS_SAMPLE_SECONDS = 0.2
+# 답변 분류 차트는 기록이 있는 카드로 돌아와야 그려지면서 차트 라이브러리(pandas 등)를 불러옵니다.
+# 준비 운동에서 여러 카드를 돌아 이런 지연 import가 모두 끝난 뒤에 재기 시작합니다.
+WARMUP_ITERATIONS = 10
+
+
+# -----------------------------
+# 서버 프로세스
+# -----------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(workdir: Path, port: int) -> subprocess.Popen:
+    """workdir 에서 app.py 서버를 띄우고 응답할 때까지 기다립니다."""
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--server.address", "127.0.0.1",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=workdir,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"앱 서버가 시작하지 못했습니다 (종료 코드 {proc.returncode})")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).ok:
+                return proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("앱 서버가 제시간에 응답하지 않았습니다.")
+
+
+class ProcessStats:
+    """리눅스 /proc 에서 다른 프로세스의 RSS와 CPU 시간을 읽습니다. (없으면 0)"""
+
+    def __init__(self, pid: Optional[int]):
+        self.pid = pid
+        self._page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._tick = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def rss(self) -> int:
+        if self.pid is None:
+            return 0
+        try:
+            with open(f"/proc/{self.pid}/statm", "r") as f:
+                return int(f.read().split()[1]) * self._page
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    def cpu_seconds(self) -> float:
+        if self.pid is None:
+            return 0.0
+        try:
+            with open(f"/proc/{self.pid}/stat", "r") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / self._tick  # utime + stime
+        except (OSError, ValueError, IndexError):
+            return 0.0
+
+
+class RssSampler:
+    """부하를 거는 동안 서버 RSS 최대값을 기록합니다."""
+
+    def __init__(self, stats: ProcessStats, interval: float = RSS_SAMPLE_SECONDS):
+        self.stats = stats
+        self.interval = interval
+        self.peak = stats.rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.stats.rss())
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.stats.rss())
+
+
+# -----------------------------
+# 학생 한 명 (웹소켓 세션)
+# -----------------------------
+@dataclass(frozen=True)
+class Widget:
+    id: str
+    kind: str
+    fragment_id: str
+    options: tuple = ()
+    key: str = ""  # 앱에서 준 위젯 key (없으면 빈 문자열)
+
+
+class AppSession:
+    """
+    브라우저 대신 ForwardMsg를 읽고 BackMsg를 보냅니다.
+    화면에 나온 위젯은 (종류, 라벨)이나 위젯 key로 찾고, 조각(fragment) 안의 위젯이면 그 조각만 다시 실행하도록 보냅니다.
+    다시 그리기 시간은 보낸 요청이 시작한 실행(같은 조각)이 끝날 때까지입니다. 다른 조각의 실행이 끝난 것은 건너뜁니다.
+    """
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/") + "/_stcore/stream"
+        self.widgets: Dict[tuple, Widget] = {}
+        self.errors: List[str] = []
+        self._ws = None
+
+    async def __aenter__(self) -> "AppSession":
+        import websockets
+
+        self._ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._ws.close()
+
+    def find(self, kind: str, label: str) -> Widget:
+        return self.widgets[(kind, label)]
+
+    def find_key(self, kind: str, key_prefix: str) -> Widget:
+        """위젯 key가 key_prefix 로 시작하는 위젯. 없으면 KeyError."""
+        for widget in self.widgets.values():
+            if widget.kind == kind and widget.key.startswith(key_prefix):
+                return widget
+        raise KeyError((kind, key_prefix))
+
+    async def rerun(self, widget: Optional[Widget] = None, **value) -> float:
+        """위젯 하나의 값을 보내고(없으면 첫 화면) 다시 그리기가 끝날 때까지 걸린 초를 돌려줍니다."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        if widget is not None:
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget.id
+            for field_name, v in value.items():
+                setattr(state, field_name, v)
+            msg.rerun_script.fragment_id = widget.fragment_id
+        if widget is None or not widget.fragment_id:
+            self.widgets.clear()
+
+        # 이 요청이 시작할 실행의 조각 목록 (앱 전체면 빈 목록). None 이면 어떤 실행이든 받습니다.
+        expected: Optional[List[str]] = [widget.fragment_id] if widget is not None and widget.fragment_id else []
+        ours = False  # 지금 들어오는 메시지가 우리가 시작한 실행의 것인지
+        started = time.perf_counter()
+        await self._ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(self._ws.recv(), RERUN_TIMEOUT))
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                # 실행마다 맨 처음에 오는 메시지입니다. 조각 실행이면 그 조각 id가 들어 있습니다.
+                ours = expected is None or list(fwd.new_session.fragment_ids_this_run) == expected
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._see(fwd.delta.new_element, fwd.delta.fragment_id)
+            elif kind == "script_finished" and ours:
+                if fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return time.perf_counter() - started
+                # 우리 실행이 st.rerun()으로 이어졌으면, 이어지는 실행(앱 전체일 수 있음)이 끝날 때까지 잽니다.
+                expected, ours = None, False
+
+    def _see(self, element, fragment_id: str) -> None:
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(element.exception.message)
+            return
+        from streamlit.runtime.state.common import user_key_from_element_id
+
+        proto = getattr(element, kind)
+        widget_id = getattr(proto, "id", "")
+        if widget_id and hasattr(proto, "label"):
+            key = user_key_from_element_id(widget_id) or ""
+            widget = Widget(widget_id, kind, fragment_id, tuple(getattr(proto, "options", ())), key)
+            # 라벨이 없는 위젯끼리 겹치지 않도록, key가 있으면 key로도 넣어 둡니다.
+            self.widgets[(kind, proto.label) if proto.label else (kind, "key:" + key)] = widget
+
+
+async def run_session(url: str, seed: int, iterations: int, think: float, with_resources: bool,
+                      start_delay: float, samples: Dict[str, List[float]], errors: List[str],
+                      finished: List[int], hold: asyncio.Event) -> None:
+    rng = random.Random(seed)
+    answers = make_answers(50, seed=seed)
+    await asyncio.sleep(start_delay)
+
+    async with AppSession(url) as app:
+        async def step(name: str, *args, **kwargs) -> None:
+            try:
+                seconds = await app.rerun(*args, **kwargs)
+            except (KeyError, asyncio.TimeoutError, OSError) as e:
+                errors.append(f"{name}: {type(e).__name__}: {e}")
+                return
+            samples.setdefault(name, []).append(seconds * 1e6)
+            if think > 0:
+                await asyncio.sleep(rng.uniform(0, think))
+
+        await step("initial_load")
+        for _ in range(iterations):
+            try:
+                picker = app.find("selectbox", CARD_PICKER_LABEL)
+                await step("pick_card", picker, string_value=rng.choice(picker.options))
+                await step("type_answer", app.find_key("text_area", ANSWER_KEY_PREFIX), string_value=rng.choice(answers))
+                await step("feedback_click", app.find("button", "피드백 보기"), trigger_value=True)
+                if with_resources:
+                    await step("resources_click", app.find("button", "추가 자료 보기"), trigger_value=True)
+                await step("card_navigation", app.find("button", "다음 단계로 넘어가기"), trigger_value=True)
+            except KeyError as e:
+                errors.append(f"화면에서 위젯을 찾지 못했습니다: {e}")
+                break
+        errors.extend(app.errors)
+        finished.append(seed)
+        # 모든 학생이 끝날 때까지 연결을 열어 두어야 세션이 차지하는 메모리까지 잴 수 있습니다.
+        await hold.wait()
+
+
+# -----------------------------
+# 부하 한 번 (학생 N명)
+# -----------------------------
+def percentile(values: List[float], pct: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+async def _run_sessions(url: str, sessions: int, iterations: int, think: float, ramp: float,
+                        with_resources: bool, stats: ProcessStats, seed: int) -> Dict:
+    samples: Dict[str, List[float]] = {}
+    errors: List[str] = []
+    finished: List[int] = []
+    hold = asyncio.Event()
+    tasks = [
+        asyncio.create_task(run_session(
+            url, seed + i, iterations, think, with_resources, ramp * i / sessions, samples, errors, finished, hold
+        ))
+        for i in range(sessions)
+    ]
+    # 모든 학생이 마지막 단계를 마치면(또는 연결이 끊기면) RSS를 읽고 연결을 닫습니다.
+    while len(finished) + sum(t.done() for t in tasks) < sessions:
+        await asyncio.sleep(0.05)
+    end_rss = stats.rss()
+    hold.set()
+    for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(outcome, Exception):
+            errors.append(f"연결 실패: {type(outcome).__name__}: {outcome}")
+    return {"samples": samples, "errors": errors, "end_rss": end_rss}
+
+
+def run_load(url: str, sessions: int, iterations: int, think: float, ramp: float, with_resources: bool,
+             stats: ProcessStats, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """학생 sessions 명을 동시에 돌리고 {이름: 통계}를 돌려줍니다. 시간은 µs, 메모리는 바이트."""
+    baseline_rss = stats.rss()
+    cpu_before = stats.cpu_seconds()
+    started = time.perf_counter()
+    with RssSampler(stats) as sampler:
+        result = asyncio.run(_run_sessions(url, sessions, iterations, think, ramp, with_resources, stats, seed))
+    elapsed = time.perf_counter() - started
+    cpu = stats.cpu_seconds() - cpu_before
+
+    samples, errors = result["samples"], result["errors"]
+    reruns = sum(len(v) for v in samples.values())
+    prefix = f"load.s{sessions}"
+    report: Dict[str, Dict[str, float]] = {}
+    for name in STEPS:
+        values = samples.get(name)
+        if not values:
+            continue
+        report[f"{prefix}.{name}"] = {
+            "median_us": statistics.median(values),
+            "p95_us": percentile(values, 95),
+            "p99_us": percentile(values, 99),
+            "max_us": max(values),
+            "rounds": len(values),
+            "ops": 1,
+        }
+    report[f"{prefix}.summary"] = {
+        "sessions": sessions,
+        "reruns": reruns,
+        "errors": len(errors),
+        "elapsed_s": elapsed,
+        "reruns_per_s": reruns / elapsed if elapsed > 0 else 0.0,
+        "server_cpu_s": cpu,
+        "server_cpu_ms_per_rerun": cpu / reruns * 1000 if reruns else 0.0,
+        "rss_baseline": baseline_rss,
+        "rss_peak": sampler.peak,
+        "rss_end": result["end_rss"],
+        "rss_per_session": (result["end_rss"] - baseline_rss) / sessions,
+    }
+    for line in errors[:5]:
+        print(f"  오류: {line}", file=sys.stderr)
+    return report
+
+
+def _mb(value: float) -> str:
+    return f"{value / (1024 * 1024):,.1f}MB"
+
+
+def print_report(report: Dict[str, Dict[str, float]], with_memory: bool) -> None:
+    for name, stats in report.items():
+        if name.endswith(".summary"):
+            print(
+                f"{name:36s} 학생 {stats['sessions']}명, 다시 그리기 {stats['reruns']}번 / {stats['elapsed_s']:.1f}초"
+                f" = 초당 {stats['reruns_per_s']:.1f}번, 오류 {stats['errors']}건"
+            )
+            if with_memory:
+                print(
+                    f"{'':36s} 서버 RSS {_mb(stats['rss_baseline'])} → 최대 {_mb(stats['rss_peak'])}"
+                    f" (학생 한 명당 {_mb(stats['rss_per_session'])}),"
+                    f" CPU 다시 그리기 한 번당 {stats['server_cpu_ms_per_rerun']:.1f}ms"
+                )
+        else:
+            extra = f"  (기준 대비 {stats['ratio']:.2f}배)" if "ratio" in stats else ""
+            print(
+                f"{name:36s} p50 {stats['median_us'] / 1000:8.1f}ms  p95 {stats['p95_us'] / 1000:8.1f}ms"
+                f"  p99 {stats['p99_us'] / 1000:8.1f}ms{extra}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="동시 접속 부하 시험 (학생 세션 여러 개를 웹소켓으로)")
+    parser.add_argument("--sessions", default="10", help="동시 학생 수 (쉼표로 여러 개: 1,10,30)")
+    parser.add_argument("--iterations", type=int, default=5, help="학생 한 명이 도는 바퀴 수")
+    parser.add_argument("--think", type=float, default=0.5, help="단계 사이 최대 쉬는 시간(초)")
+    parser.add_argument("--ramp", type=float, default=2.0, help="모든 학생이 들어오기까지 걸리는 시간(초)")
+    parser.add_argument("--skip-resources", action="store_true", help="추가 자료 보기 단계를 뺍니다 (원격 이미지 없이)")
+    parser.add_argument("--url", default=None, help="이미 떠 있는 서버 주소 (ws://호스트:포트). 생략하면 새로 띄웁니다.")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="결과 JSON 경로")
+    parser.add_argument("--baseline", type=Path, default=None, help="비교할 기준 JSON (p50 기준)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="허용하는 느려짐 배수")
+    args = parser.parse_args(argv)
+    counts = [int(n) for n in args.sessions.split(",") if n.strip()]
+    with_resources = not args.skip_resources
+
+    benchmarks: Dict[str, Dict[str, float]] = {}
+    # 저장소/이미지 캐시가 작업 폴더에 생기므로 서버는 임시 폴더에서 띄웁니다.
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = None
+        url = args.url
+        if url is None:
+            port = _free_port()
+            proc = start_app(Path(tmp), port)
+            url = f"ws://127.0.0.1:{port}"
+        stats = ProcessStats(proc.pid if proc is not None else None)
+        try:
+            # 준비 운동: 모듈 import, cache_resource 생성은 첫 학생의 시간/메모리에 넣지 않습니다.
+            run_load(url, 1, WARMUP_ITERATIONS, 0.0, 0.0, with_resources, stats, seed=-1)
+            for n in counts:
+                benchmarks.update(run_load(url, n, args.iterations, args.think, args.ramp, with_resources, stats))
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=30)
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "benchmarks": benchmarks,
+    }
+
+    regressions: List[str] = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        timed_only = {"benchmarks": {k: v for k, v in benchmarks.items() if "median_us" in v}}
+        regressions = compare(timed_only, baseline, args.threshold)
+
+    print_report(benchmarks, with_memory=proc is not None)
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if regressions:
+        print("\n기준보다 느려진 항목:", file=sys.stderr)
+        for line in regressions:
+            print(f"  - {line}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+벤치마크 모음
+
+    python -m benchmarks.run                          # 결과를 화면에 출력
+    python -m benchmarks.run -o bench.json            # JSON으로 저장
+    python -m benchmarks.run -o baseline.json         # 기준 만들기 (기계마다 다르므로 저장소에 넣지 않음)
+    python -m benchmarks.run --baseline baseline.json # 기준과 비교 (느려지면 종료 코드 1)
+    python -m benchmarks.run --only micro             # 규칙 엔진/URL 유틸만
+
+- micro: classify_answer, build_feedback, 30명 예상 답변 유사도, sanitize_url, normalize_youtube_url (생성한 말뭉치 사용)
+- e2e:   streamlit AppTest로 첫 화면, 카드 이동, 피드백 클릭, 추가 자료 클릭 시간을 잽니다.
+"""
+from typing import Callable, Dict, List, Optional
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import make_answers, make_urls
+
+ROOT = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT / "app.py"
+DEFAULT_THRESHOLD = 1.25  # 기준보다 25% 넘게 느려지면 실패
+ANSWER_KEY_PREFIX = "answer_"  # app.py 위젯 key: answer_/fb_btn_/res_btn_/next_btn_ + 카드 id
+
+
+def measure(fn: Callable[[], None], ops: int, rounds: int, warmup: int = 1) -> Dict[str, float]:
+    """fn 한 번이 ops번의 작업을 한다고 보고, 작업 하나당 시간(µs)을 잽니다."""
+    for _ in range(warmup):
+        fn()
+    per_op = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        per_op.append((time.perf_counter() - started) / ops * 1e6)
+    return {
+        "median_us": statistics.median(per_op),
+        "min_us": min(per_op),
+        "max_us": max(per_op),
+        "rounds": rounds,
+        "ops": ops,
+    }
+
+
+# -----------------------------
+# micro 벤치마크
+# -----------------------------
+def run_micro(rounds: int) -> Dict[str, Dict[str, float]]:
+    import lesson_engine as engine
+    from url_resolver import resolve_url
+
+    answers = make_answers(2000)
+    urls = make_urls(2000)
+    card = engine.get_card_registry()[0]
+    results: Dict[str, Dict[str, float]] = {}
+
+    def classify_all():
+        for a in answers:
+            engine.classify_answer(a)
+
+    def feedback_all():
+        for a in answers:
+            engine.build_feedback(a, card)
+
+    def sanitize_all():
+        for u in urls:
+            engine.sanitize_url(u, "https://default.example.org/a.png")
+
+    def normalize_all():
+        for u in urls:
+            engine.normalize_youtube_url(u)
+
+    class_answers = answers[:30]
+    class_cards = [card.id] * len(class_answers)
+    index = engine.get_answer_index()
+
+    def similarity_class():
+        index.score_batch(class_answers, class_cards)
+
+    def normalize_cold():
+        resolve_url.cache_clear()
+        normalize_all()
+
+    results["micro.classify_answer"] = measure(classify_all, len(answers), rounds)
+    results["micro.build_feedback"] = measure(feedback_all, len(answers), rounds)
+    results["micro.similarity_class_of_30"] = measure(similarity_class, 1, rounds * 10)
+    results["micro.sanitize_url"] = measure(sanitize_all, len(urls), rounds)
+    results["micro.normalize_youtube_url"] = measure(normalize_all, len(urls), rounds)
+    results["micro.normalize_youtube_url_cold"] = measure(normalize_cold, len(urls), rounds)
+    return results
+
+
+# -----------------------------
+# e2e (AppTest) 벤치마크
+# -----------------------------
+def run_e2e(rounds: int) -> Dict[str, Dict[str, float]]:
+    from streamlit.testing.v1 import AppTest
+
+    def new_app() -> AppTest:
+        return AppTest.from_file(str(APP_PATH), default_timeout=60)
+
+    def timed_steps() -> Dict[str, float]:
+        at = new_app()
+        steps = {}
+        started = time.perf_counter()
+        at.run()
+        steps["e2e.initial_load"] = time.perf_counter() - started
+
+        # 화면 배치가 바뀌어도 같은 위젯을 누르도록 위치가 아니라 key로 찾습니다.
+        answer = next(w for w in at.text_area if (w.key or "").startswith(ANSWER_KEY_PREFIX))
+        card_id = answer.key[len(ANSWER_KEY_PREFIX):]
+        answer.input("지구가 태양에서 멀어져서 추워지고 자전축이 기울어져서")
+        started = time.perf_counter()
+        at.button(key=f"fb_btn_{card_id}").click().run()
+        steps["e2e.feedback_click"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        at.button(key=f"res_btn_{card_id}").click().run()
+        steps["e2e.resources_click"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        at.button(key=f"next_btn_{card_id}").click().run()
+        steps["e2e.card_navigation"] = time.perf_counter() - started
+
+        if at.exception:
+            raise RuntimeError(f"앱 실행 중 오류: {at.exception}")
+        return steps
+
+    # 저장소/이미지 캐시가 작업 폴더에 생기므로 임시 폴더에서 실행합니다.
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            timed_steps()  # 준비 운동: 모듈 import, cache_resource 생성
+            samples: Dict[str, List[float]] = {}
+            for _ in range(rounds):
+                for name, seconds in timed_steps().items():
+                    samples.setdefault(name, []).append(seconds * 1e6)
+        finally:
+            os.chdir(cwd)
+
+    return {
+        name: {
+            "median_us": statistics.median(values),
+            "min_us": min(values),
+            "max_us": max(values),
+            "rounds": rounds,
+            "ops": 1,
+        }
+        for name, values in samples.items()
+    }
+
+
+# -----------------------------
+# 기준(baseline) 비교
+# -----------------------------
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """기준보다 threshold배 넘게 느려진 항목을 돌려줍니다."""
+    regressions = []
+    base = baseline.get("benchmarks", {})
+    for name, stats in results["benchmarks"].items():
+        if name not in base:
+            continue
+        old = base[name]["median_us"]
+        new = stats["median_us"]
+        ratio = new / old if old else float("inf")
+        stats["baseline_median_us"] = old
+        stats["ratio"] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append(f"{name}: {old:.1f}µs → {new:.1f}µs ({ratio:.2f}배)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="규칙 엔진/URL 유틸/화면 다시 그리기 벤치마크")
+    parser.add_argument("--only", choices=["micro", "e2e"], default=None)
+    parser.add_argument("--rounds", type=int, default=7, help="micro 반복 횟수")
+    parser.add_argument("--e2e-rounds", type=int, default=5, help="e2e 반복 횟수")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="결과 JSON 경로")
+    parser.add_argument("--baseline", type=Path, default=None, help="비교할 기준 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="허용하는 느려짐 배수")
+    args = parser.parse_args(argv)
+
+    benchmarks: Dict[str, Dict[str, float]] = {}
+    if args.only in (None, "micro"):
+        benchmarks.update(run_micro(args.rounds))
+    if args.only in (None, "e2e"):
+        benchmarks.update(run_e2e(args.e2e_rounds))
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": benchmarks,
+    }
+
+    regressions: List[str] = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+
+    for name, stats in benchmarks.items():
+        extra = f"  (기준 대비 {stats['ratio']:.2f}배)" if "ratio" in stats else ""
+        print(f"{name:40s} {stats['median_us']:12.2f} µs{extra}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if regressions:
+        print("\n기준보다 느려진 항목:", file=sys.stderr)
+        for line in regressions:
+            print(f"  - {line}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
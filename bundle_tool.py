@@ -0,0 +1,254 @@
+"""
+오프라인 수업 묶음 만들기/풀기/살펴보기
+
+    # 카탈로그의 모든 단원 + 저장된 자료 URL + 이미지/직접 링크 영상을 묶음 하나로
+    python bundle_tool.py pack seasons.lessonpack
+    python bundle_tool.py pack seasons.lessonpack --unit seasons --unit seasons2
+
+    # 묶음을 다시 편집할 수 있는 파일로 (lessons/*.json, config.json, 이미지 캐시)
+    python bundle_tool.py unpack seasons.lessonpack -o 풀어둔_폴더
+
+    python bundle_tool.py info seasons.lessonpack
+
+- YouTube/Vimeo/구글 문서처럼 삽입해서 보여 주는 자료는 URL만 담습니다.
+- 받지 못한 자료는 경고만 남기고 URL만 담습니다. (앱에서는 원격 URL로 보여 줌)
+- 미디어를 먼저 쓰고 index.json을 맨 마지막에 써서, 쓰다 만 묶음은 열리지 않습니다.
+"""
+from typing import Dict, List, Optional
+from pathlib import Path
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+import requests
+
+from image_cache import IMAGE_CACHE_DIR, THUMB_WIDTH, ImageCache, make_thumbnail, url_key
+from lesson_bundle import BUNDLE_FORMAT, INDEX_NAME, LessonBundle
+from lesson_catalog import BUILTIN_UNIT_ID, LESSONS_DIR, UNIT_ID_RE, LessonCatalog, read_unit_file
+from lesson_engine import get_default_cards, load_resource_urls, sanitize_url
+from resource_store import write_config_json
+from url_resolver import STRATEGY_IMAGE, STRATEGY_VIDEO, resolve_url
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_VIDEO_BYTES = 200 * 1024 * 1024
+FETCH_TIMEOUT = 30.0  # 초
+
+
+def _media_name(url: str, suffix: str) -> str:
+    return f"media/{url_key(url)}.{suffix}"
+
+
+def _inside(root: Path, name: str) -> Path:
+    """묶음 목차의 이름을 root 아래 경로로 바꿉니다. root 밖(../, 절대 경로)을 가리키면 ValueError."""
+    target = (root / name).resolve()
+    if not target.is_relative_to(root.resolve()):
+        raise ValueError(f"묶음의 경로가 폴더 밖을 가리킵니다: {name!r}")
+    return target
+
+
+def _download_to(url: str, dst, max_bytes: int, session: requests.Session) -> str:
+    """url 을 dst(파일 객체)로 받고 Content-Type을 돌려줍니다. 너무 크면 ValueError."""
+    with session.get(url, timeout=FETCH_TIMEOUT, stream=True) as resp:
+        resp.raise_for_status()
+        size = 0
+        for chunk in resp.iter_content(256 * 1024):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"영상이 너무 큽니다 (상한 {max_bytes // (1024 * 1024)}MB)")
+            dst.write(chunk)
+        return resp.headers.get("Content-Type", "application/octet-stream")
+
+
+# -----------------------------
+# pack
+# -----------------------------
+def collect_units(catalog: LessonCatalog, unit_ids: Optional[List[str]]) -> List[Dict]:
+    """묶음에 넣을 단원 (카드는 단원 파일의 dict 그대로)."""
+    units = []
+    for info in catalog.units:
+        if unit_ids and info.id not in unit_ids:
+            continue
+        raw_cards = get_default_cards() if info.path is None else read_unit_file(info.path)[2]
+        units.append({"id": info.id, "title": info.title, "builtin": info.id == BUILTIN_UNIT_ID, "cards": raw_cards})
+    missing = set(unit_ids or ()) - {u["id"] for u in units}
+    if missing:
+        raise ValueError(f"카탈로그에 없는 단원입니다: {', '.join(sorted(missing))}")
+    return units
+
+
+def pack(out: Path, catalog: LessonCatalog, unit_ids: Optional[List[str]] = None,
+         images: Optional[ImageCache] = None, max_video_bytes: int = MAX_VIDEO_BYTES) -> Dict[str, int]:
+    """묶음을 만듭니다. 돌려주는 값은 (단원/카드/미디어/건너뛴 자료) 개수."""
+    units = collect_units(catalog, unit_ids)
+    saved = load_resource_urls()
+    images = images or ImageCache(IMAGE_CACHE_DIR)
+    session = requests.Session()
+
+    resource_urls: Dict[str, Dict[str, str]] = {}
+    media: Dict[str, Dict[str, str]] = {}
+    stats = {"units": len(units), "cards": 0, "media": 0, "skipped": 0}
+
+    out = Path(out)
+    tmp = out.with_name(out.name + ".tmp")
+    try:
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for unit in units:
+                registry = catalog.unit(unit["id"])
+                stats["cards"] += len(registry)
+                for card in registry.cards:
+                    for res in card.resources:
+                        url = sanitize_url(saved.get(card.id, {}).get(res.id, ""), res.default_url)
+                        if not url:
+                            continue
+                        resource_urls.setdefault(card.id, {})[res.id] = url
+                        resolved = resolve_url(url, res.type)
+                        if resolved.url in media or resolved.provider != "direct":
+                            continue
+                        try:
+                            if resolved.strategy == STRATEGY_IMAGE:
+                                original = images.fetch(resolved.url)
+                                entry = {"data": _media_name(resolved.url, "bin"), "content_type": original.content_type, "thumb": ""}
+                                zf.writestr(entry["data"], original.data)
+                                thumb = make_thumbnail(original.data, THUMB_WIDTH)
+                                if thumb is not None:
+                                    entry["thumb"] = _media_name(resolved.url, f"w{THUMB_WIDTH}.webp")
+                                    zf.writestr(entry["thumb"], thumb)
+                            elif resolved.strategy == STRATEGY_VIDEO:
+                                with tempfile.TemporaryFile() as buf:
+                                    content_type = _download_to(resolved.url, buf, max_video_bytes, session)
+                                    buf.seek(0)
+                                    entry = {"data": _media_name(resolved.url, "bin"), "content_type": content_type, "thumb": ""}
+                                    with zf.open(entry["data"], "w", force_zip64=True) as dst:
+                                        shutil.copyfileobj(buf, dst, 1024 * 1024)
+                            else:
+                                continue
+                        except (requests.RequestException, ValueError, OSError) as e:
+                            _LOGGER.warning("자료를 받지 못해 URL만 담습니다: %s (%s)", resolved.url, e)
+                            stats["skipped"] += 1
+                            continue
+                        media[resolved.url] = entry
+                        stats["media"] += 1
+
+            index = {
+                "format": BUNDLE_FORMAT,
+                "created_at": time.time(),
+                "units": units,
+                "resource_urls": resource_urls,
+                "media": media,
+            }
+            zf.writestr(INDEX_NAME, json.dumps(index, ensure_ascii=False))
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, out)
+    return stats
+
+
+# -----------------------------
+# unpack
+# -----------------------------
+def unpack(bundle: LessonBundle, out_dir: Path, image_cache_dir: Optional[Path] = None) -> Dict[str, int]:
+    """
+    out_dir 에 lessons/<단원>.json, config.json, media/ 를 씁니다.
+    기본 수업은 코드에 들어 있으므로 단원 파일로 쓰지 않습니다.
+    image_cache_dir 를 주면 이미지를 그 캐시에도 넣어서 원격 없이도 보이게 합니다.
+    """
+    out_dir = Path(out_dir)
+    lessons = out_dir / LESSONS_DIR
+    media_dir = out_dir / "media"
+    # 묶음 목차의 이름은 믿지 않습니다. 쓰기 전에 모든 경로가 출력 폴더 안인지 먼저 확인합니다.
+    unit_paths = []
+    for unit in bundle.units:
+        if unit.builtin:
+            continue
+        if not UNIT_ID_RE.match(unit.id):
+            raise ValueError(f"묶음의 단원 id가 올바르지 않습니다: {unit.id!r}")
+        unit_paths.append((unit, _inside(lessons, f"{unit.id}.json")))
+    media_paths = {url: _inside(media_dir, entry.data.removeprefix("media/")) for url, entry in bundle.media.items()}
+
+    lessons.mkdir(parents=True, exist_ok=True)
+    stats = {"units": 0, "media": 0}
+    for unit, path in unit_paths:
+        path.write_text(json.dumps({"id": unit.id, "title": unit.title, "cards": unit.cards}, ensure_ascii=False, indent=2), encoding="utf-8")
+        stats["units"] += 1
+    write_config_json(out_dir / "config.json", bundle.resource_urls)
+
+    images = ImageCache(image_cache_dir) if image_cache_dir is not None else None
+    media_dir.mkdir(exist_ok=True)
+    listing: Dict[str, Dict[str, str]] = {}
+    for url, entry in bundle.media.items():
+        target = media_paths[url]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(bundle.read(entry.data))
+        listing[url] = {"file": target.relative_to(out_dir.resolve()).as_posix(), "content_type": entry.content_type}
+        if images is not None and (entry.thumb or entry.content_type.startswith("image/")):
+            thumb = bundle.thumbnail(url)
+            images.seed(url, bytes(bundle.read(entry.data)), entry.content_type,
+                        bytes(thumb) if thumb is not None else None, checked_at=bundle.created_at)
+        stats["media"] += 1
+    (media_dir / "media.json").write_text(json.dumps(listing, ensure_ascii=False, indent=2), encoding="utf-8")
+    return stats
+
+
+def describe(bundle: LessonBundle) -> List[str]:
+    lines = [f"{bundle.path} (만든 시각 {time.strftime('%Y-%m-%d %H:%M', time.localtime(bundle.created_at))})"]
+    for unit in bundle.units:
+        lines.append(f"  단원 {unit.id}: {unit.title} (카드 {len(unit.cards)}장{', 기본 수업' if unit.builtin else ''})")
+    originals = sum(len(bundle.read(m.data)) for m in bundle.media.values())
+    thumbs = sum(len(bundle.read(m.thumb)) for m in bundle.media.values() if m.thumb)
+    lines.append(f"  미디어 {len(bundle.media)}개 (원본 {originals / 1024:,.0f}KB, 썸네일 {thumbs / 1024:,.0f}KB)")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="오프라인 수업 묶음 만들기/풀기")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("pack", help="카탈로그와 자료를 묶음 하나로")
+    p.add_argument("bundle", type=Path)
+    p.add_argument("--unit", action="append", default=None, help="넣을 단원 id (여러 번 쓸 수 있음, 생략하면 전체)")
+    p.add_argument("--lessons-dir", type=Path, default=LESSONS_DIR)
+    p.add_argument("--max-video-mb", type=int, default=MAX_VIDEO_BYTES // (1024 * 1024))
+
+    u = sub.add_parser("unpack", help="묶음을 편집할 수 있는 파일로")
+    u.add_argument("bundle", type=Path)
+    u.add_argument("-o", "--output", type=Path, default=Path("."))
+    u.add_argument("--image-cache", type=Path, default=None, help="이미지를 넣어 둘 캐시 폴더 (생략하면 <출력>/.cache/images)")
+
+    i = sub.add_parser("info", help="묶음 내용 보기")
+    i.add_argument("bundle", type=Path)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+    if args.command == "pack":
+        catalog = LessonCatalog(args.lessons_dir, index_path=None)
+        stats = pack(args.bundle, catalog, args.unit, max_video_bytes=args.max_video_mb * 1024 * 1024)
+        print(f"{args.bundle}: 단원 {stats['units']}개, 카드 {stats['cards']}장, 미디어 {stats['media']}개 (받지 못한 자료 {stats['skipped']}개)")
+        return 0
+
+    bundle = LessonBundle(args.bundle)
+    try:
+        if args.command == "unpack":
+            cache_dir = args.image_cache or args.output / IMAGE_CACHE_DIR
+            stats = unpack(bundle, args.output, cache_dir)
+            print(f"{args.output}: 단원 파일 {stats['units']}개, 미디어 {stats['media']}개")
+        else:
+            print("\n".join(describe(bundle)))
+    except ValueError as e:
+        print(f"묶음을 풀지 않았습니다: {e}", file=sys.stderr)
+        return 1
+    finally:
+        bundle.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+from dataclasses import dataclass
+from types import MappingProxyType
+
+
+# -----------------------------
+# 읽기 전용 카드 레코드
+# -----------------------------
+def _freeze(value: Any) -> Any:
+    """dict/list를 읽기 전용(MappingProxyType/tuple)으로 바꿉니다."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class Resource:
+    id: str
+    title: str
+    type: str
+    default_url: str = ""
+    description: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class TeacherNotes:
+    extra_questions: Tuple[str, ...] = ()
+    teacher_point: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class Card:
+    id: str
+    stage: str
+    label: str
+    question: str
+    expected_answers: Tuple[str, ...]
+    feedback_rules: Mapping[str, Any]
+    resources: Tuple[Resource, ...]
+    teacher_notes: TeacherNotes
+
+    @property
+    def display_label(self) -> str:
+        return f"[{self.stage}] {self.label}"
+
+    @classmethod
+    def from_dict(cls, raw: Dict) -> "Card":
+        notes = raw.get("teacher_notes") or {}
+        return cls(
+            id=raw["id"],
+            stage=raw.get("stage", ""),
+            label=raw.get("label", ""),
+            question=raw.get("question", ""),
+            expected_answers=tuple(raw.get("expected_answers", [])),
+            feedback_rules=_freeze(raw.get("feedback_rules") or {}),
+            resources=tuple(
+                Resource(
+                    id=r["id"],
+                    title=r.get("title", ""),
+                    type=(r.get("type") or "").lower(),
+                    default_url=r.get("default_url", ""),
+                    description=r.get("description", ""),
+                )
+                for r in raw.get("resources", [])
+            ),
+            teacher_notes=TeacherNotes(
+                extra_questions=tuple(notes.get("extra_questions", [])),
+                teacher_point=notes.get("teacher_point", ""),
+            ),
+        )
+
+
+# -----------------------------
+# 카드 색인 (프로세스 전체에서 하나만 공유)
+# -----------------------------
+class CardRegistry:
+    """
+    카드 목록과 색인(카드 id, 단계, 자료 id)을 한 번 만들어 두고 모든 세션이 함께 읽습니다.
+    세션에는 선택한 카드 번호만 저장하면 됩니다.
+    """
+
+    __slots__ = ("cards", "labels", "_index_by_id", "_by_stage", "_resources")
+
+    def __init__(self, cards: Iterable[Card]):
+        self.cards: Tuple[Card, ...] = tuple(cards)
+        self.labels: Tuple[str, ...] = tuple(c.display_label for c in self.cards)
+        self._index_by_id: Dict[str, int] = {}
+        by_stage: Dict[str, List[Card]] = {}
+        self._resources: Dict[Tuple[str, str], Resource] = {}
+
+        for i, card in enumerate(self.cards):
+            if card.id in self._index_by_id:
+                raise ValueError(f"카드 id가 중복되었습니다: {card.id}")
+            self._index_by_id[card.id] = i
+            by_stage.setdefault(card.stage, []).append(card)
+            for res in card.resources:
+                self._resources[(card.id, res.id)] = res
+
+        self._by_stage: Dict[str, Tuple[Card, ...]] = {k: tuple(v) for k, v in by_stage.items()}
+
+    @classmethod
+    def from_dicts(cls, raw_cards: Iterable[Dict]) -> "CardRegistry":
+        return cls(Card.from_dict(c) for c in raw_cards)
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __getitem__(self, index: int) -> Card:
+        return self.cards[index]
+
+    def get(self, card_id: str) -> Card:
+        return self.cards[self._index_by_id[card_id]]
+
+    def index_of(self, card_id: str) -> int:
+        return self._index_by_id[card_id]
+
+    def __contains__(self, card_id: str) -> bool:
+        return card_id in self._index_by_id
+
+    def stages(self) -> Tuple[str, ...]:
+        return tuple(self._by_stage)
+
+    def by_stage(self, stage: str) -> Tuple[Card, ...]:
+        return self._by_stage.get(stage, ())
+
+    def resource(self, card_id: str, res_id: str) -> Resource:
+        return self._resources[(card_id, res_id)]
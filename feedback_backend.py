@@ -0,0 +1,335 @@
+"""
+피드백 백엔드 (규칙 엔진 / LLM)
+
+    LESSON_FEEDBACK_BACKEND=llm GOOGLE_API_KEY=... streamlit run app.py
+    LESSON_LLM_URL=http://127.0.0.1:8790 python feedback_backend.py "거리가 가까워져서요" --repeat 3
+
+- RuleFeedbackBackend: 지금까지의 build_feedback 그대로. (기본값, 네트워크 없음)
+- LLMFeedbackBackend: Gemini REST API(streamGenerateContent, SSE)에 물어 보고 글자가 오는 대로 돌려줍니다.
+  · 요청은 백그라운드 이벤트 루프 하나에서 aiohttp 세션 하나(연결 풀)로 보냅니다.
+  · (카드 id, 정리한 답) 이 같으면 캐시에서 바로 돌려줍니다. 진행 중인 같은 요청은 한 번만 보내고 함께 받습니다.
+  · 첫 글자가 FIRST_TOKEN_TIMEOUT 안에 오지 않거나 전체가 FEEDBACK_BUDGET 안에 끝나지 않으면
+    규칙 피드백으로 바꿔 보여 줍니다. 요청은 뒤에서 끝까지 받아 캐시를 채웁니다.
+- LESSON_LLM_URL 로 주소를 바꿀 수 있어서 로컬 스텁 서버로 시험할 수 있습니다.
+"""
+from typing import Dict, Iterator, List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import aiohttp
+
+from answer_similarity import SimilarityMatch
+from card_registry import Card
+from korean_text import normalize_korean
+from lesson_engine import build_feedback, classify_answer
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKEND_NAME = os.environ.get("LESSON_FEEDBACK_BACKEND", "rules").strip().lower()
+LLM_URL = os.environ.get("LESSON_LLM_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+LLM_MODEL = os.environ.get("LESSON_LLM_MODEL", "gemini-1.5-flash")
+LLM_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
+
+FIRST_TOKEN_TIMEOUT = 2.0  # 초. 첫 글자를 기다리는 최대 시간
+FEEDBACK_BUDGET = 8.0  # 초. 화면이 LLM 피드백 전체를 기다리는 최대 시간
+LLM_TIMEOUT = 30.0  # 초. 뒤에서 계속 받는 요청 하나의 상한
+LLM_MAX_CONNECTIONS = 16
+CACHE_SIZE = 2048
+
+SOURCE_RULES = "rules"
+SOURCE_LLM = "llm"
+SOURCE_CACHE = "cache"
+
+PROMPT_TEMPLATE = """너는 초등학생 과학 수업의 친절한 선생님이야. 학생의 답에 한국어로 짧게(4~6문장) 피드백해 줘.
+학생의 생각을 먼저 인정하고, 틀린 부분은 부드럽게 바로잡고, 마지막에 스스로 생각해 볼 질문을 하나 남겨.
+
+수업 단계: {stage}
+발문: {question}
+학생 답: {answer}
+자동 분류: {category}
+
+참고용 규칙 피드백 (내용이 어긋나지 않게 참고만 해):
+{reference}"""
+
+
+@dataclass(frozen=True)
+class FeedbackDraft:
+    text: str  # 지금까지 받은 전체 본문 (조각이 아니라 누적)
+    source: str  # SOURCE_RULES / SOURCE_LLM / SOURCE_CACHE
+    done: bool
+
+
+def cache_key(card_id: str, answer: str) -> str:
+    """띄어쓰기/대소문자/맞춤법 실수/끝 문장부호만 다른 답은 같은 키가 됩니다."""
+    text = " ".join(normalize_korean(answer).split()).rstrip(".!?~ ")
+    return f"{card_id}\x00{text}"
+
+
+# -----------------------------
+# 규칙 엔진
+# -----------------------------
+class RuleFeedbackBackend:
+    name = SOURCE_RULES
+
+    def stream(self, answer: str, card: Card, match: Optional[SimilarityMatch] = None) -> Iterator[FeedbackDraft]:
+        yield FeedbackDraft(build_feedback(answer, card, match), SOURCE_RULES, True)
+
+    def close(self) -> None:
+        pass
+
+
+# -----------------------------
+# LLM
+# -----------------------------
+class FeedbackCache:
+    """(카드, 정리한 답) → 완성된 LLM 피드백. 오래 쓰지 않은 것부터 지웁니다."""
+
+    def __init__(self, max_entries: int = CACHE_SIZE):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._items.get(key)
+            if text is not None:
+                self._items.move_to_end(key)
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            self._items[key] = text
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class _Generation:
+    """진행 중인 LLM 응답 하나. 이벤트 루프가 조각을 붙이고, 여러 세션이 같은 응답을 따라 읽습니다."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error = ""
+        self._cond = threading.Condition()
+
+    def append(self, chunk: str) -> None:
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def finish(self, error: str = "") -> None:
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def follow(self, first_deadline: float, deadline: float) -> Iterator[str]:
+        """새 조각이 올 때마다 누적 본문을 돌려줍니다. 시간 제한이 지나면 그냥 멈춥니다."""
+        seen = 0
+        while True:
+            with self._cond:
+                while len(self.chunks) == seen and not self.done:
+                    limit = first_deadline if seen == 0 else deadline
+                    remaining = limit - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    self._cond.wait(remaining)
+                if len(self.chunks) == seen:
+                    return
+                seen = len(self.chunks)
+                text = "".join(self.chunks)
+            yield text
+
+
+class LLMFeedbackBackend:
+    name = SOURCE_LLM
+
+    def __init__(
+        self,
+        api_key: str = LLM_API_KEY,
+        base_url: str = LLM_URL,
+        model: str = LLM_MODEL,
+        first_token_timeout: float = FIRST_TOKEN_TIMEOUT,
+        budget: float = FEEDBACK_BUDGET,
+        cache: Optional[FeedbackCache] = None,
+    ):
+        self.api_key = api_key
+        self.endpoint = f"{base_url.rstrip('/')}/v1beta/models/{model}:streamGenerateContent?alt=sse"
+        self.first_token_timeout = first_token_timeout
+        self.budget = budget
+        self.cache = cache if cache is not None else FeedbackCache()
+        self._inflight: Dict[str, _Generation] = {}
+        self._lock = threading.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="feedback-llm", daemon=True)
+        self._thread.start()
+
+    def stream(self, answer: str, card: Card, match: Optional[SimilarityMatch] = None) -> Iterator[FeedbackDraft]:
+        """
+        캐시 → 진행 중인 같은 요청 → 새 요청 순서로 찾습니다.
+        시간 제한 안에 끝나지 않거나 실패하면 마지막에 규칙 피드백을 돌려줍니다.
+        """
+        started = time.monotonic()
+        if not answer or not answer.strip():
+            yield FeedbackDraft(build_feedback(answer, card, match), SOURCE_RULES, True)
+            return
+        key = cache_key(card.id, answer)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield FeedbackDraft(cached, SOURCE_CACHE, True)
+            return
+
+        # 캐시에 없을 때만 규칙 피드백을 만듭니다. (프롬프트의 참고 문단이자 시간 초과 때 대신 보여 줄 본문)
+        reference = build_feedback(answer, card, match)
+        generation = self._start(key, self._prompt(answer, card, reference))
+        deadline = started + self.budget
+        text = ""
+        for text in generation.follow(min(started + self.first_token_timeout, deadline), deadline):
+            yield FeedbackDraft(text, SOURCE_LLM, False)
+        if generation.done and not generation.error and text:
+            yield FeedbackDraft(text, SOURCE_LLM, True)
+            return
+        if generation.error:
+            _LOGGER.warning("LLM 피드백 실패, 규칙 피드백으로 대신합니다: %s", generation.error)
+        yield FeedbackDraft(reference, SOURCE_RULES, True)
+
+    def _prompt(self, answer: str, card: Card, reference: str) -> str:
+        return PROMPT_TEMPLATE.format(
+            stage=card.stage, question=card.question, answer=answer.strip(),
+            category=classify_answer(answer), reference=reference,
+        )
+
+    def _start(self, key: str, prompt: str) -> _Generation:
+        with self._lock:
+            generation = self._inflight.get(key)
+            if generation is not None:
+                return generation
+            generation = self._inflight[key] = _Generation()
+        asyncio.run_coroutine_threadsafe(self._generate(key, prompt, generation), self._loop)
+        return generation
+
+    async def _client(self) -> aiohttp.ClientSession:
+        # 이벤트 루프 안에서 만들어야 하므로 첫 요청 때 만듭니다.
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=LLM_MAX_CONNECTIONS, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"x-goog-api-key": self.api_key, "Content-Type": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=LLM_TIMEOUT, sock_connect=self.first_token_timeout),
+            )
+        return self._session
+
+    async def _generate(self, key: str, prompt: str, generation: _Generation) -> None:
+        body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        error = "중단됨"
+        try:
+            session = await self._client()
+            async with session.post(self.endpoint, json=body) as resp:
+                if resp.status != 200:
+                    raise aiohttp.ClientResponseError(
+                        resp.request_info, resp.history, status=resp.status, message=(await resp.text())[:200],
+                    )
+                async for raw in resp.content:
+                    line = raw.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = _chunk_text(json.loads(line[5:]))
+                    if chunk:
+                        generation.append(chunk)
+            error = "" if generation.chunks else "빈 응답"
+        except asyncio.TimeoutError:
+            error = "시간 초과"
+        except (aiohttp.ClientError, ValueError) as e:
+            error = str(e) or type(e).__name__
+        except Exception as e:  # 예상 못 한 응답 모양 등: 같은 답을 기다리는 세션이 멈추지 않게 규칙 피드백으로
+            _LOGGER.exception("LLM 응답을 처리하지 못했습니다")
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            if not error:
+                self.cache.put(key, "".join(generation.chunks))
+            with self._lock:
+                self._inflight.pop(key, None)
+            generation.finish(error)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def close(self) -> None:
+        async def _close():
+            if self._session is not None:
+                await self._session.close()
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def _chunk_text(payload: Dict) -> str:
+    """streamGenerateContent 한 조각에서 본문만 꺼냅니다."""
+    candidates = payload.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(p.get("text", "") for p in parts)
+
+
+def make_feedback_backend(name: str = BACKEND_NAME):
+    """LESSON_FEEDBACK_BACKEND 값으로 백엔드를 고릅니다. LLM 키가 없으면 규칙 엔진을 씁니다."""
+    if name == SOURCE_LLM:
+        if LLM_API_KEY or LLM_URL.startswith(("http://127.0.0.1", "http://localhost")):
+            return LLMFeedbackBackend()
+        _LOGGER.warning("GOOGLE_API_KEY 가 없어 규칙 피드백을 씁니다.")
+    elif name != SOURCE_RULES:
+        _LOGGER.warning("알 수 없는 피드백 백엔드 %r, 규칙 피드백을 씁니다.", name)
+    return RuleFeedbackBackend()
+
+
+# -----------------------------
+# 명령줄 (스텁/실제 서버로 시험)
+# -----------------------------
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    from lesson_engine import get_card_registry
+
+    parser = argparse.ArgumentParser(description="LLM 피드백 백엔드 시험 (LESSON_LLM_URL 로 스텁 서버 지정)")
+    parser.add_argument("answer")
+    parser.add_argument("--card", default=None, help="카드 id (생략하면 첫 카드)")
+    parser.add_argument("--repeat", type=int, default=1, help="같은 답을 몇 번 물을지 (두 번째부터는 캐시)")
+    parser.add_argument("--budget", type=float, default=FEEDBACK_BUDGET)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+    registry = get_card_registry()
+    card = registry.get(args.card) if args.card else registry[0]
+    backend = LLMFeedbackBackend(budget=args.budget)
+    try:
+        for i in range(args.repeat):
+            started = time.perf_counter()
+            first = None
+            draft = None
+            for draft in backend.stream(args.answer, card):
+                if first is None:
+                    first = time.perf_counter() - started
+            total = time.perf_counter() - started
+            print(f"[{i + 1}] {draft.source}: 첫 글자 {first * 1000:.0f}ms, 전체 {total * 1000:.0f}ms")
+            if i == 0:
+                print(draft.text)
+    finally:
+        backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+피드백 규칙 (카드별 데이터 → 미리 만든 본문 표)
+
+카드의 feedback_rules 는 아래처럼 적습니다. 모두 생략할 수 있습니다.
+
+    {
+        "distance": ["이 카드에서 거리 답변에 보여 줄 문단", "..."],   # 분류별 문단 (기본 규칙을 덮어씀)
+        "header": "“{answer}”라는 생각 좋아요!",                     # 답을 인용하는 첫 문단
+        "similar": "“{expected}”와 비슷해요.",                       # 예상 답변과 비슷할 때 덧붙이는 문단
+        "fallback": "other",                                          # 규칙이 없는 분류에 쓸 분류
+    }
+
+문단에는 {label}, {question}, {stage} 를 쓸 수 있고 불러올 때 한 번만 채워집니다.
+(카드, 분류)마다 본문을 미리 이어 붙여 두므로, 요청마다 새로 만드는 것은 답을 인용하는 첫 문단뿐입니다.
+"""
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
+import threading
+
+from card_registry import Card
+
+HEADER_KEY = "header"
+SIMILAR_KEY = "similar"
+FALLBACK_KEY = "fallback"
+EMPTY_CATEGORY = "empty"  # 답이 비었을 때의 분류. 첫 문단 없이 본문만 씁니다.
+DEFAULT_FALLBACK = "other"
+
+_RESERVED_KEYS = (HEADER_KEY, SIMILAR_KEY, FALLBACK_KEY)
+
+Paragraphs = Union[str, Sequence[str]]
+
+
+def _paragraphs(value: Paragraphs, where: str) -> Tuple[str, ...]:
+    if isinstance(value, str):
+        return (value,)
+    if isinstance(value, (list, tuple)) and all(isinstance(p, str) for p in value):
+        return tuple(value)
+    raise ValueError(f"피드백 문단은 문자열이나 문자열 목록이어야 합니다: {where}")
+
+
+def _fill(template: str, card: Card, where: str) -> str:
+    try:
+        return template.format(label=card.label, question=card.question, stage=card.stage)
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"피드백 문단의 자리 표시자가 올바르지 않습니다: {where} ({e})") from None
+
+
+class FeedbackBook:
+    """
+    모든 카드의 (분류 → 본문) 표를 한 번 만들어 두고 모든 세션이 함께 읽습니다.
+    카드 규칙 → 기본 규칙 → 카드/기본 fallback 분류 순서로 찾습니다.
+    나중에 여는 단원의 카드는 처음 쓸 때 넣으므로, 넣기는 잠금 안에서 한 번만 합니다.
+    """
+
+    __slots__ = ("categories", "_defaults", "_header", "_similar_default", "_bodies", "_headers", "_similar", "_lock")
+
+    def __init__(
+        self,
+        cards: Iterable[Card],
+        default_rules: Mapping[str, Paragraphs],
+        header: str,
+        similar: str,
+    ):
+        defaults = {
+            cat: _paragraphs(v, f"기본 규칙 {cat}")
+            for cat, v in default_rules.items()
+            if cat not in _RESERVED_KEYS
+        }
+        if DEFAULT_FALLBACK not in defaults:
+            raise ValueError(f"기본 규칙에 '{DEFAULT_FALLBACK}' 분류가 있어야 합니다.")
+        self.categories: Tuple[str, ...] = tuple(defaults)
+        self._defaults = defaults
+        self._header = header
+        self._similar_default = similar
+        self._bodies: Dict[Tuple[str, str], str] = {}
+        self._headers: Dict[str, str] = {}
+        self._similar: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for card in cards:
+            self.add(card)
+
+    def add(self, card: Card) -> None:
+        """카드 하나의 규칙을 본문 표에 넣습니다. 이미 들어 있는 카드면 그대로 둡니다."""
+        with self._lock:
+            if card.id not in self._headers:
+                self._add(card)
+
+    def _add(self, card: Card) -> None:
+        defaults, header, similar = self._defaults, self._header, self._similar_default
+        rules = card.feedback_rules
+        own = {
+            cat: _paragraphs(v, f"{card.id}.{cat}")
+            for cat, v in rules.items()
+            if cat not in _RESERVED_KEYS
+        }
+        merged = {**defaults, **own}
+        fallback = rules.get(FALLBACK_KEY, DEFAULT_FALLBACK)
+        if fallback not in merged:
+            raise ValueError(f"{card.id}: fallback 분류 '{fallback}'의 규칙이 없습니다.")
+
+        # 검사/채우기가 끝난 뒤에 표에 넣어서, 규칙이 틀린 카드가 반쯤 들어가지 않게 합니다.
+        bodies = {
+            (card.id, cat): "\n\n".join(_fill(p, card, f"{card.id}.{cat}") for p in paragraphs)
+            for cat, paragraphs in merged.items()
+        }
+        # 규칙이 없는 분류는 fallback 본문을 같이 씁니다.
+        bodies[(card.id, FALLBACK_KEY)] = bodies[(card.id, fallback)]
+        similar_text = self._checked(rules.get(SIMILAR_KEY, similar), f"{card.id}.{SIMILAR_KEY}", expected="")
+        header_text = self._checked(rules.get(HEADER_KEY, header), f"{card.id}.{HEADER_KEY}", answer="")
+        self._bodies.update(bodies)
+        self._similar[card.id] = similar_text
+        # _headers 에 들어 있으면 그 카드의 표가 다 만들어진 것으로 봅니다. 그래서 맨 마지막에 넣습니다.
+        self._headers[card.id] = header_text
+
+    @staticmethod
+    def _checked(template: str, where: str, **fields: str) -> str:
+        """요청 때 채울 문단({answer}/{expected})을 불러올 때 미리 한 번 채워 봅니다."""
+        try:
+            template.format(**fields)
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"피드백 문단의 자리 표시자가 올바르지 않습니다: {where} ({e})") from None
+        return template
+
+    def body(self, card_id: str, category: str) -> str:
+        """미리 만든 본문. 규칙이 없는 분류면 fallback 본문."""
+        body = self._bodies.get((card_id, category))
+        if body is None:
+            body = self._bodies[(card_id, FALLBACK_KEY)]
+        return body
+
+    def render(self, card: Card, category: str, answer: str, expected: Optional[str] = None) -> str:
+        """
+        첫 문단(답 인용)만 새로 만들고 미리 만든 본문을 붙입니다.
+        expected 를 주면 예상 답변과 비슷하다는 문단을 덧붙입니다.
+        """
+        if card.id not in self._headers:  # 잠금 없이 먼저 보고, 처음 쓰는 카드만 잠금 안에서 넣습니다.
+            self.add(card)
+        body = self.body(card.id, category)
+        if category != EMPTY_CATEGORY:
+            body = self._headers[card.id].format(answer=answer) + "\n\n" + body
+        if expected is not None:
+            body += "\n\n" + self._similar[card.id].format(expected=expected)
+        return body
@@ -0,0 +1,287 @@
+"""
+자료 이미지 로컬 캐시 (URL 해시 기반)
+
+- 원격 이미지를 한 번만 받아 디스크에 저장하고, 폭을 줄인 WebP 썸네일을 만들어 둡니다.
+- 저장 용량이 상한을 넘으면 가장 오래 쓰지 않은 항목부터 지웁니다. (LRU)
+- 일정 시간이 지나면 ETag/Last-Modified로 원본이 바뀌었는지만 확인합니다. (304면 다시 받지 않음)
+"""
+from typing import Dict, Optional, Tuple
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+import requests
+
+IMAGE_CACHE_DIR = Path(".cache") / "images"
+IMAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+THUMB_WIDTH = 800
+REVALIDATE_AFTER = 60 * 60  # 초
+FETCH_TIMEOUT = 10.0  # 초
+MAX_IMAGE_BYTES = 25 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CachedImage:
+    data: bytes
+    content_type: str
+    path: Path
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def make_thumbnail(data: bytes, width: int) -> Optional[bytes]:
+    """폭이 width 이하인 WebP 썸네일을 만듭니다. 이미지가 아니거나 너무 크면(압축 폭탄) None."""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            if img.width > width:
+                height = max(1, round(img.height * width / img.width))
+                img = img.resize((width, height), Image.LANCZOS)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+            out = io.BytesIO()
+            img.save(out, format="WEBP", quality=80, method=4)
+            return out.getvalue()
+    except (UnidentifiedImageError, Image.DecompressionBombError, Image.DecompressionBombWarning, OSError, ValueError):
+        # DecompressionBombWarning 은 경고를 오류로 올린 환경(-W error)에서만 예외로 옵니다.
+        return None
+
+
+class ImageCache:
+    def __init__(
+        self,
+        root: Path = IMAGE_CACHE_DIR,
+        max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+        session: Optional[requests.Session] = None,
+        revalidate_after: float = REVALIDATE_AFTER,
+        timeout: float = FETCH_TIMEOUT,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        # 파일 경로 → (크기, 마지막 사용 시각)
+        self._entries: Dict[Path, Tuple[int, float]] = {}
+        self._total = 0
+        self._scan()
+
+    # --- 디스크 사용량 관리 ---
+    def _scan(self) -> None:
+        for p in self.root.rglob("*"):
+            if p.is_file() and not p.name.endswith(".tmp"):
+                st = p.stat()
+                self._entries[p] = (st.st_size, st.st_mtime)
+                self._total += st.st_size
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        base = self.root / key[:2]
+        return base / f"{key}.bin", base / f"{key}.json"
+
+    def _thumb_path(self, key: str, width: int) -> Path:
+        return self.root / key[:2] / f"{key}.w{width}.webp"
+
+    def _touch(self, path: Path) -> None:
+        now = time.time()
+        with self._lock:
+            if path in self._entries:
+                self._entries[path] = (self._entries[path][0], now)
+        try:
+            os.utime(path, (now, now))
+        except FileNotFoundError:
+            pass
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            old = self._entries.get(path, (0, 0.0))[0]
+            self._entries[path] = (len(data), time.time())
+            self._total += len(data) - old
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            for path, (size, _) in sorted(self._entries.items(), key=lambda kv: kv[1][1]):
+                if self._total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                del self._entries[path]
+                self._total -= size
+
+    def total_bytes(self) -> int:
+        return self._total
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _read(self, path: Path) -> Optional[bytes]:
+        """캐시 파일 바이트. 다른 키의 정리(_evict)가 그사이 지웠으면 None (캐시에 없는 것으로 봄)."""
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _fresh(self, meta: Dict) -> bool:
+        return bool(meta) and time.time() - meta.get("checked_at", 0) < self.revalidate_after
+
+    # --- 원본 가져오기 ---
+    def _read_meta(self, meta_path: Path) -> Dict:
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _download(self, url: str, meta: Dict, budget=None) -> Tuple[Optional[bytes], Dict]:
+        """
+        원본을 받습니다. 304(바뀌지 않음)면 (None, 갱신된 meta)를 돌려줍니다.
+        budget(resource_loader.ByteBudget)을 주면 받는 만큼 예약하고, 한도를 넘으면 ValueError.
+        """
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as resp:
+            if resp.status_code == 304:
+                return None, dict(meta, checked_at=time.time())
+            resp.raise_for_status()
+            declared = int(resp.headers.get("Content-Length") or 0)
+            if budget is not None and declared > budget.available():
+                raise ValueError(f"받기 용량 한도를 넘습니다: {url}")
+            chunks = []
+            size = 0
+            try:
+                for chunk in resp.iter_content(64 * 1024):
+                    if size + len(chunk) > MAX_IMAGE_BYTES:
+                        raise ValueError(f"이미지가 너무 큽니다: {url}")
+                    if budget is not None and not budget.try_acquire(len(chunk)):
+                        raise ValueError(f"받기 용량 한도를 넘습니다: {url}")
+                    size += len(chunk)
+                    chunks.append(chunk)
+            finally:
+                if budget is not None:
+                    budget.release(size)
+            new_meta = {
+                "url": url,
+                "etag": resp.headers.get("ETag", ""),
+                "last_modified": resp.headers.get("Last-Modified", ""),
+                "content_type": resp.headers.get("Content-Type", "application/octet-stream"),
+                "checked_at": time.time(),
+            }
+            return b"".join(chunks), new_meta
+
+    def fetch(self, url: str, budget=None) -> CachedImage:
+        """원본 바이트를 돌려줍니다. 캐시가 오래되었으면 조건부 요청으로 다시 확인합니다."""
+        key = url_key(url)
+        data_path, meta_path = self._paths(key)
+
+        with self._key_lock(key):
+            meta = self._read_meta(meta_path)
+            cached = data_path.exists() and bool(meta)
+            if cached and self._fresh(meta):
+                data = self._read(data_path)
+                if data is not None:
+                    self._touch(data_path)
+                    return CachedImage(data, meta.get("content_type", ""), data_path)
+                cached = False
+
+            try:
+                data, new_meta = self._download(url, meta if cached else {}, budget)
+            except (requests.RequestException, ValueError):
+                # 원격이 응답하지 않아도 예전에 받아 둔 파일이 있으면 그것을 씁니다.
+                stale = self._read(data_path) if cached else None
+                if stale is not None:
+                    self._touch(data_path)
+                    return CachedImage(stale, meta.get("content_type", ""), data_path)
+                raise
+
+            downloaded = data is not None
+            if not downloaded:
+                data = self._read(data_path)
+                if data is None:
+                    # 304를 받았지만 그사이 파일이 지워졌으면 조건 없이 다시 받습니다.
+                    data, new_meta = self._download(url, {}, budget)
+                    downloaded = True
+            if downloaded:
+                self._write(data_path, data)
+                # 원본이 바뀌었으니 예전 썸네일은 버립니다.
+                for thumb in data_path.parent.glob(f"{key}.w*.webp"):
+                    self._forget(thumb)
+            else:
+                self._touch(data_path)
+            self._write(meta_path, json.dumps(new_meta, ensure_ascii=False).encode("utf-8"))
+            return CachedImage(data, new_meta.get("content_type", ""), data_path)
+
+    def seed(self, url: str, data: bytes, content_type: str, thumb: Optional[bytes] = None,
+             width: int = THUMB_WIDTH, checked_at: float = 0.0) -> None:
+        """
+        다른 곳에서 받아 둔 원본(과 썸네일)을 캐시에 넣습니다. (수업 묶음 풀기 등)
+        checked_at 이 오래되었으면 다음 사용 때 조건부 요청으로 확인하고, 원격이 안 되면 넣어 둔 파일을 씁니다.
+        """
+        key = url_key(url)
+        data_path, meta_path = self._paths(key)
+        meta = {"url": url, "etag": "", "last_modified": "", "content_type": content_type, "checked_at": checked_at}
+        with self._key_lock(key):
+            self._write(data_path, data)
+            if thumb is not None:
+                self._write(self._thumb_path(key, width), thumb)
+            self._write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def _forget(self, path: Path) -> None:
+        with self._lock:
+            size = self._entries.pop(path, (0, 0.0))[0]
+            self._total -= size
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    # --- 썸네일 ---
+    def thumbnail(self, url: str, width: int = THUMB_WIDTH, budget=None) -> Optional[bytes]:
+        """
+        폭 width 이하의 WebP 썸네일 바이트를 돌려줍니다.
+        이미지로 변환할 수 없으면(SVG/HTML, 압축 폭탄 등) None. 원본을 그대로 화면에 넘기지 않습니다.
+        """
+        key = url_key(url)
+        thumb_path = self._thumb_path(key, width)
+        # 원본을 확인할 때가 아니면 만들어 둔 썸네일을 원본을 읽지 않고 바로 돌려줍니다.
+        if self._fresh(self._read_meta(self._paths(key)[1])):
+            thumb = self._read(thumb_path)
+            if thumb is not None:
+                self._touch(thumb_path)
+                return thumb
+
+        original = self.fetch(url, budget)
+        # 원본이 바뀌면 fetch()가 썸네일을 지우므로, 남아 있는 썸네일은 항상 최신입니다.
+        thumb = self._read(thumb_path)
+        if thumb is not None:
+            self._touch(thumb_path)
+            return thumb
+
+        thumb = make_thumbnail(original.data, width)
+        if thumb is None:
+            return None
+        self._write(thumb_path, thumb)
+        return thumb
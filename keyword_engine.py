@@ -0,0 +1,258 @@
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from collections import deque
+import json
+from pathlib import Path
+
+from korean_text import normalize_korean, to_jamo, tokens
+
+# -----------------------------
+# 키워드 표 (기본값 / keywords.json)
+# -----------------------------
+KEYWORDS_PATH = Path("keywords.json")
+
+# 범주 순서가 곧 동점일 때의 우선순위입니다.
+DEFAULT_KEYWORD_TABLE: Dict[str, List[str]] = {
+    "distance": ["거리", "가까워", "가까워서", "멀어", "멀어서", "distance"],
+    "tilt": ["자전축", "기울", "23.5", "23도", "축이기울어", "axis", "tilt"],
+    "angle": ["각도", "비스듬", "수직", "남중고도", "태양고도", "높이"],
+    "daylength": ["낮이", "밤이", "낮길이", "밤길이", "낮과밤", "해가길게", "해가짧게"],
+}
+
+
+def normalize_text(text: str) -> str:
+    """비교용으로 공백을 없애고 소문자로 바꿉니다."""
+    return text.replace(" ", "").lower()
+
+
+def load_keyword_table(path: Path) -> Dict[str, List[str]]:
+    """
+    JSON 파일에서 키워드 표를 불러옵니다.
+    - {"categories": {"distance": [...], ...}} 또는 {"distance": [...], ...} 형태 모두 지원
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    table = data.get("categories", data) if isinstance(data, dict) else {}
+    if not isinstance(table, dict) or not table:
+        raise ValueError(f"키워드 표 형식이 올바르지 않습니다: {path}")
+    return {str(cat): [str(k) for k in words] for cat, words in table.items()}
+
+
+# -----------------------------
+# Aho-Corasick 자동자
+# -----------------------------
+class KeywordAutomaton:
+    """
+    여러 범주의 키워드를 한 번에 찾는 Aho-Corasick 자동자입니다.
+    텍스트를 한 번만 훑어서 모든 범주의 일치 위치를 찾습니다.
+    """
+
+    __slots__ = ("categories", "_goto", "_fail", "_out")
+
+    def __init__(self, table: Dict[str, List[str]]):
+        self.categories: Tuple[str, ...] = tuple(table)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 노드마다 (키워드 길이, 범주 번호) 목록
+        self._out: List[List[Tuple[int, int]]] = [[]]
+
+        for cat_idx, words in enumerate(table.values()):
+            for word in words:
+                self._add(normalize_text(word), cat_idx)
+        self._build_fail_links()
+
+    def _add(self, word: str, cat_idx: int) -> None:
+        if not word:
+            return
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        entry = (len(word), cat_idx)
+        if entry not in self._out[node]:
+            self._out[node].append(entry)
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """(시작, 끝, 범주 번호) 형태로 모든 일치 위치를 돌려줍니다."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        matches: List[Tuple[int, int, int]] = []
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, cat_idx in out[node]:
+                matches.append((i + 1 - length, i + 1, cat_idx))
+        return matches
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        범주별 일치 횟수를 셉니다.
+        같은 범주 안에서 겹치는 일치('가까워'/'가까워서')는 가장 긴 것 하나로 셉니다.
+        """
+        counts = [0] * len(self.categories)
+        last_end = [-1] * len(self.categories)
+        # 시작 위치 오름차순, 같은 시작이면 긴 것 먼저
+        for start, end, cat_idx in sorted(self.find_all(text), key=lambda m: (m[0], -m[1])):
+            if start >= last_end[cat_idx]:
+                counts[cat_idx] += 1
+                last_end[cat_idx] = end
+        return dict(zip(self.categories, counts))
+
+
+# -----------------------------
+# 오타 허용 색인 (자모 n-gram)
+# -----------------------------
+FUZZY_NGRAM = 2
+FUZZY_THRESHOLD = 0.7  # 키워드 n-gram 중 이 비율 이상이 어절에 있어야 일치로 봅니다.
+FUZZY_MIN_GRAMS = 5  # 이보다 짧은 키워드('거리', '높이' 등)는 오타 비교를 하지 않습니다.
+
+
+def jamo_ngrams(text: str, n: int = FUZZY_NGRAM) -> frozenset:
+    jamo = to_jamo(text)
+    return frozenset(jamo[i:i + n] for i in range(len(jamo) - n + 1))
+
+
+class FuzzyKeywordIndex:
+    """
+    키워드를 자모 n-gram으로 풀어 둔 역색인입니다.
+    어절 하나를 찾을 때 그 어절의 n-gram이 나오는 키워드만 세므로, 키워드마다 편집 거리를 계산하지 않습니다.
+    """
+
+    __slots__ = ("categories", "n", "threshold", "_keywords", "_sizes", "_cats", "_postings")
+
+    def __init__(self, table: Dict[str, List[str]], n: int = FUZZY_NGRAM,
+                 threshold: float = FUZZY_THRESHOLD, min_grams: int = FUZZY_MIN_GRAMS):
+        self.categories: Tuple[str, ...] = tuple(table)
+        self.n = n
+        self.threshold = threshold
+        self._keywords: List[str] = []
+        self._sizes: List[int] = []
+        self._cats: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+
+        seen = set()
+        for cat_idx, words in enumerate(table.values()):
+            for word in words:
+                word = normalize_text(word)
+                grams = jamo_ngrams(word, n)
+                if len(grams) < min_grams or word in seen:
+                    continue
+                seen.add(word)
+                kw_idx = len(self._keywords)
+                self._keywords.append(word)
+                self._sizes.append(len(grams))
+                self._cats.append(cat_idx)
+                for gram in grams:
+                    self._postings.setdefault(gram, []).append(kw_idx)
+
+    def match(self, token: str) -> Optional[Tuple[str, str, float]]:
+        """어절과 가장 비슷한 키워드를 (범주, 키워드, 점수)로 돌려줍니다. 기준에 못 미치면 None."""
+        shared: Dict[int, int] = {}
+        for gram in jamo_ngrams(token, self.n):
+            for kw_idx in self._postings.get(gram, ()):
+                shared[kw_idx] = shared.get(kw_idx, 0) + 1
+        best, best_score = -1, 0.0
+        for kw_idx, n in shared.items():
+            score = n / self._sizes[kw_idx]
+            if score > best_score:
+                best, best_score = kw_idx, score
+        if best < 0 or best_score < self.threshold:
+            return None
+        return self.categories[self._cats[best]], self._keywords[best], best_score
+
+    def count(self, words: List[str]) -> Dict[str, int]:
+        """
+        어절마다 가장 비슷한 키워드의 범주를 셉니다.
+        한 어절로 안 맞으면 다음 어절과 붙여서 한 번 더 봅니다. ('자전 측' → '자전측')
+        """
+        counts = dict.fromkeys(self.categories, 0)
+        i = 0
+        while i < len(words):
+            found = self.match(words[i])
+            step = 1
+            if found is None and i + 1 < len(words):
+                found = self.match(words[i] + words[i + 1])
+                step = 2 if found is not None else 1
+            if found is not None:
+                counts[found[0]] += 1
+            i += step
+        return counts
+
+
+# -----------------------------
+# 분류 결과
+# -----------------------------
+@dataclass(frozen=True)
+class Classification:
+    category: str
+    hits: Dict[str, int]
+    confidence: float
+
+
+@lru_cache(maxsize=1)
+def get_keyword_table() -> Dict[str, List[str]]:
+    """keywords.json이 있으면 그 표를, 없으면 기본 표를 씁니다."""
+    if KEYWORDS_PATH.exists():
+        return load_keyword_table(KEYWORDS_PATH)
+    return DEFAULT_KEYWORD_TABLE
+
+
+@lru_cache(maxsize=1)
+def get_automaton() -> KeywordAutomaton:
+    """프로세스당 한 번만 자동자를 만듭니다. (모든 세션이 함께 씀)"""
+    return KeywordAutomaton(get_keyword_table())
+
+
+@lru_cache(maxsize=1)
+def get_fuzzy_index() -> FuzzyKeywordIndex:
+    """프로세스당 한 번만 오타 허용 색인을 만듭니다. (모든 세션이 함께 씀)"""
+    return FuzzyKeywordIndex(get_keyword_table())
+
+
+def classify_text(answer: str, automaton: Optional[KeywordAutomaton] = None,
+                  fuzzy: Optional[FuzzyKeywordIndex] = None) -> Classification:
+    """
+    답변 하나를 분류합니다.
+    - 맞춤법 실수를 바로잡은 답변에서 키워드를 그대로 찾습니다.
+    - 하나도 없으면 조사를 뗀 어절을 오타 허용 색인으로 한 번 더 찾습니다.
+      (automaton을 직접 넘기면 fuzzy도 직접 넘겨야 오타 비교를 합니다)
+    - 가장 많이 일치한 범주를 고르고, 동점이면 키워드 표의 앞쪽 범주를 고릅니다.
+    - confidence = 선택된 범주의 일치 수 / 전체 일치 수
+    """
+    if automaton is None:
+        automaton = get_automaton()
+        fuzzy = fuzzy or get_fuzzy_index()
+    if not answer or not answer.strip():
+        return Classification("empty", dict.fromkeys(automaton.categories, 0), 0.0)
+
+    hits = automaton.count(normalize_text(normalize_korean(answer)))
+    total = sum(hits.values())
+    if total == 0 and fuzzy is not None:
+        hits = fuzzy.count(tokens(answer))
+        total = sum(hits.values())
+    if total == 0:
+        return Classification("other", hits, 0.0)
+
+    best = max(automaton.categories, key=lambda c: (hits[c], -automaton.categories.index(c)))
+    return Classification(best, hits, hits[best] / total)
@@ -0,0 +1,112 @@
+"""
+답변 분류용 한국어 정규화
+
+- normalize_korean(): 전각 문자/대소문자를 맞추고 자주 보이는 맞춤법 실수를 바른 표기로 바꿉니다.
+- tokens(): 어절마다 끝에 붙은 조사를 떼어 냅니다. ("자전축이" → "자전축")
+- to_jamo(): 글자를 초성/중성/종성 자모로 풉니다. 겹모음/겹받침은 기본 자모로 나눕니다.
+  ("와" → "ㅇㅗㅏ") 비슷한 오타끼리 자모 n-gram이 많이 겹치도록 하기 위함입니다.
+
+모든 표는 모듈을 불러올 때 한 번만 만들어집니다.
+"""
+from typing import List
+import re
+import unicodedata
+
+# -----------------------------
+# 한글 자모 분해
+# -----------------------------
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = [
+    "ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ",
+    "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ",
+]
+_JONGSEONG = [
+    "", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+    "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+]
+
+
+def _decompose_syllable(ch: str) -> str:
+    code = ord(ch) - _HANGUL_BASE
+    cho, rest = divmod(code, 21 * 28)
+    jung, jong = divmod(rest, 28)
+    return _CHOSEONG[cho] + _JUNGSEONG[jung] + _JONGSEONG[jong]
+
+
+# 완성형 한글 11,172자 → 자모 문자열 표 (str.translate 한 번으로 풉니다)
+_JAMO_TABLE = {code: _decompose_syllable(chr(code)) for code in range(_HANGUL_BASE, _HANGUL_LAST + 1)}
+
+
+def to_jamo(text: str) -> str:
+    """한글 글자를 자모로 풉니다. 한글이 아닌 글자는 그대로 둡니다."""
+    return text.translate(_JAMO_TABLE)
+
+
+# -----------------------------
+# 맞춤법 실수 바로잡기
+# -----------------------------
+# (틀린 표기, 바른 표기). 바른 낱말의 일부가 되는 표기는 넣지 마세요. (예: "측" → "축" 은 "예측"을 망가뜨림)
+MISSPELLINGS = (
+    ("가까와", "가까워"),
+    ("가까히", "가까이"),
+    ("멀러", "멀어"),
+    ("기우러", "기울어"),
+    ("기울러", "기울어"),
+    ("기울어저", "기울어져"),
+    ("기울여저", "기울어져"),
+    ("자전측", "자전축"),
+    ("자전추", "자전축"),
+    ("자전 측", "자전축"),
+    ("자전 축", "자전축"),
+    ("비스뜸", "비스듬"),
+    ("비스틈", "비스듬"),
+    ("남중고두", "남중고도"),
+    ("태양고두", "태양고도"),
+    ("이십삼점오", "23.5"),
+    ("23,5", "23.5"),
+    ("23.5°", "23.5도"),
+)
+
+_MISSPELLING_MAP = dict(MISSPELLINGS)
+_MISSPELLING_RE = re.compile("|".join(re.escape(w) for w, _ in sorted(MISSPELLINGS, key=lambda p: -len(p[0]))))
+
+
+def fold_misspellings(text: str) -> str:
+    """자주 보이는 맞춤법 실수를 바른 표기로 바꿉니다."""
+    return _MISSPELLING_RE.sub(lambda m: _MISSPELLING_MAP[m.group(0)], text)
+
+
+def normalize_korean(text: str) -> str:
+    """전각/호환 문자를 풀고(NFKC) 소문자로 바꾼 뒤 맞춤법 실수를 바로잡습니다. 띄어쓰기는 유지합니다."""
+    return fold_misspellings(unicodedata.normalize("NFKC", text).lower())
+
+
+# -----------------------------
+# 조사 떼기
+# -----------------------------
+# 긴 것부터 검사합니다.
+PARTICLES = tuple(sorted(
+    (
+        "에서는", "에서도", "에서", "에게", "으로", "까지", "부터", "보다", "처럼", "이랑", "하고",
+        "은", "는", "이", "가", "을", "를", "에", "의", "도", "로", "와", "과", "만",
+    ),
+    key=len,
+    reverse=True,
+))
+
+_TOKEN_RE = re.compile(r"[0-9a-z가-힣.]+")
+
+
+def strip_particle(token: str) -> str:
+    """어절 끝의 조사 하나를 뗍니다. 떼고 나서 한 글자만 남으면 그대로 둡니다. ("낮이" 유지)"""
+    for particle in PARTICLES:
+        if token.endswith(particle) and len(token) - len(particle) >= 2:
+            return token[: -len(particle)]
+    return token
+
+
+def tokens(text: str) -> List[str]:
+    """정규화한 뒤 어절로 나누고 조사를 뗍니다."""
+    return [strip_particle(t) for t in _TOKEN_RE.findall(normalize_korean(text))]
@@ -0,0 +1,127 @@
+"""
+오프라인 수업 묶음 (.lessonpack) 읽기
+
+묶음은 압축하지 않은(ZIP_STORED) zip 파일 하나입니다.
+
+    index.json                 단원/카드 데이터, 자료 URL, 미디어 목록
+    media/<url 해시>.bin        원본 (이미지, 직접 링크 영상)
+    media/<url 해시>.w800.webp  이미지 썸네일
+
+- 열 때는 zip 목차와 index.json만 읽습니다.
+- 미디어는 파일 전체를 mmap으로 잡아 두고, 요청한 항목의 바이트 범위만 memoryview로 잘라 줍니다.
+  압축을 풀거나 디스크에 복사하지 않고, 운영체제가 필요한 쪽만 메모리에 올립니다.
+- 앱은 LESSON_BUNDLE=경로 환경 변수가 있으면 묶음 모드로 동작합니다.
+
+    LESSON_BUNDLE=seasons.lessonpack streamlit run app.py
+
+묶음 만들기/풀기는 bundle_tool.py 를 쓰세요.
+"""
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+import json
+import mmap
+import os
+import struct
+import threading
+import zipfile
+
+BUNDLE_PATH = os.environ.get("LESSON_BUNDLE", "")
+BUNDLE_FORMAT = 1
+INDEX_NAME = "index.json"
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+@dataclass(frozen=True)
+class BundleUnit:
+    id: str
+    title: str
+    cards: List[Dict]
+    builtin: bool = False
+
+
+@dataclass(frozen=True)
+class BundleMedia:
+    data: str  # 묶음 안의 원본 이름
+    content_type: str
+    thumb: str = ""  # 썸네일 이름 (이미지일 때만)
+
+
+class LessonBundle:
+    """묶음 하나를 읽기 전용으로 엽니다. 여러 세션/스레드가 함께 써도 됩니다."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with zipfile.ZipFile(self.path) as zf:
+            # zip 목차만 읽습니다. (항목 내용은 읽지 않음)
+            self._members: Dict[str, zipfile.ZipInfo] = {info.filename: info for info in zf.infolist()}
+            if INDEX_NAME not in self._members:
+                raise ValueError(f"수업 묶음에 {INDEX_NAME}이 없습니다: {path}")
+            index = json.loads(zf.read(INDEX_NAME))
+        if index.get("format") != BUNDLE_FORMAT:
+            raise ValueError(f"지원하지 않는 수업 묶음 형식입니다: {index.get('format')!r}")
+
+        self.created_at: float = index.get("created_at", 0.0)
+        self.units: Tuple[BundleUnit, ...] = tuple(
+            BundleUnit(u["id"], u.get("title", u["id"]), u["cards"], bool(u.get("builtin"))) for u in index["units"]
+        )
+        self.resource_urls: Dict[str, Dict[str, str]] = index.get("resource_urls", {})
+        self.media: Dict[str, BundleMedia] = {url: BundleMedia(**m) for url, m in index.get("media", {}).items()}
+
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _span(self, name: str) -> Tuple[int, int]:
+        """항목 데이터의 (시작, 끝) 위치. 처음 물을 때 로컬 헤더 30바이트만 읽어서 계산합니다."""
+        span = self._offsets.get(name)
+        if span is not None:
+            return span
+        info = self._members[name]
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f"압축된 항목은 직접 읽을 수 없습니다: {name}")
+        header = _LOCAL_HEADER.unpack_from(self._mmap, info.header_offset)
+        if header[0] != _LOCAL_HEADER_SIGNATURE:
+            raise ValueError(f"수업 묶음이 손상되었습니다: {name}")
+        name_len, extra_len = header[9], header[10]
+        start = info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+        span = (start, start + info.file_size)
+        with self._lock:
+            self._offsets[name] = span
+        return span
+
+    def read(self, name: str) -> memoryview:
+        """항목 바이트를 복사 없이 돌려줍니다. (mmap의 일부)"""
+        start, end = self._span(name)
+        return memoryview(self._mmap)[start:end]
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.media
+
+    def original(self, url: str) -> Optional[Tuple[memoryview, str]]:
+        """URL의 원본 (바이트, MIME). 묶음에 없으면 None."""
+        media = self.media.get(url)
+        if media is None:
+            return None
+        return self.read(media.data), media.content_type
+
+    def thumbnail(self, url: str) -> Optional[memoryview]:
+        """URL의 WebP 썸네일. 없으면 None."""
+        media = self.media.get(url)
+        if media is None or not media.thumb:
+            return None
+        return self.read(media.thumb)
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+
+@lru_cache(maxsize=1)
+def get_bundle() -> Optional[LessonBundle]:
+    """LESSON_BUNDLE 이 있으면 그 묶음을 프로세스당 한 번 엽니다."""
+    return LessonBundle(Path(BUNDLE_PATH)) if BUNDLE_PATH else None
@@ -0,0 +1,349 @@
+"""
+수업 카탈로그: 여러 단원(lessons/*.json)을 필요할 때만 불러오고, 모든 카드를 한 번에 검색합니다.
+
+    lessons/seasons2.json
+    {"id": "seasons2", "title": "계절의 변화 (심화)", "cards": [ {카드}, ... ]}
+
+- 처음에는 카드의 검색용 요약(단계, 이름, 발문, keywords)만 읽습니다. 요약은
+  .cache/lesson_index.json 에 파일 크기/수정 시각과 함께 저장해 두고, 바뀐 파일만 다시 읽습니다.
+- 카드 전체(자료, 피드백 규칙, 예상 답변)는 단원을 처음 열 때 CardRegistry로 만들어 둡니다.
+- 검색 색인은 글자 1-gram/2-gram 역색인이라 카드가 수천 장이어도 검색어에 걸리는 카드만 봅니다.
+- 기본 수업(lesson_engine.get_default_cards)은 항상 첫 단원입니다.
+- 카드 id는 카탈로그 전체에서 겹치면 안 됩니다. (자료 URL, 답변 기록이 카드 id로 저장됨)
+- 수업 묶음(LESSON_BUNDLE)으로 실행하면 lessons/ 대신 묶음의 단원을 씁니다.
+"""
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+import json
+import logging
+import re
+import threading
+
+from answer_similarity import ExpectedAnswerIndex
+from card_registry import Card, CardRegistry
+from korean_text import normalize_korean
+from lesson_bundle import LessonBundle, get_bundle
+from lesson_engine import get_answer_index, get_card_registry, get_default_cards
+from resource_store import write_json_atomic
+
+_LOGGER = logging.getLogger(__name__)
+
+LESSONS_DIR = Path("lessons")
+CATALOG_INDEX_PATH = Path(".cache") / "lesson_index.json"
+INDEX_FORMAT = 2  # 2: 단원 안 카드 id 중복을 읽을 때 검사 (그 전 색인은 다시 읽음)
+
+BUILTIN_UNIT_ID = "seasons"
+BUILTIN_UNIT_TITLE = "계절의 변화"
+
+_SPACES_RE = re.compile(r"\s+")
+# 단원 id는 파일 이름으로도 쓰이므로 글자/숫자/_/- 만 받습니다. (경로 구분자, "..", 빈 값 거부)
+UNIT_ID_RE = re.compile(r"^[\w-]{1,64}$")
+
+
+def _search_text(text: str) -> str:
+    """검색 비교용: 정규화하고 공백을 모두 없앱니다."""
+    return _SPACES_RE.sub("", normalize_korean(text))
+
+
+def _grams(text: str) -> Set[str]:
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+# -----------------------------
+# 단원/카드 요약
+# -----------------------------
+@dataclass(frozen=True, slots=True)
+class CardEntry:
+    unit_id: str
+    index: int  # 단원 안에서의 순서
+    card_id: str
+    stage: str
+    label: str
+    question: str
+    keywords: Tuple[str, ...] = ()
+
+    @property
+    def display_label(self) -> str:
+        return f"[{self.stage}] {self.label}"
+
+
+@dataclass(frozen=True, slots=True)
+class UnitInfo:
+    id: str
+    title: str
+    path: Optional[Path]  # None이면 기본 수업이나 묶음 안의 단원
+    card_count: int
+    stages: Tuple[str, ...]
+
+
+def _summarize(unit_id: str, raw_cards: Sequence[Dict]) -> List[CardEntry]:
+    return [
+        CardEntry(
+            unit_id=unit_id,
+            index=i,
+            card_id=raw["id"],
+            stage=raw.get("stage", ""),
+            label=raw.get("label", ""),
+            question=raw.get("question", ""),
+            keywords=tuple(raw.get("keywords", [])),
+        )
+        for i, raw in enumerate(raw_cards)
+    ]
+
+
+def read_unit_file(path: Path) -> Tuple[str, str, List[Dict]]:
+    """단원 파일을 읽어 (단원 id, 제목, 카드 dict 목록)을 돌려줍니다. 형식이 틀리면 ValueError."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("cards"), list):
+        raise ValueError(f"단원 파일에 cards 목록이 없습니다: {path}")
+    seen: Set[str] = set()
+    for raw in data["cards"]:
+        if not isinstance(raw, dict) or not raw.get("id"):
+            raise ValueError(f"id가 없는 카드가 있습니다: {path}")
+        # 단원을 열 때 CardRegistry가 같은 검사로 실패하므로, 목록을 만들 때 미리 걸러 냅니다.
+        if raw["id"] in seen:
+            raise ValueError(f"카드 id가 중복되었습니다: {raw['id']}")
+        seen.add(raw["id"])
+    unit_id = str(data.get("id") or path.stem)
+    if not UNIT_ID_RE.match(unit_id):
+        raise ValueError(f"단원 id는 글자/숫자/_/- 만 쓸 수 있습니다: {unit_id!r}")
+    return unit_id, str(data.get("title") or unit_id), data["cards"]
+
+
+# -----------------------------
+# 검색 색인
+# -----------------------------
+class CatalogSearchIndex:
+    """
+    카드 요약의 글자 1-gram/2-gram 역색인.
+    검색어의 n-gram 목록이 모두 들어 있는 카드만 후보로 고른 뒤, 실제로 검색어가 들어 있는지 확인합니다.
+    """
+
+    __slots__ = ("_texts", "_postings")
+
+    def __init__(self, entries: Sequence[CardEntry], unit_titles: Dict[str, str]):
+        self._texts: List[str] = []
+        self._postings: Dict[str, List[int]] = {}
+        for i, e in enumerate(entries):
+            text = _search_text(" ".join((e.stage, e.label, e.question, *e.keywords, unit_titles.get(e.unit_id, ""))))
+            self._texts.append(text)
+            for gram in _grams(text):
+                self._postings.setdefault(gram, []).append(i)
+
+    def search(self, query: str) -> List[int]:
+        """검색어의 낱말이 모두 들어 있는 카드 번호(카탈로그 순서)를 돌려줍니다."""
+        words = [_search_text(w) for w in query.split()]
+        words = [w for w in words if w]
+        if not words:
+            return list(range(len(self._texts)))
+
+        grams: Set[str] = set()
+        for w in words:
+            grams |= {w} if len(w) == 1 else {w[i:i + 2] for i in range(len(w) - 1)}
+        postings = sorted((self._postings.get(g, []) for g in grams), key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates.intersection_update(p)
+            if not candidates:
+                return []
+        return [i for i in sorted(candidates) if all(w in self._texts[i] for w in words)]
+
+
+# -----------------------------
+# 카탈로그
+# -----------------------------
+class LessonCatalog:
+    """
+    단원 목록과 전체 카드 요약/검색 색인을 들고 있고, 단원의 CardRegistry는 처음 열 때 만듭니다.
+    모든 세션이 함께 씁니다.
+    """
+
+    def __init__(self, lessons_dir: Path = LESSONS_DIR, index_path: Optional[Path] = CATALOG_INDEX_PATH,
+                 include_builtin: bool = True, bundle: Optional[LessonBundle] = None):
+        self.lessons_dir = Path(lessons_dir)
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._registries: Dict[str, CardRegistry] = {}
+        self._answer_indexes: Dict[str, ExpectedAnswerIndex] = {}
+        self._bundle_cards: Dict[str, List[Dict]] = {}
+
+        units: List[UnitInfo] = []
+        entries: List[CardEntry] = []
+        owner: Dict[str, str] = {}  # 카드 id → 단원 id
+        self._unit_pos: Dict[str, int] = {}
+        self._unit_start: Dict[str, int] = {}
+
+        def add_unit(info: UnitInfo, unit_entries: List[CardEntry]) -> None:
+            # 다른 단원의 카드 id와 겹치거나 단원 안에서 중복된 카드 id
+            clash: Optional[str] = None
+            ids: Set[str] = set()
+            for e in unit_entries:
+                if e.card_id in owner or e.card_id in ids:
+                    clash = e.card_id
+                    break
+                ids.add(e.card_id)
+            if info.id in self._unit_pos or clash is not None:
+                what = f"카드 id '{clash}'" if clash is not None else "단원 id"
+                _LOGGER.warning("%s 단원을 건너뜁니다: %s가 이미 있습니다.", info.path or info.id, what)
+                return
+            self._unit_pos[info.id] = len(units)
+            units.append(info)
+            self._unit_start[info.id] = len(entries)
+            entries.extend(unit_entries)
+            owner.update((e.card_id, info.id) for e in unit_entries)
+
+        if include_builtin:
+            builtin = _summarize(BUILTIN_UNIT_ID, get_default_cards())
+            add_unit(self._unit_info(BUILTIN_UNIT_ID, BUILTIN_UNIT_TITLE, None, builtin), builtin)
+        if bundle is not None:
+            # 기본 수업은 코드에 들어 있으므로 묶음에서는 다른 단원만 가져옵니다.
+            for unit in bundle.units:
+                if unit.builtin:
+                    continue
+                unit_entries = _summarize(unit.id, unit.cards)
+                add_unit(self._unit_info(unit.id, unit.title, None, unit_entries), unit_entries)
+                self._bundle_cards.setdefault(unit.id, unit.cards)
+        else:
+            for info, unit_entries in self._scan():
+                add_unit(info, unit_entries)
+
+        self.units: Tuple[UnitInfo, ...] = tuple(units)
+        self.entries: Tuple[CardEntry, ...] = tuple(entries)
+        self._owner = owner
+        self._entry_pos = {e.card_id: i for i, e in enumerate(self.entries)}
+        self._search = CatalogSearchIndex(self.entries, {u.id: u.title for u in self.units})
+
+    @staticmethod
+    def _unit_info(unit_id: str, title: str, path: Optional[Path], entries: List[CardEntry]) -> UnitInfo:
+        return UnitInfo(unit_id, title, path, len(entries), tuple(dict.fromkeys(e.stage for e in entries)))
+
+    # --- 요약 읽기 (바뀐 파일만) ---
+    def _scan(self) -> List[Tuple[UnitInfo, List[CardEntry]]]:
+        if not self.lessons_dir.is_dir():
+            return []
+        cached = self._read_index()
+        fresh: Dict[str, Dict] = {}
+        result: List[Tuple[UnitInfo, List[CardEntry]]] = []
+        for path in sorted(self.lessons_dir.glob("*.json")):
+            st = path.stat()
+            stamp = [st.st_mtime_ns, st.st_size]
+            item = cached.get(path.name)
+            if item is None or item.get("stamp") != stamp:
+                try:
+                    unit_id, title, raw_cards = read_unit_file(path)
+                except (OSError, ValueError) as e:
+                    _LOGGER.warning("단원 파일을 읽지 못했습니다: %s (%s)", path, e)
+                    continue
+                item = {
+                    "stamp": stamp,
+                    "id": unit_id,
+                    "title": title,
+                    "cards": [[e.card_id, e.stage, e.label, e.question, list(e.keywords)] for e in _summarize(unit_id, raw_cards)],
+                }
+            fresh[path.name] = item
+            unit_entries = [
+                CardEntry(item["id"], i, card_id, stage, label, question, tuple(keywords))
+                for i, (card_id, stage, label, question, keywords) in enumerate(item["cards"])
+            ]
+            result.append((self._unit_info(item["id"], item["title"], path, unit_entries), unit_entries))
+        if fresh != cached:
+            self._write_index(fresh)
+        return result
+
+    def _read_index(self) -> Dict[str, Dict]:
+        if self.index_path is None or not self.index_path.exists():
+            return {}
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("format") != INDEX_FORMAT or data.get("dir") != str(self.lessons_dir.resolve()):
+            return {}
+        return data.get("files", {})
+
+    def _write_index(self, files: Dict[str, Dict]) -> None:
+        if self.index_path is None:
+            return
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(self.index_path, {"format": INDEX_FORMAT, "dir": str(self.lessons_dir.resolve()), "files": files})
+        except OSError as e:
+            _LOGGER.warning("카탈로그 색인을 저장하지 못했습니다: %s", e)
+
+    # --- 단원 ---
+    def unit_info(self, unit_id: str) -> UnitInfo:
+        return self.units[self._unit_pos[unit_id]]
+
+    def __contains__(self, unit_id: str) -> bool:
+        return unit_id in self._unit_pos
+
+    def unit(self, unit_id: str) -> CardRegistry:
+        """단원의 카드 색인. 처음 부를 때 단원 파일 전체를 읽습니다."""
+        registry = self._registries.get(unit_id)
+        if registry is not None:
+            return registry
+        with self._lock:
+            registry = self._registries.get(unit_id)
+            if registry is None:
+                info = self.unit_info(unit_id)
+                if unit_id in self._bundle_cards:
+                    registry = CardRegistry.from_dicts(self._bundle_cards[unit_id])
+                elif info.path is None:
+                    registry = get_card_registry()
+                else:
+                    _, _, raw_cards = read_unit_file(info.path)
+                    registry = CardRegistry.from_dicts(raw_cards)
+                self._registries[unit_id] = registry
+        return registry
+
+    def unit_of(self, card_id: str) -> Optional[str]:
+        return self._owner.get(card_id)
+
+    def find(self, card_id: str) -> Optional[CardEntry]:
+        """카드 id로 요약을 찾습니다. (단원을 열지 않음)"""
+        pos = self._entry_pos.get(card_id)
+        return self.entries[pos] if pos is not None else None
+
+    def card(self, card_id: str) -> Optional[Card]:
+        """카드 id로 카드를 찾습니다. (그 단원을 아직 안 열었으면 엽니다)"""
+        unit_id = self._owner.get(card_id)
+        if unit_id is None:
+            return None
+        registry = self.unit(unit_id)
+        return registry.get(card_id) if card_id in registry else None
+
+    def answer_index(self, unit_id: str) -> ExpectedAnswerIndex:
+        """단원별 예상 답변 유사도 행렬. 처음 부를 때 만듭니다."""
+        index = self._answer_indexes.get(unit_id)
+        if index is None:
+            registry = self.unit(unit_id)
+            index = get_answer_index() if registry is get_card_registry() else ExpectedAnswerIndex(registry)
+            self._answer_indexes[unit_id] = index
+        return index
+
+    # --- 검색 ---
+    def entry(self, unit_id: str, index: int) -> CardEntry:
+        return self.entries[self._unit_start[unit_id] + index]
+
+    def search(self, query: str = "", unit_id: Optional[str] = None, stage: Optional[str] = None) -> List[CardEntry]:
+        """검색어/단원/단계로 거른 카드 요약 목록 (카탈로그 순서)."""
+        if unit_id is not None and not query.strip():
+            # 검색어가 없으면 그 단원 범위만 잘라 냅니다.
+            start = self._unit_start[unit_id]
+            found: Sequence[CardEntry] = self.entries[start:start + self.unit_info(unit_id).card_count]
+        else:
+            found = [self.entries[i] for i in self._search.search(query)]
+            if unit_id is not None:
+                found = [e for e in found if e.unit_id == unit_id]
+        if stage:
+            found = [e for e in found if e.stage == stage]
+        return list(found)
+
+
+@lru_cache(maxsize=1)
+def get_catalog() -> LessonCatalog:
+    """카탈로그는 프로세스당 한 번만 만들고 모든 세션/작업자가 함께 씁니다."""
+    return LessonCatalog(bundle=get_bundle())
@@ -0,0 +1,488 @@
+"""
+수업 엔진 (Streamlit 없이 쓰는 부분)
+
+카드 데이터, 답변 분류/피드백 규칙, 자료 URL 유틸과 저장소를 담고 있습니다.
+app.py(화면)와 일괄 채점, 링크 점검, 벤치마크가 모두 이 모듈을 가져다 씁니다.
+Streamlit을 import하지 않으므로 작업 프로세스나 명령줄 도구가 빠르게 시작합니다.
+"""
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+import re
+
+from card_registry import Card, CardRegistry
+from feedback_rules import FeedbackBook
+from keyword_engine import Classification, classify_text
+from profiling import timed
+from resource_store import STORE_PATH, ResourceUrlStore, diff_resource_urls
+from url_resolver import resolve_url
+
+if TYPE_CHECKING:
+    # 유사도 색인은 numpy를 불러오므로, 점수를 처음 계산할 때 가져옵니다. (import를 가볍게 유지)
+    from answer_similarity import ExpectedAnswerIndex, SimilarityMatch
+
+# -----------------------------
+# 자료 URL 저장/불러오기 (SQLite 저장소, config.json 호환)
+# -----------------------------
+CONFIG_PATH = Path("config.json")
+
+
+@lru_cache(maxsize=1)
+def get_resource_store() -> ResourceUrlStore:
+    """프로세스당 하나의 저장소. 처음 만들 때 비어 있으면 config.json 내용을 가져옵니다."""
+    return ResourceUrlStore(STORE_PATH, legacy_json=CONFIG_PATH)
+
+
+@timed("load_resource_urls")
+def load_resource_urls() -> Dict:
+    """저장된 자료 URL 설정을 불러옵니다. (파일이 바뀌지 않았으면 메모리 캐시 사용)"""
+    return get_resource_store().get_all()
+
+
+def load_resource_urls_snapshot() -> Tuple[int, Dict]:
+    """(저장소 버전, 자료 URL 설정). 버전이 그대로면 다시 읽지 않고 캐시를 씁니다."""
+    return get_resource_store().snapshot()
+
+
+def resource_urls_version() -> int:
+    """자료 URL이 저장될 때마다 커지는 번호. (다른 앱 프로세스의 저장도 포함, 행 하나만 읽음)"""
+    return get_resource_store().version()
+
+
+def save_resource_urls(resource_urls: Dict) -> int:
+    """바뀐 자료 URL만 행 단위로 저장하고, 저장한 개수를 돌려줍니다."""
+    store = get_resource_store()
+    return store.upsert_many(diff_resource_urls(store.get_all(), resource_urls))
+
+
+def reset_resource_urls() -> None:
+    """저장된 자료 URL을 모두 지웁니다."""
+    get_resource_store().clear()
+
+
+# -----------------------------
+# URL 유틸
+# -----------------------------
+def looks_like_placeholder(url: str) -> bool:
+    """예시 링크/placeholder를 감지합니다."""
+    if not url:
+        return True
+    u = url.strip().lower()
+    return ("example.com" in u) or (u in {"", "http://", "https://"})
+
+
+_HTTP_URL_RE = re.compile(r"^https?://", flags=re.IGNORECASE)
+
+
+def is_http_url(url: str) -> bool:
+    if not url:
+        return False
+    return bool(_HTTP_URL_RE.match(url.strip()))
+
+
+# -----------------------------
+# 유튜브 링크 정규화(Shorts/공유 링크 대응)
+# -----------------------------
+def normalize_youtube_url(url: str) -> str:
+    """
+    Streamlit st.video에서 잘 재생되도록 유튜브 URL을 embed 형태로 변환합니다.
+    - https://www.youtube.com/shorts/VIDEO_ID
+    - https://youtu.be/VIDEO_ID
+    - https://www.youtube.com/watch?v=VIDEO_ID
+    등을 모두 지원 (해석 결과는 url_resolver에서 URL별로 메모이즈)
+    """
+    if not url:
+        return url
+    resolved = resolve_url(url)
+    return resolved.url if resolved.is_youtube else url.strip()
+
+
+def is_youtube_url(url: str) -> bool:
+    if not url:
+        return False
+    return resolve_url(url).is_youtube
+
+
+def sanitize_url(saved_url: str, default_url: str) -> str:
+    """
+    - config.json에 placeholder(example.com)나 비정상 URL이 저장되어 있으면 기본값으로 복구
+    - 정상 URL이면 그대로 사용
+    """
+    # 저장된 값이 없거나 placeholder면 기본으로
+    if looks_like_placeholder(saved_url):
+        return default_url or ""
+
+    # http(s) 아니면 기본으로
+    if not is_http_url(saved_url):
+        return default_url or ""
+
+    return saved_url.strip()
+
+
+# -----------------------------
+# 발문 카드 데이터
+# -----------------------------
+def get_default_cards() -> List[Dict]:
+    """수업에서 사용할 발문 카드를 정의합니다."""
+    return [
+        {
+            "id": "obs_sun_appearance",
+            "stage": "생각해보기",
+            "label": "계절 변화의 까닭",
+            "question": "계절의 변화가 생기는 까닭은 무엇일까요?",
+            "expected_answers": [
+                "여름에는 태양이 더 높이 떠 있고, 겨울에는 낮게 떠요.",
+                "여름에는 햇빛이 강하고 눈이 부시고, 겨울에는 햇빛이 약하게 느껴져요.",
+                "여름에는 하늘 가운데 쪽에서 비추고, 겨울에는 옆쪽에서 비추는 느낌이에요.",
+            ],
+            "feedback_rules": {},
+            "resources": [
+                {
+                    "id": "axis_tilt",
+                    "title": "지구 자전축 23.5도 기울기 그림",
+                    "type": "image",
+                    "default_url": "https://blog.kakaocdn.net/dna/doM62b/btsJXYwTxbx/AAAAAAAAAAAAAAAAAAAAACkh66jHRVAuJuZUNXWiTpgXEoHXXbJvF-B--_urBXeo/img.webp?credential=yqXZFxpELC7KVnFOS48ylbz2pIh7yKj8&expires=1767193199&allow_ip=&allow_referer=&signature=HZ%2FEJBS2ZsxegP4O5C%2BUWi8coXg%3D",
+                    "description": "지구가 자전축이 기울어진 채로 태양 주위를 도는 모습을 보여 주는 그림입니다.",
+                },
+                {
+                    "id": "sun_height",
+                    "title": "여름/겨울 태양 높이 비교 그림",
+                    "type": "image",
+                    "default_url": "https://www.home-learn.co.kr/common/image.do?imgPath=newsroom&imgName=CK20230202092852423.png&imgGubun=D",
+                    "description": "같은 장소에서 여름과 겨울에 태양이 어느 높이까지 올라가는지 비교한 그림입니다.",
+                },
+            ],
+            "teacher_notes": {
+                "extra_questions": [
+                    "여름과 겨울에 그림자 길이도 함께 떠올려 보면 어떤 차이가 있을까요?",
+                    "태양이 뜨고 지는 위치도 계절마다 달라지는지 이야기해 볼까요?",
+                ],
+                "teacher_point": "학생들의 말 속에서 '태양 높이', '햇빛의 느낌', '그림자 길이' 같은 표현을 끌어내어, 나중에 태양 고도 개념으로 연결할 준비를 합니다.",
+            },
+        },
+        {
+            "id": "obs_shadow_length",
+            "stage": "관찰",
+            "label": "그림자 길이",
+            "question": "여름과 겨울에 같은 시간에 서 있으면, 그림자 길이는 어떻게 달라질까요?",
+            "expected_answers": [
+                "여름에는 그림자가 짧고, 겨울에는 그림자가 길어요.",
+                "겨울에는 해가 낮게 있어서 그림자가 훨씬 길어져요.",
+                "계절이 바뀔 때마다 놀이터에서 생기는 그림자 길이도 조금씩 달라져요.",
+            ],
+            "feedback_rules": {},
+            "resources": [
+                {
+                    "id": "shadow_compare",
+                    "title": "여름/겨울 그림자 길이 비교 사진",
+                    "type": "image",
+                    "default_url": "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcRNZU4uiSOMiiRvWfPsNhQoPCLbDg2PR-8NQg&s",
+                    "description": "같은 시간에 찍은 여름과 겨울의 그림자 길이를 비교한 사진입니다.",
+                }
+            ],
+            "teacher_notes": {
+                "extra_questions": [
+                    "그림자가 길다는 것은 태양이 하늘에서 어느 쪽에 있다는 뜻일까요?",
+                    "그림자 길이와 태양 높이는 어떤 관계가 있을지 스스로 말해 보게 해 주세요.",
+                ],
+                "teacher_point": "그림자 길이 경험을 통해 태양 고도가 낮을수록 그림자가 길어진다는 직관을 쌓게 합니다.",
+            },
+        },
+        {
+            "id": "obs_day_length",
+            "stage": "관찰",
+            "label": "낮의 길이",
+            "question": "낮의 길이는 계절에 따라 어떻게 달라질까요?",
+            "expected_answers": [
+                "여름에는 낮이 길고 밤이 짧아요.",
+                "겨울에는 낮이 짧고 밤이 길어요.",
+                "봄과 가을은 여름과 겨울의 중간 정도 길이라고 느껴져요.",
+            ],
+            "feedback_rules": {},
+            "resources": [
+                {
+                    "id": "daylength_chart",
+                    "title": "계절에 따른 낮 길이 변화 그래프",
+                    "type": "image",
+                    "default_url": "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcTHNbhrKiUFY1Q82K_M1_SBajnuuaS-tRaN1A&s",
+                    "description": "계절에 따라 낮 시간이 어떻게 길어졌다가 짧아지는지 보여 주는 그래프입니다.",
+                }
+            ],
+            "teacher_notes": {
+                "extra_questions": [
+                    "학생들이 실제로 느끼는 '해가 빨리 진다/늦게 진다' 경험을 떠올리게 해 주세요.",
+                    "하루 동안 태양이 떠 있는 시간이 길어지면 기온에는 어떤 영향을 줄지 함께 이야기해 보세요.",
+                ],
+                "teacher_point": "낮과 밤의 길이 변화를 자전축 기울기와 공전과 연결하기 위한 기초 경험을 확인합니다.",
+            },
+        },
+        {
+            "id": "reason_sunlight",
+            "stage": "생각해보기",
+            "label": "햇빛이 더 강하게 느껴지는 까닭",
+            "question": "왜 여름에는 햇빛이 더 강하게 느껴질까요?",
+            "expected_answers": [
+                "여름에는 태양이 높이 떠 있어서 햇빛이 더 세게 내려와요.",
+                "햇빛이 더 위에서 바로 내려와서 같은 곳에 더 많이 모여요.",
+                "여름에는 태양빛이 거의 바로 내려와서 그림자도 짧게 보여요.",
+            ],
+            "feedback_rules": {},
+            "resources": [
+                {
+                    "id": "angle_energy",
+                    "title": "수직/비스듬한 햇빛과 에너지 분포 그림",
+                    "type": "image",
+                    "default_url": "https://mblogthumb-phinf.pstatic.net/20121024_208/msy879_1351057881359nbj8s_JPEG/%C0%A7%B5%B5%BA%B0_%C5%C2%BE%E7%BA%B9%BB%E7%BF%A1%B3%CA%C1%F6.jpg?type=w420",
+                    "description": "같은 양의 햇빛이 수직으로 들어올 때와 비스듬히 들어올 때, 단위 면적에 도달하는 에너지 차이를 보여 주는 그림입니다.",
+                }
+            ],
+            "teacher_notes": {
+                "extra_questions": [
+                    "손전등을 책상에 비출 때, 바로 위에서 비출 때와 비스듬히 비출 때의 밝기는 어떻게 다른가요?",
+                    "같은 양의 빛이 더 작은 곳에 모이면 어떻게 느껴질지 학생이 말해 보게 해 주세요.",
+                ],
+                "teacher_point": "빛의 입사각과 단위 면적당 에너지 양을 연결하여, 단순히 '여름이니까 뜨겁다'가 아니라 '빛의 각도'로 사고하게 돕습니다.",
+            },
+        },
+        {
+            "id": "reason_oblique",
+            "stage": "생각해보기",
+            "label": "비스듬한 햇빛",
+            "question": "햇빛이 비스듬히 들어오면 어떤 일이 생길까요?",
+            "expected_answers": [
+                "빛이 넓게 퍼져서 한 곳에 도달하는 양이 줄어들 것 같아요.",
+                "같은 양의 빛이라도 비스듬히 들어오면 덜 뜨겁게 느껴질 거예요.",
+                "그림자가 길어지고, 땅이 덜 데워질 것 같다고 느껴요.",
+            ],
+            "feedback_rules": {},
+            "resources": [
+                {
+                    "id": "flashlight_demo",
+                    "title": "손전등 비스듬히 비추기 실험(자료 링크)",
+                    "type": "image",
+                    "default_url": "https://cloudfront-ap-northeast-1.images.arcpublishing.com/chosun/MUXVC2EQKDKWZF7FIZCP36AWGY.jpg",
+                    "description": "손전등을 수직/비스듬히 비출 때 빛이 퍼지는 모습을 비교하는 자료입니다.",
+                }
+            ],
+            "teacher_notes": {
+                "extra_questions": [
+                    "종이에 손전등을 수직/비스듬히 비춰 보면서 밝기 차이를 실제로 관찰해 보게 하세요.",
+                    "이 실험 결과를 계절이 바뀌는 이유와 어떻게 연결할 수 있을지 학생에게 먼저 말해 보게 해 주세요.",
+                ],
+                "teacher_point": "‘빛이 퍼지면 힘이 약해진다’는 직관을 만들도록 돕습니다.",
+            },
+        },
+        {
+            "id": "misconception_distance",
+            "stage": "더 생각해보기",
+            "label": "거리 오개념 확인",
+            "question": "계절은 지구가 태양에 가까워져서 또는 멀어져서 생긴다고 말해도 될까요?",
+            "expected_answers": [
+                "가까워서 덥고, 멀어서 추운 거라고 생각했어요.",
+                "조금은 거리도 관계가 있을 것 같은데, 그것만으로는 설명이 안 되는 것 같아요.",
+            ],
+            "feedback_rules": {},
+            "resources": [
+                {
+                    "id": "orbit_shape",
+                    "title": "지구 공전 궤도와 거리 변화 그림",
+                    "type": "image",
+                    "default_url": "https://flexible.img.hani.co.kr/flexible/normal/800/453/imgdb/original/2025/0104/20250104500223.jpg",
+                    "description": "지구가 타원 궤도로 돌지만, 거리 차이는 계절을 설명하기엔 크지 않다는 점을 보여 주는 자료입니다.",
+                }
+            ],
+            "teacher_notes": {
+                "extra_questions": [
+                    "만약 거리가 정말 크게 달라진다면, 봄과 가을의 온도는 어떻게 되어야 할까요?",
+                    "우리나라가 겨울일 때, 지구의 다른 지역은 어떤 계절인지 함께 생각해 보게 해 주세요.",
+                ],
+                "teacher_point": "거리 오개념을 바로 ‘틀렸다’고 말하기보다, 거리만으로는 설명이 어려운 사례를 떠올리게 합니다.",
+            },
+        },
+        {
+            "id": "elab_tilt",
+            "stage": "더 생각해보기",
+            "label": "자전축 기울기 의미",
+            "question": "‘지구의 자전축이 기울어져 있다’는 말은 어떤 뜻일까요?",
+            "expected_answers": [
+                "지구가 세워져서 도는 게 아니라 약간 기울어진 채로 돌고 있어요.",
+                "연필을 약간 비스듬히 세워서 돌리는 것처럼, 지구도 기울어진 채로 태양 주위를 돌아요.",
+            ],
+            "feedback_rules": {},
+            "resources": [
+                {
+                    "id": "tilt_demo",
+                    "title": "자전축 기울기 모형 영상(유튜브)",
+                    "type": "video",
+                    "default_url": "https://www.youtube.com/shorts/WOEU2LEl5ug?feature=share",
+                    "description": "자전축이 기울어진 지구본을 활용한 간단한 설명 영상입니다.",
+                }
+            ],
+            "teacher_notes": {
+                "extra_questions": [
+                    "자전축이 기울어진 채로 태양 주위를 돈다면, 어느 쪽 반구가 더 햇빛을 많이 받을까요?",
+                    "기울기가 없다면 계절은 어떻게 될지 상상해 보게 해 주세요.",
+                ],
+                "teacher_point": "‘기울어짐’과 ‘공전’을 함께 언급하여, 자전축 기울기가 계절과 어떻게 연결되는지 정교화합니다.",
+            },
+        },
+        {
+            "id": "summary_sentence",
+            "stage": "정리",
+            "label": "한 문장으로 계절 설명",
+            "question": "계절이 생기는 까닭을 한 문장으로 말해 볼까요?",
+            "expected_answers": [
+                "지구의 자전축이 기울어진 채로 태양 주위를 공전하기 때문에 계절이 생겨요.",
+                "지구가 기울어진 채로 도는 동안 태양빛이 비추는 각도와 낮의 길이가 달라져서 계절이 생겨요.",
+            ],
+            "feedback_rules": {},
+            "resources": [
+                {
+                    "id": "summary_card",
+                    "title": "계절 개념 한 장 정리 카드(이미지)",
+                    "type": "image",
+                    "default_url": "https://www.home-learn.co.kr/common/image.do?imgPath=newsroom&imgName=CK20230202093400748.png&imgGubun=D",
+                    "description": "수업 최종 정리용 계절 개념 요약 이미지입니다.",
+                }
+            ],
+            "teacher_notes": {
+                "extra_questions": [
+                    "방금 말해 준 문장에서 꼭 들어가야 한다고 생각하는 단어를 밑줄 그어 볼까요? (예: 자전축, 기울기, 공전)",
+                    "친구에게 설명하듯이, 조금 더 쉽게 풀어서 다시 말해 볼 수 있을까요?",
+                ],
+                "teacher_point": "학생이 만든 문장을 존중하고, 빠진 핵심어(자전축, 기울기, 공전, 태양빛 각도)를 하나씩 보완해 줍니다.",
+            },
+        },
+    ]
+
+
+# -----------------------------
+# 피드백 규칙 엔진
+# -----------------------------
+# 답변 분류 이름 (화면 표시용)
+CATEGORY_LABELS = {
+    "distance": "거리 오개념",
+    "tilt": "자전축 기울기",
+    "angle": "햇빛 각도",
+    "daylength": "낮 길이",
+    "other": "기타",
+    "empty": "빈 답",
+}
+
+
+@timed("classify_answer")
+def classify_answer(answer: str) -> str:
+    """학생 답변을 키워드 자동자로 분류합니다. (가장 많이 일치한 범주)"""
+    return classify_text(answer).category
+
+
+def classify_answer_scores(answer: str) -> Classification:
+    """범주별 일치 횟수와 신뢰도까지 함께 돌려줍니다."""
+    return classify_text(answer)
+
+
+# 예상 답변과 이 값 이상 비슷하면 피드백에 그 답변을 함께 보여 줍니다.
+SIMILARITY_THRESHOLD = 0.5
+
+# 답을 인용하는 첫 문단 (카드 feedback_rules 의 "header" 로 바꿀 수 있음)
+FEEDBACK_HEADER = "“{answer}”라고 생각해 주신 점이 정말 좋습니다. 스스로 계절이 생기는 까닭을 고민해 본 것만으로도 큰 배움이에요."
+# 예상 답변과 비슷할 때 덧붙이는 문단 (카드 feedback_rules 의 "similar" 로 바꿀 수 있음)
+FEEDBACK_SIMILAR = "친구들이 자주 떠올리는 생각인 “{expected}”와 비슷해요. 두 문장을 비교하며 무엇이 같고 다른지 살펴보세요."
+
+# 분류별 기본 피드백 문단. 카드 feedback_rules 에 같은 분류가 있으면 그쪽을 씁니다. (형식은 feedback_rules.py 참고)
+DEFAULT_FEEDBACK_RULES: Dict[str, List[str]] = {
+    "distance": [
+        "태양과 지구 사이의 거리를 떠올린 것은 아주 자연스러운 생각이에요.",
+        "하지만 실제로는 지구가 1년 동안 태양을 도는 동안 **거리 차이는 그리 크지 않아서**, 여름과 겨울처럼 큰 온도 차이를 만들 만큼의 이유가 되지는 않습니다.",
+        "더 중요한 까닭은 **자전축이 기울어진 채로 공전**하면서 태양빛의 각도와 낮의 길이가 달라지기 때문이에요.",
+        "만약 거리가 계절의 주된 이유라면, 지구가 태양에서 가장 멀어질 때 우리나라에는 어떤 계절이 와야 할까요?",
+    ],
+    "tilt": [
+        "자전축이 기울어져 있다는 말을 해 주신 것은 아주 중요한 핵심을 잘 짚은 거예요.",
+        "자전축이 약 23.5도 기울어진 채로 **태양 주위를 공전**하기 때문에, 계절마다 햇빛이 들어오는 각도와 낮의 길이가 달라집니다.",
+        "그래서 여름과 겨울 같은 계절 차이가 나타나게 돼요.",
+        "‘자전축 기울기’와 ‘공전’을 넣어서 한 문장으로 다시 말해 볼 수 있을까요?",
+    ],
+    "angle": [
+        "햇빛이 **수직에 가깝게** 혹은 **비스듬히** 들어온다는 점을 떠올린 것은 과학적으로 매우 예리한 관찰이에요.",
+        "같은 양의 햇빛이라도 수직에 가깝게 들어오면 **작은 면적에 에너지가 모여서** 더 뜨겁게 느껴지고, 비스듬히 들어오면 **넓은 면적에 퍼져서** 약하게 느껴집니다.",
+        "즉, 빛이 비스듬히 들어올수록 단위 면적당 받는 에너지가 줄어드는 셈이에요.",
+        "그렇다면 겨울에는 왜 여름보다 햇빛이 덜 강하게 느껴지는지, ‘각도’라는 말을 넣어서 다시 말해 볼까요?",
+    ],
+    "daylength": [
+        "낮의 길이와 밤의 길이를 떠올린 것은 계절을 이해하는 데 아주 중요한 관찰이에요.",
+        "자전축이 기울어진 채로 공전하면서, 어떤 때에는 우리나라가 태양을 더 오래 바라보게 되어 **낮이 길어지고**, 어떤 때에는 **밤이 길어지게** 됩니다.",
+        "낮이 길어질수록 더 따뜻하게, 낮이 짧아질수록 더 선선하게 느껴질 수 있어요.",
+        "‘낮 길이 변화’ + ‘자전축 기울기/공전’을 넣어서 한 문장으로 정리해 볼까요?",
+    ],
+    "other": [
+        "지금 적어 주신 생각 속에도 중요한 단서가 있어요. 다만 아직은 조금 막연할 수 있습니다.",
+        "**태양의 높이**, **햇빛이 비추는 각도**, **낮과 밤의 길이** 중에서 무엇과 가장 관련이 있을지 하나를 골라서 다시 설명해 보면 좋아요.",
+        "“어떤 계절에는 태양이 어떻게 보이고, 그래서 무엇이 달라진다”처럼 문장을 한 번 더 만들어 볼까요?",
+    ],
+    "empty": [
+        "아직 생각을 적지 않았네요. 떠오르는 생각을 편하게 한 문장이라도 적어 보면 좋겠습니다.",
+        "떠오르는 단어 두세 개만 적어 보는 것도 좋은 시작입니다.",
+        "예를 들어 ‘태양빛의 각도’, ‘자전축 기울기’, ‘낮의 길이’처럼 계절과 관련이 있을 것 같은 말을 하나 골라 적어 보세요.",
+        "이 중에서 어떤 단어가 계절과 가장 깊은 관련이 있을지 다음 차례에 말로 설명해 볼 수 있을까요?",
+    ],
+}
+
+
+def score_answer(answer: str, card: Card) -> Optional["SimilarityMatch"]:
+    """답변과 가장 비슷한 이 카드의 예상 답변과 유사도(0~1)."""
+    return get_answer_index().score(answer, card.id)
+
+
+@timed("build_feedback")
+def build_feedback(answer: str, card: Card, match: Optional["SimilarityMatch"] = None) -> str:
+    """
+    미리 만든 (카드, 분류) 본문에 답을 인용하는 첫 문단만 붙여서 피드백을 만듭니다.
+    - match 를 주지 않으면 예상 답변과의 유사도를 여기서 계산합니다. (묶음 채점은 미리 한꺼번에 계산해서 넘김)
+    """
+    category = classify_answer(answer)
+    if match is None and answer and answer.strip():
+        match = score_answer(answer, card)
+    expected = match.expected if match is not None and match.score >= SIMILARITY_THRESHOLD else None
+    return get_feedback_book().render(card, category, answer, expected)
+
+
+@lru_cache(maxsize=1)
+def get_card_registry() -> CardRegistry:
+    """카드 색인은 프로세스당 한 번만 만들고 모든 세션/작업자가 함께 읽습니다."""
+    return CardRegistry.from_dicts(get_default_cards())
+
+
+@lru_cache(maxsize=1)
+def get_feedback_book() -> FeedbackBook:
+    """모든 카드의 피드백 규칙을 프로세스당 한 번만 본문 표로 만듭니다."""
+    return FeedbackBook(get_card_registry().cards, DEFAULT_FEEDBACK_RULES, FEEDBACK_HEADER, FEEDBACK_SIMILAR)
+
+
+@lru_cache(maxsize=1)
+def get_answer_index() -> "ExpectedAnswerIndex":
+    """예상 답변 TF-IDF 행렬도 프로세스당 한 번만 만듭니다."""
+    from answer_similarity import ExpectedAnswerIndex
+
+    return ExpectedAnswerIndex(get_card_registry())
+
+
+# -----------------------------
+# 한 장 정리 본문
+# -----------------------------
+SUMMARY_MARKDOWN = """
+- 지구의 **자전축은 약 23.5도 기울어져** 있습니다.  
+- 이 기울어진 상태로 지구가 **태양 주위를 1년에 한 바퀴 공전**합니다.  
+- 그래서 어떤 때에는 우리나라 쪽이 태양을 더 정면으로 바라보고, 어떤 때에는 더 비스듬히 바라보게 됩니다.  
+- 그 결과, 한 장소에서도 **태양의 높이(태양 고도)** 와 **햇빛이 비추는 각도**, **낮과 밤의 길이**가 계절에 따라 달라집니다.  
+- 태양빛이 더 **수직에 가깝게** 들어오고 낮이 길어질수록 여름처럼 더 **뜨겁고 밝게**,  
+  더 **비스듬히** 들어오고 낮이 짧아질수록 겨울처럼 더 **선선하고 어둡게** 느껴집니다.
+"""
+
+# 수업 마무리 체크리스트 (위젯 key, 문장)
+SUMMARY_CHECKLIST = [
+    ("chk_sun_height", "여름과 겨울에 태양의 높이와 그림자 길이 차이를 설명할 수 있다."),
+    ("chk_angle_energy", "햇빛의 입사각(수직/비스듬히)과 단위 면적당 에너지 양의 관계를 말할 수 있다."),
+    ("chk_distance_misconception", "계절이 태양과의 거리 때문이라는 생각이 왜 정확하지 않은지 설명할 수 있다."),
+    ("chk_tilt_orbit", "자전축 기울기와 공전이 계절과 어떻게 연결되는지 한 문장으로 말할 수 있다."),
+]
@@ -0,0 +1,335 @@
+"""
+인쇄용 내보내기: "한 장 정리"와 모든 발문 카드를 HTML 한 파일(이미지 내장)과 PDF로 만듭니다.
+
+- 이미지 자료는 로컬 이미지 캐시의 썸네일을 data: URI로 넣어서, 인터넷 없이도 열리는 HTML이 됩니다.
+- 결과는 내용 해시(카드 + 자료 URL + 정리 본문)를 이름으로 .cache/exports 에 저장합니다.
+  내용이 같으면 다시 만들지 않고 파일을 그대로 돌려줍니다.
+- 만들기는 백그라운드 스레드에서 하고, 같은 내용을 동시에 요청하면 한 번만 만듭니다.
+- PDF는 weasyprint가 설치되어 있을 때만 만듭니다. (pip install weasyprint)
+  없으면 PDF는 아예 시도하지 않고 결과의 pdf_error 에 그 사유를 남깁니다.
+- 만들기가 실패하면 그 내용 해시의 실패 사유를 남겨 두고(failure), 다시 요청하면 새로 만듭니다.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+import base64
+import hashlib
+import html
+import importlib.util
+import json
+import logging
+import re
+import threading
+import time
+
+from card_registry import Card
+from resource_store import write_json_atomic
+from url_resolver import STRATEGY_IMAGE, resolve_url
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_DIR = Path(".cache") / "exports"
+EXPORT_FORMAT = 1  # 출력 모양을 바꾸면 올려서 예전 파일을 쓰지 않게 합니다.
+MAX_EXPORTS = 20  # 이보다 많으면 오래된 것부터 지웁니다.
+
+PDF_AVAILABLE = importlib.util.find_spec("weasyprint") is not None
+PDF_MISSING = "PDF를 만들려면 weasyprint를 설치하세요. (pip install weasyprint)"
+
+# (카드 id, 자료 id) → 화면에 쓰는 자료 URL
+ResourceUrls = Dict[Tuple[str, str], str]
+# URL → (이미지 바이트, MIME). 받을 수 없으면 None
+ImageLoader = Callable[[str], Optional[Tuple[bytes, str]]]
+
+
+# -----------------------------
+# 본문 만들기
+# -----------------------------
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+
+def _inline(text: str) -> str:
+    return _BOLD_RE.sub(r"<strong>\1</strong>", html.escape(text.strip()))
+
+
+def render_markdown(markdown: str) -> str:
+    """
+    수업 본문에 쓰는 만큼의 마크다운(제목, '- ' 목록, **굵게**, 문단)만 HTML로 바꿉니다.
+    목록 항목 아래 들여쓴 줄은 앞 항목에 이어 붙입니다.
+    """
+    out: List[str] = []
+    items: List[str] = []
+    paragraph: List[str] = []
+
+    def flush() -> None:
+        if items:
+            out.append("<ul>" + "".join(f"<li>{i}</li>" for i in items) + "</ul>")
+            items.clear()
+        if paragraph:
+            out.append("<p>" + " ".join(paragraph) + "</p>")
+            paragraph.clear()
+
+    for line in markdown.splitlines():
+        if not line.strip():
+            flush()
+        elif line.startswith("- "):
+            if paragraph:
+                flush()
+            items.append(_inline(line[2:]))
+        elif line.startswith(" ") and items:
+            items[-1] += " " + _inline(line)
+        elif line.startswith("#"):
+            flush()
+            level = min(len(line) - len(line.lstrip("#")), 6)
+            out.append(f"<h{level}>{_inline(line.lstrip('#'))}</h{level}>")
+        else:
+            if items:
+                flush()
+            paragraph.append(_inline(line))
+    flush()
+    return "\n".join(out)
+
+
+def sniff_image_type(data: bytes) -> str:
+    """data: URI에 넣을 MIME. 알 수 없으면 빈 문자열."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return ""
+
+
+_CSS = """
+body { font-family: "Noto Sans KR", "Apple SD Gothic Neo", "Malgun Gothic", sans-serif; line-height: 1.6; margin: 2em; color: #222; }
+h1 { font-size: 1.6em; border-bottom: 2px solid #444; padding-bottom: .3em; }
+h2 { font-size: 1.3em; margin-top: 1.6em; }
+.card { border: 1px solid #bbb; border-radius: 8px; padding: 1em 1.2em; margin: 1em 0; page-break-inside: avoid; }
+.stage { color: #666; font-size: .9em; }
+.question { font-size: 1.1em; font-weight: bold; }
+.answer-box { border: 1px dashed #999; height: 5em; margin: .6em 0; }
+.resource img { max-width: 100%; max-height: 12cm; }
+.resource .url { color: #555; font-size: .8em; word-break: break-all; }
+.checklist li { list-style: none; }
+.checklist li::before { content: "☐ "; }
+.card-break { page-break-before: always; }
+"""
+
+
+def build_html(
+    title: str,
+    summary_markdown: str,
+    checklist: Sequence[str],
+    cards: Sequence[Card],
+    resource_urls: ResourceUrls,
+    load_image: Optional[ImageLoader] = None,
+) -> str:
+    """자체 완결 HTML 문서를 만듭니다. 이미지 자료는 load_image 로 받아 내장합니다."""
+    esc = html.escape
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="ko"><head><meta charset="utf-8">',
+        f"<title>{esc(title)}</title><style>{_CSS}</style></head><body>",
+        f"<h1>{esc(title)}</h1>",
+        "<h2>한 장 정리</h2>",
+        render_markdown(summary_markdown),
+        "<h2>수업 마무리 체크리스트</h2>",
+        '<ul class="checklist">' + "".join(f"<li>{esc(t)}</li>" for t in checklist) + "</ul>",
+    ]
+
+    for n, card in enumerate(cards, start=1):
+        parts.append(f'<section class="card{" card-break" if n == 1 else ""}">')
+        parts.append(f'<div class="stage">{n}. {esc(card.stage)} · {esc(card.label)}</div>')
+        parts.append(f'<p class="question">{esc(card.question)}</p>')
+        parts.append('<div class="answer-box"></div>')
+        for res in card.resources:
+            url = resource_urls.get((card.id, res.id), "")
+            if not url:
+                continue
+            parts.append(f'<div class="resource"><strong>{esc(res.title)}</strong>')
+            if res.description:
+                parts.append(f"<div>{esc(res.description)}</div>")
+            resolved = resolve_url(url, res.type)
+            image = load_image(resolved.url) if load_image and resolved.strategy == STRATEGY_IMAGE else None
+            if image is not None:
+                data, mime = image
+                parts.append(f'<img alt="{esc(res.title)}" src="data:{mime};base64,{base64.b64encode(data).decode("ascii")}">')
+            parts.append(f'<div class="url">{esc(url)}</div></div>')
+        if card.teacher_notes.teacher_point:
+            parts.append(f"<p><em>지도 포인트: {esc(card.teacher_notes.teacher_point)}</em></p>")
+        parts.append("</section>")
+
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def html_to_pdf(document: str) -> bytes:
+    """weasyprint로 PDF를 만듭니다. 설치되어 있지 않으면 RuntimeError."""
+    if not PDF_AVAILABLE:
+        raise RuntimeError(PDF_MISSING)
+    import weasyprint
+
+    return weasyprint.HTML(string=document).write_pdf()
+
+
+# -----------------------------
+# 내용 해시
+# -----------------------------
+def content_hash(
+    title: str,
+    summary_markdown: str,
+    checklist: Sequence[str],
+    cards: Sequence[Card],
+    resource_urls: ResourceUrls,
+) -> str:
+    """내보낼 내용이 같으면 같은 값을 돌려줍니다. (카드, 자료 URL, 정리 본문, 출력 형식)"""
+    payload = {
+        "format": EXPORT_FORMAT,
+        "title": title,
+        "summary": summary_markdown,
+        "checklist": list(checklist),
+        "cards": [
+            [
+                card.id, card.stage, card.label, card.question, card.teacher_notes.teacher_point,
+                [[r.id, r.title, r.type, r.description, resource_urls.get((card.id, r.id), "")] for r in card.resources],
+            ]
+            for card in cards
+        ],
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+# -----------------------------
+# 결과 캐시 + 백그라운드 생성
+# -----------------------------
+@dataclass(frozen=True)
+class ExportRequest:
+    title: str
+    summary_markdown: str
+    checklist: Tuple[str, ...]
+    cards: Tuple[Card, ...]
+    resource_urls: ResourceUrls
+
+    @property
+    def key(self) -> str:
+        return content_hash(self.title, self.summary_markdown, self.checklist, self.cards, self.resource_urls)
+
+
+@dataclass(frozen=True)
+class ExportResult:
+    key: str
+    html: Path
+    pdf: Optional[Path]
+    pdf_error: str = ""
+
+
+class LessonExporter:
+    """
+    내용 해시별로 HTML/PDF 파일을 만들어 두고 돌려줍니다.
+    만들기는 작업 스레드 하나에서 하고, 같은 해시의 요청이 진행 중이면 그 작업을 같이 기다립니다.
+    """
+
+    def __init__(self, root: Path = EXPORT_DIR, load_image: Optional[ImageLoader] = None, max_exports: int = MAX_EXPORTS):
+        self.root = Path(root)
+        self.load_image = load_image
+        self.max_exports = max_exports
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._failed: Dict[str, str] = {}  # 내용 해시 → 마지막 실패 사유 (오래된 것이 앞)
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lesson-export")
+
+    def _paths(self, key: str) -> Tuple[Path, Path, Path]:
+        return self.root / f"{key}.html", self.root / f"{key}.pdf", self.root / f"{key}.json"
+
+    def cached(self, key: str) -> Optional[ExportResult]:
+        """이미 만들어 둔 결과. 없으면 None. (파일 존재만 확인)"""
+        html_path, pdf_path, meta_path = self._paths(key)
+        if not (html_path.exists() and meta_path.exists()):
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return ExportResult(key, html_path, pdf_path if pdf_path.exists() else None, meta.get("pdf_error", ""))
+
+    def submit(self, request: ExportRequest) -> "Future[ExportResult]":
+        """결과가 있으면 바로 끝난 Future를, 없으면 백그라운드 작업을 돌려줍니다."""
+        key = request.key
+        with self._lock:
+            running = self._pending.get(key)
+            if running is not None:
+                return running
+            done = self.cached(key)
+            if done is not None:
+                future: Future = Future()
+                future.set_result(done)
+                return future
+            self._failed.pop(key, None)
+            future = self._pool.submit(self._build, key, request)
+            self._pending[key] = future
+            future.add_done_callback(lambda f, k=key: self._finish(k, f))
+            return future
+
+    def pending(self, key: str) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def failure(self, key: str) -> Optional[str]:
+        """마지막 만들기가 실패했으면 그 사유. 성공했거나 아직이면 None."""
+        with self._lock:
+            return self._failed.get(key)
+
+    def _finish(self, key: str, future: Future) -> None:
+        error = None if future.cancelled() else future.exception()
+        with self._lock:
+            self._pending.pop(key, None)
+            if error is not None:
+                self._failed[key] = str(error) or type(error).__name__
+                while len(self._failed) > self.max_exports:
+                    del self._failed[next(iter(self._failed))]
+
+    def _build(self, key: str, request: ExportRequest) -> ExportResult:
+        try:
+            return self._write(key, request)
+        except Exception:
+            _LOGGER.exception("인쇄용 파일을 만들지 못했습니다: %s", request.title)
+            raise
+
+    def _write(self, key: str, request: ExportRequest) -> ExportResult:
+        started = time.perf_counter()
+        document = build_html(
+            request.title, request.summary_markdown, request.checklist, request.cards, request.resource_urls, self.load_image
+        )
+        self.root.mkdir(parents=True, exist_ok=True)
+        html_path, pdf_path, meta_path = self._paths(key)
+        html_path.write_text(document, encoding="utf-8")
+
+        pdf_error = "" if PDF_AVAILABLE else PDF_MISSING
+        if PDF_AVAILABLE:
+            try:
+                pdf_path.write_bytes(html_to_pdf(document))
+            except Exception as e:  # weasyprint 오류 종류가 많아서 모두 받아 HTML만이라도 내보냅니다.
+                pdf_error = str(e)
+                _LOGGER.warning("PDF를 만들지 못했습니다: %s", e)
+
+        # 메타 파일을 마지막에 써서, 메타가 있으면 HTML/PDF가 다 쓰인 것으로 봅니다.
+        write_json_atomic(meta_path, {"title": request.title, "created_at": time.time(), "pdf_error": pdf_error,
+                                      "seconds": round(time.perf_counter() - started, 3)})
+        self._prune()
+        return ExportResult(key, html_path, pdf_path if pdf_path.exists() else None, pdf_error)
+
+    def _prune(self) -> None:
+        metas = sorted(self.root.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for meta in metas[self.max_exports:]:
+            for path in self._paths(meta.stem):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
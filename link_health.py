@@ -0,0 +1,258 @@
+"""
+자료 링크 상태 점검 (asyncio + aiohttp)
+
+- 모든 카드의 자료 URL(저장된 URL 포함)을 동시에 점검합니다.
+- HEAD 요청을 먼저 보내고, 서버가 HEAD를 거부하면 GET으로 다시 확인합니다.
+- 전체 동시 연결 수와 호스트별 동시 연결 수를 제한하고, 요청마다 시간 제한을 둡니다.
+  시간 제한과 걸린 시간은 차례를 기다린 뒤(세마포어를 잡은 뒤)부터 잽니다.
+- 결과는 TTL 동안 메모리에 보관하며, 앱에서는 백그라운드 스레드에서만 점검합니다.
+
+    python link_health.py            # 밤마다 돌리는 점검 (실패가 있으면 종료 코드 1)
+    python link_health.py --json report.json
+"""
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import asyncio
+import json
+import sys
+import threading
+import time
+import urllib.parse
+
+import aiohttp
+
+from card_registry import CardRegistry, Resource
+
+if TYPE_CHECKING:
+    from lesson_catalog import LessonCatalog
+
+CHECK_TIMEOUT = 5.0  # 초
+MAX_CONNECTIONS = 64
+MAX_PER_HOST = 6
+HEALTH_TTL = 10 * 60  # 초
+USER_AGENT = "season-lesson-link-checker/1.0"
+
+# HEAD를 지원하지 않는 서버가 흔히 돌려주는 상태 코드
+_HEAD_FALLBACK_STATUS = {400, 403, 404, 405, 406, 501}
+
+
+@dataclass(frozen=True)
+class LinkTarget:
+    card_id: str
+    res_id: str
+    title: str
+    url: str
+    unit_id: str = ""
+
+
+@dataclass(frozen=True)
+class HealthResult:
+    url: str
+    ok: bool
+    status: int
+    elapsed_ms: float
+    error: str
+    checked_at: float
+
+    @property
+    def badge(self) -> str:
+        return "🟢" if self.ok else "🔴"
+
+
+def collect_targets(
+    registry: CardRegistry,
+    resolve_url: Callable[[str, Resource], str],
+    unit_id: str = "",
+) -> List[LinkTarget]:
+    """카드 전체를 돌며 점검할 링크 목록을 만듭니다. (resolve_url: 저장값/기본값 반영)"""
+    targets = []
+    for card in registry.cards:
+        for res in card.resources:
+            url = resolve_url(card.id, res)
+            if url:
+                targets.append(LinkTarget(card.id, res.id, res.title, url, unit_id))
+    return targets
+
+
+def collect_catalog_targets(
+    catalog: "LessonCatalog",
+    resolve_url: Callable[[str, Resource], str],
+) -> List[LinkTarget]:
+    """카탈로그의 모든 단원(기본 수업, lessons/, 묶음)을 하나씩 열어 링크 목록을 만듭니다."""
+    targets = []
+    for info in catalog.units:
+        try:
+            registry = catalog.unit(info.id)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 단원 {info.id}을(를) 열지 못해 건너뜁니다: {e}", file=sys.stderr)
+            continue
+        targets.extend(collect_targets(registry, resolve_url, info.id))
+    return targets
+
+
+# -----------------------------
+# 점검
+# -----------------------------
+async def _probe(
+    session: aiohttp.ClientSession,
+    url: str,
+    timeout: float,
+    slots: asyncio.Semaphore,
+    host_slots: Dict[str, asyncio.Semaphore],
+    max_per_host: int,
+) -> HealthResult:
+    host = urllib.parse.urlsplit(url).hostname or ""
+    gate = host_slots.setdefault(host, asyncio.Semaphore(max_per_host))
+    # 같은 호스트의 앞선 요청이 끝나기를 기다린 시간은 시간 제한에 넣지 않습니다.
+    async with gate, slots:
+        return await _probe_now(session, url, timeout)
+
+
+async def _probe_now(session: aiohttp.ClientSession, url: str, timeout: float) -> HealthResult:
+    started = time.perf_counter()
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    status = 0
+    error = ""
+    try:
+        async with session.head(url, allow_redirects=True, timeout=client_timeout) as resp:
+            status = resp.status
+        if status in _HEAD_FALLBACK_STATUS:
+            # 본문은 읽지 않고 상태 줄과 헤더만 확인합니다.
+            async with session.get(url, allow_redirects=True, timeout=client_timeout) as resp:
+                status = resp.status
+    except asyncio.TimeoutError:
+        error = "시간 초과"
+    except aiohttp.ClientError as e:
+        error = f"{type(e).__name__}: {e}"
+    except ValueError as e:
+        error = f"잘못된 URL: {e}"
+    except Exception as e:  # URL 하나의 뜻밖의 오류가 묶음 전체의 결과를 버리지 않도록 결과로 남깁니다.
+        error = f"{type(e).__name__}: {e}"
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    ok = not error and 200 <= status < 400
+    return HealthResult(url, ok, status, round(elapsed_ms, 1), error, time.time())
+
+
+async def check_links(
+    urls: Iterable[str],
+    timeout: float = CHECK_TIMEOUT,
+    max_connections: int = MAX_CONNECTIONS,
+    max_per_host: int = MAX_PER_HOST,
+) -> Dict[str, HealthResult]:
+    """URL들을 동시에 점검합니다. 같은 URL은 한 번만 요청합니다."""
+    unique = list(dict.fromkeys(u for u in urls if u))
+    if not unique:
+        return {}
+    # 동시 요청 수는 세마포어로 제한합니다. (커넥터 한도로 줄 세우면 기다리는 시간도 시간 제한에 들어감)
+    slots = asyncio.Semaphore(max_connections)
+    host_slots: Dict[str, asyncio.Semaphore] = {}
+    connector = aiohttp.TCPConnector(limit=max_connections, limit_per_host=max_per_host, ttl_dns_cache=300)
+    headers = {"User-Agent": USER_AGENT}
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        results = await asyncio.gather(*(_probe(session, u, timeout, slots, host_slots, max_per_host) for u in unique))
+    return {r.url: r for r in results}
+
+
+# -----------------------------
+# 앱용: TTL 캐시 + 백그라운드 점검
+# -----------------------------
+class LinkHealthMonitor:
+    """
+    점검 결과를 TTL 동안 보관합니다.
+    request()는 기다리지 않고 바로 돌아오며, 오래된 URL만 백그라운드 이벤트 루프에서 점검합니다.
+    """
+
+    def __init__(self, ttl: float = HEALTH_TTL, timeout: float = CHECK_TIMEOUT):
+        self.ttl = ttl
+        self.timeout = timeout
+        self._results: Dict[str, HealthResult] = {}
+        self._inflight: set = set()
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="link-health", daemon=True)
+        self._thread.start()
+
+    def get(self, url: str) -> Optional[HealthResult]:
+        """TTL 안의 결과가 있으면 돌려줍니다. (없으면 None)"""
+        result = self._results.get(url)
+        if result is None or time.time() - result.checked_at > self.ttl:
+            return None
+        return result
+
+    def request(self, urls: Iterable[str], force: bool = False):
+        """오래되었거나 처음 보는 URL을 백그라운드에서 점검하도록 예약합니다."""
+        with self._lock:
+            todo = [
+                u for u in dict.fromkeys(urls)
+                if u and u not in self._inflight and (force or self.get(u) is None)
+            ]
+            self._inflight.update(todo)
+        if not todo:
+            return None
+        return asyncio.run_coroutine_threadsafe(self._run(todo), self._loop)
+
+    async def _run(self, urls: List[str]) -> None:
+        try:
+            results = await check_links(urls, timeout=self.timeout)
+            # 새 결과를 넣으면서 TTL이 지난 결과는 버립니다. (화면 스레드가 읽는 중일 수 있어 새 dict로 바꿔 끼움)
+            cutoff = time.time() - self.ttl
+            merged = {**self._results, **results}
+            self._results = {u: r for u, r in merged.items() if r.checked_at >= cutoff}
+        finally:
+            with self._lock:
+                self._inflight.difference_update(urls)
+
+    def pending(self) -> int:
+        return len(self._inflight)
+
+
+# -----------------------------
+# 명령줄 (밤마다 점검)
+# -----------------------------
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    from lesson_bundle import get_bundle
+    from lesson_catalog import get_catalog
+    from lesson_engine import load_resource_urls, sanitize_url
+
+    parser = argparse.ArgumentParser(description="자료 링크 상태 점검")
+    parser.add_argument("--json", type=Path, default=None, help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--timeout", type=float, default=CHECK_TIMEOUT, help="요청당 시간 제한(초)")
+    args = parser.parse_args(argv)
+
+    saved = load_resource_urls()
+    bundle = get_bundle()
+    bundled = bundle.resource_urls if bundle is not None else {}
+
+    def url_for(card_id: str, res: Resource) -> str:
+        # 앱과 같은 순서: 저장값 → 묶음의 URL → 카드 기본값
+        stored = {**bundled.get(card_id, {}), **saved.get(card_id, {})}.get(res.id, "")
+        return sanitize_url(stored, res.default_url)
+
+    targets = collect_catalog_targets(get_catalog(), url_for)
+
+    started = time.perf_counter()
+    results = asyncio.run(check_links((t.url for t in targets), timeout=args.timeout))
+    elapsed = time.perf_counter() - started
+
+    broken: Dict[str, int] = {}
+    for t in targets:
+        r = results[t.url]
+        if not r.ok:
+            broken[t.unit_id] = broken.get(t.unit_id, 0) + 1
+        detail = r.error or f"HTTP {r.status}"
+        print(f"{r.badge} [{t.unit_id}/{t.card_id}/{t.res_id}] {t.title} - {detail} ({r.elapsed_ms:.0f}ms)")
+    per_unit = ", ".join(f"{unit} {n}개" for unit, n in broken.items())
+    print(f"링크 {len(results)}개 점검, 실패 {sum(broken.values())}개{f' ({per_unit})' if per_unit else ''}, {elapsed:.2f}초", file=sys.stderr)
+
+    if args.json:
+        report = [{**asdict(t), **asdict(results[t.url])} for t in targets]
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+실시간 수업 모드: 세션끼리 공유하는 프로세스 전체 저장소
+
+- 학생 세션은 자기 최신 답변/분류를 올립니다. (publish)
+- 교사 세션은 마지막으로 본 버전 이후에 바뀐 학생만 받아 갑니다. (changes_since)
+- 교사가 카드 id를 보내면(push_card) 학생 세션이 다음 폴링 때 그 카드로 이동합니다.
+- 반은 교사가 열 때만 만듭니다. 학생 쪽은 없는 수업 코드면 아무것도 만들지 않고,
+  ROOM_IDLE_TIMEOUT 동안 아무도 쓰지 않은 반은 치웁니다.
+
+반마다(수업 코드) 잠금이 따로 있어서 여러 반이 동시에 써도 서로 기다리지 않습니다.
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+import threading
+import time
+
+STUDENT_IDLE_TIMEOUT = 2 * 60 * 60  # 초, 이보다 오래 조용한 학생은 목록에서 뺍니다.
+ROOM_IDLE_TIMEOUT = 6 * 60 * 60  # 초, 이보다 오래 아무도 쓰지 않은 반은 치웁니다.
+MAX_TOMBSTONES = 1000
+
+
+@dataclass(frozen=True)
+class StudentState:
+    key: str
+    name: str
+    card_id: str
+    answer: str
+    category: str
+    version: int
+    updated_at: float
+
+
+@dataclass(frozen=True)
+class LiveDiff:
+    version: int
+    changed: List[StudentState]
+    removed: List[str]
+    full: bool  # True면 changed가 전체 목록입니다. (받는 쪽은 기존 목록을 버림)
+
+
+class ClassRoom:
+    __slots__ = (
+        "code", "lock", "version", "students", "tombstones", "tombstone_floor", "push_version", "pushed_card_id",
+        "last_active",
+    )
+
+    def __init__(self, code: str):
+        self.code = code
+        self.lock = threading.Lock()
+        self.version = 0
+        # 최근에 바뀐 학생이 맨 뒤에 오도록 유지합니다. (변경 목록 겸용)
+        self.students: "OrderedDict[str, StudentState]" = OrderedDict()
+        # 빠진 학생 기록 (버전, key). 너무 오래된 기록은 버리고, 그보다 옛 버전을 물으면 전체를 보냅니다.
+        self.tombstones: "deque[Tuple[int, str]]" = deque()
+        self.tombstone_floor = 0
+        self.push_version = 0
+        self.pushed_card_id: Optional[str] = None
+        self.last_active = time.time()
+
+    def remove(self, key: str) -> None:
+        if self.students.pop(key, None) is None:
+            return
+        self.version += 1
+        self.tombstones.append((self.version, key))
+        if len(self.tombstones) > MAX_TOMBSTONES:
+            self.tombstone_floor = self.tombstones.popleft()[0]
+
+
+class LiveClassroom:
+    def __init__(self, idle_timeout: float = STUDENT_IDLE_TIMEOUT, room_idle_timeout: float = ROOM_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.room_idle_timeout = room_idle_timeout
+        self._rooms: Dict[str, ClassRoom] = {}
+        self._lock = threading.Lock()
+
+    def room(self, code: str) -> Optional[ClassRoom]:
+        """열려 있는 반. 없거나 오래 쓰지 않아 치운 반이면 None."""
+        now = time.time()
+        with self._lock:
+            room = self._rooms.get(code)
+            if room is None:
+                return None
+            if now - room.last_active > self.room_idle_timeout:
+                del self._rooms[code]
+                return None
+            room.last_active = now
+            return room
+
+    def open_room(self, code: str) -> ClassRoom:
+        """교사 쪽: 반을 열거나(없으면 만듦) 이어서 씁니다. 오래 쓰지 않은 다른 반도 이때 치웁니다."""
+        now = time.time()
+        with self._lock:
+            for stale in [c for c, r in self._rooms.items() if now - r.last_active > self.room_idle_timeout]:
+                del self._rooms[stale]
+            room = self._rooms.get(code)
+            if room is None:
+                room = self._rooms[code] = ClassRoom(code)
+            room.last_active = now
+            return room
+
+    # --- 학생 ---
+    def publish(self, code: str, key: str, name: str, card_id: str, answer: str, category: str) -> Optional[int]:
+        """
+        학생의 최신 답변을 올리고 새 버전 번호를 돌려줍니다. 교사가 아직 열지 않은 반이면 None.
+        key 는 학생 세션마다 바뀌지 않는 값(이어 하기 토큰)이라서, 새로 고침해도 한 줄로 남습니다.
+        """
+        room = self.room(code)
+        if room is None:
+            return None
+        now = time.time()
+        with room.lock:
+            room.version += 1
+            room.students[key] = StudentState(key, name, card_id, answer, category, room.version, now)
+            room.students.move_to_end(key)
+            self._expire(room, now)
+            return room.version
+
+    def leave(self, code: str, key: str) -> None:
+        room = self.room(code)
+        if room is None:
+            return
+        with room.lock:
+            room.remove(key)
+
+    def pushed_card(self, code: str) -> Tuple[int, Optional[str]]:
+        """(push 버전, 교사가 보낸 카드 id). 열리지 않은 반이면 (0, None)."""
+        room = self.room(code)
+        if room is None:
+            return 0, None
+        with room.lock:
+            return room.push_version, room.pushed_card_id
+
+    # --- 교사 ---
+    def changes_since(self, code: str, version: int) -> LiveDiff:
+        """version 이후에 바뀐 학생과 빠진 학생만 돌려줍니다. (바뀐 수만큼만 훑음)"""
+        room = self.open_room(code)
+        with room.lock:
+            # 반을 치운 뒤 새로 열었으면 버전이 처음부터 다시 시작하므로 전체를 보냅니다.
+            if version < room.tombstone_floor or version > room.version:
+                return LiveDiff(room.version, list(room.students.values()), [], True)
+
+            changed: List[StudentState] = []
+            for state in reversed(room.students.values()):
+                if state.version <= version:
+                    break
+                changed.append(state)
+            changed.reverse()
+
+            removed: List[str] = []
+            for v, key in reversed(room.tombstones):
+                if v <= version:
+                    break
+                if key not in room.students:
+                    removed.append(key)
+            return LiveDiff(room.version, changed, removed, False)
+
+    def push_card(self, code: str, card_id: str) -> int:
+        """모든 학생을 card_id 카드로 보냅니다."""
+        room = self.open_room(code)
+        with room.lock:
+            room.push_version += 1
+            room.pushed_card_id = card_id
+            return room.push_version
+
+    def _expire(self, room: ClassRoom, now: float) -> None:
+        # 가장 오래 조용했던 학생이 맨 앞에 있으므로 앞에서부터만 봅니다.
+        while room.students:
+            oldest = next(iter(room.students.values()))
+            if now - oldest.updated_at <= self.idle_timeout:
+                break
+            room.remove(oldest.key)
@@ -0,0 +1,169 @@
+"""
+실행 시간 측정 (LESSON_PROFILE=1 일 때만 동작)
+
+    LESSON_PROFILE=1 LESSON_PROFILE_TRACE=trace.jsonl streamlit run app.py
+
+- span("이름") / @timed("이름") 으로 구간 시간을 잽니다.
+- 프로세스 전체와 세션별 히스토그램을 따로 모읍니다. 세션별은 최근에 움직인 MAX_SESSIONS 개만 남깁니다.
+- LESSON_PROFILE_TRACE 가 있으면 구간마다 JSONL 한 줄을 남깁니다.
+- render_prometheus() 는 Prometheus 텍스트 형식으로 내보냅니다.
+
+꺼져 있을 때 @timed 는 원래 함수를 그대로 돌려주고, span 은 아무 일도 하지 않는 공용 객체를 돌려줍니다.
+"""
+from typing import Callable, Dict, List, Optional, TypeVar
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+import bisect
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("LESSON_PROFILE", "").strip().lower() not in ("", "0", "false", "no")
+TRACE_PATH = os.environ.get("LESSON_PROFILE_TRACE", "")
+MAX_SESSIONS = 256  # 세션별 히스토그램을 남길 최근 세션 수 (Streamlit은 세션 종료를 알려 주지 않습니다)
+
+# 히스토그램 구간 상한(초): 10µs ~ 10s
+BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_NOOP = nullcontext()
+F = TypeVar("F", bound=Callable)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """구간 상한으로 근사한 분위수(초)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Profiler:
+    def __init__(self, trace_path: str = "", max_sessions: int = MAX_SESSIONS):
+        self._lock = threading.Lock()
+        self.process: Dict[str, Histogram] = {}
+        self.sessions: "OrderedDict[str, Dict[str, Histogram]]" = OrderedDict()  # 오래 전에 움직인 세션이 앞
+        self.max_sessions = max_sessions
+        self._trace = open(trace_path, "a", encoding="utf-8", buffering=1) if trace_path else None
+        self.session_provider: Callable[[], str] = lambda: ""
+
+    def record(self, name: str, seconds: float) -> None:
+        session = self.session_provider()
+        with self._lock:
+            self.process.setdefault(name, Histogram()).observe(seconds)
+            if session:
+                histograms = self.sessions.get(session)
+                if histograms is None:
+                    histograms = self.sessions[session] = {}
+                    while len(self.sessions) > self.max_sessions:
+                        self.sessions.popitem(last=False)
+                else:
+                    self.sessions.move_to_end(session)
+                histograms.setdefault(name, Histogram()).observe(seconds)
+            if self._trace is not None:
+                line = {"ts": time.time(), "span": name, "ms": round(seconds * 1000, 4), "session": session}
+                self._trace.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def snapshot(self, session: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            source = self.process if session is None else self.sessions.get(session, {})
+            return {name: h.summary() for name, h in sorted(source.items())}
+
+    def drop_session(self, session: str) -> None:
+        with self._lock:
+            self.sessions.pop(session, None)
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = [
+            "# HELP lesson_span_seconds Time spent in instrumented spans.",
+            "# TYPE lesson_span_seconds histogram",
+        ]
+        with self._lock:
+            for name, h in sorted(self.process.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, h.counts):
+                    cumulative += n
+                    lines.append(f'lesson_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'lesson_span_seconds_bucket{{span="{name}",le="+Inf"}} {h.count}')
+                lines.append(f'lesson_span_seconds_sum{{span="{name}"}} {h.total:.9f}')
+                lines.append(f'lesson_span_seconds_count{{span="{name}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+PROFILER: Optional[Profiler] = Profiler(TRACE_PATH) if ENABLED else None
+
+
+@contextmanager
+def _span(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        PROFILER.record(name, time.perf_counter() - started)
+
+
+def span(name: str):
+    """with span("이름"): ... 구간 시간을 잽니다. 꺼져 있으면 공용 no-op 객체를 돌려줍니다."""
+    if PROFILER is None:
+        return _NOOP
+    return _span(name)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """함수 실행 시간을 잽니다. 꺼져 있으면 함수를 감싸지 않습니다."""
+
+    def decorate(fn: F) -> F:
+        if PROFILER is None:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                PROFILER.record(name, time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def set_session_provider(provider: Callable[[], str]) -> None:
+    """세션별 히스토그램에 쓸 세션 id를 알려 주는 함수를 등록합니다."""
+    if PROFILER is not None:
+        PROFILER.session_provider = provider
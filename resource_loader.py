@@ -0,0 +1,162 @@
+"""
+추가 자료 동시 불러오기 (작업 스레드 수 제한 + 자료마다 시간 제한)
+
+- 서버가 먼저 받아야 하는 자료(이미지 썸네일)만 작업 스레드에서 받습니다.
+  영상/삽입 자료는 브라우저에 URL만 넘기므로 기다릴 것이 없습니다.
+- 작업 스레드는 모든 세션을 합쳐 max_workers 개입니다. 느린 호스트가 있어도 스레드가 무한히 늘지 않습니다.
+- 같은 URL을 여러 세션이 동시에 요청하면 진행 중인 작업 하나를 함께 기다립니다.
+- 화면이 시간 제한으로 포기해도 작업은 끝까지 돌아서 이미지 캐시를 채우므로, 다음에 열면 바로 나옵니다.
+- prefetch(): 앞뒤 카드의 이미지를 따로 작은 작업 스레드 묶음에서 미리 받아 캐시에 넣습니다.
+  · 아직 시작하지 않은 미리 받기는 cancel()로 취소합니다. (카드를 빠르게 넘길 때)
+  · 미리 받기가 동시에 받는 바이트는 ByteBudget 한도까지만. 넘으면 그 자료는 건너뛰고 필요할 때 받습니다.
+  · 같은 URL을 화면이 요청하면: 아직 대기 중이면 취소하고 바로 받고, 이미 받는 중이면 함께 기다립니다.
+    함께 기다린 미리 받기가 (바이트 한도 등으로) 받지 못하고 끝나면 화면용 작업 스레드에서 다시 받습니다.
+"""
+from typing import Dict, Iterable, List, Optional, Set
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import threading
+
+import requests
+from PIL import Image
+
+from image_cache import ImageCache
+from lesson_bundle import LessonBundle
+
+LOADER_WORKERS = 8
+LOAD_TIMEOUT = 6.0  # 초. 화면이 자료 하나를 기다리는 최대 시간
+PREFETCH_WORKERS = 2
+PREFETCH_MAX_BYTES = 16 * 1024 * 1024  # 미리 받기가 동시에 받고 있는 바이트 상한
+
+
+@dataclass(frozen=True)
+class LoadedImage:
+    url: str
+    data: Optional[bytes]  # None이면 서버에서 받지 못함 → 브라우저가 원격 URL을 직접 받게 합니다.
+    error: str = ""
+    link_only: bool = False  # 받았지만 이미지로 바꿀 수 없음(SVG/HTML, 압축 폭탄) → 링크로만 보여 줍니다.
+
+
+class ByteBudget:
+    """동시에 받고 있는 바이트 수 한도. 예약하지 못하면 기다리지 않고 False."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def available(self) -> int:
+        with self._lock:
+            return self.limit - self.used
+
+    def try_acquire(self, n: int) -> bool:
+        with self._lock:
+            if self.used + n > self.limit:
+                return False
+            self.used += n
+            return True
+
+    def release(self, n: int) -> None:
+        with self._lock:
+            self.used -= n
+
+
+class ResourceLoader:
+    def __init__(
+        self,
+        images: ImageCache,
+        bundle: Optional[LessonBundle] = None,
+        max_workers: int = LOADER_WORKERS,
+        prefetch_workers: int = PREFETCH_WORKERS,
+        prefetch_bytes: int = PREFETCH_MAX_BYTES,
+    ):
+        self.images = images
+        self.bundle = bundle
+        self.budget = ByteBudget(prefetch_bytes)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resource-loader")
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="resource-prefetch")
+        # 취소하면 done 콜백(_forget)이 같은 스레드에서 바로 불리므로 다시 들어갈 수 있는 잠금을 씁니다.
+        self._lock = threading.RLock()
+        self._inflight: Dict[str, Future] = {}
+        self._prefetches: Set[Future] = set()
+
+    def submit_image(self, url: str) -> "Future[LoadedImage]":
+        """썸네일 받기를 맡깁니다. 같은 URL이 이미 진행 중이면 그 작업을 돌려줍니다."""
+        with self._lock:
+            future = self._inflight.get(url)
+            if future is not None and future in self._prefetches:
+                # 대기 중인 미리 받기 뒤에 줄 서지 않도록 취소하고 화면용으로 새로 맡깁니다.
+                # 이미 받는 중이면 함께 기다리되, 받지 못하고 끝나면 화면용 작업 스레드에서 다시 받습니다.
+                future = None if future.cancel() else self._promote(url, future)
+            if future is not None:
+                return future
+            future = self._pool.submit(self._load_image, url)
+            self._inflight[url] = future
+        future.add_done_callback(lambda f: self._forget(url, f))
+        return future
+
+    def _promote(self, url: str, prefetch: Future) -> "Future[LoadedImage]":
+        """받는 중인 미리 받기를 화면용 작업으로 바꿉니다. (self._lock 안에서 부름)"""
+        outer: Future = Future()
+        outer.set_running_or_notify_cancel()
+        self._inflight[url] = outer
+        outer.add_done_callback(lambda f: self._forget(url, f))
+
+        def relay(source: Future, retry_on_empty: bool) -> None:
+            try:
+                loaded = source.result()
+            except Exception as e:  # 취소 포함
+                loaded = LoadedImage(url, None, str(e))
+            if retry_on_empty and loaded.data is None and not loaded.link_only:
+                # 미리 받기는 바이트 한도에 걸려 그만둘 수 있습니다. 화면용 작업은 한도 없이 받습니다.
+                self._pool.submit(self._load_image, url).add_done_callback(lambda f: relay(f, False))
+                return
+            outer.set_result(loaded)
+
+        prefetch.add_done_callback(lambda f: relay(f, True))
+        return outer
+
+    def prefetch(self, urls: Iterable[str]) -> List[Future]:
+        """진행 중이 아닌 URL만 미리 받기로 맡기고, 맡긴 작업을 돌려줍니다. (cancel 용)"""
+        submitted = []
+        with self._lock:
+            for url in dict.fromkeys(urls):
+                if not url or url in self._inflight:
+                    continue
+                future = self._prefetch_pool.submit(self._load_image, url, self.budget)
+                self._inflight[url] = future
+                self._prefetches.add(future)
+                submitted.append((url, future))
+        for url, future in submitted:
+            future.add_done_callback(lambda f, u=url: self._forget(u, f))
+        return [f for _, f in submitted]
+
+    def cancel(self, futures: Iterable[Future]) -> int:
+        """아직 시작하지 않은 미리 받기를 취소합니다. 이미 받는 중인 것은 끝까지 받아 캐시에 넣습니다."""
+        return sum(1 for f in futures if f in self._prefetches and f.cancel())
+
+    def _forget(self, url: str, future: Future) -> None:
+        with self._lock:
+            self._prefetches.discard(future)
+            if self._inflight.get(url) is future:
+                del self._inflight[url]
+
+    def _load_image(self, url: str, budget: Optional[ByteBudget] = None) -> LoadedImage:
+        thumb = self.bundle.thumbnail(url) if self.bundle is not None else None
+        if thumb is not None:
+            return LoadedImage(url, bytes(thumb))
+        try:
+            thumb = self.images.thumbnail(url, budget=budget)
+        except (requests.RequestException, ValueError, OSError, Image.DecompressionBombError) as e:
+            return LoadedImage(url, None, str(e))
+        if thumb is None:
+            return LoadedImage(url, None, "이미지로 바꿀 수 없는 자료입니다", link_only=True)
+        return LoadedImage(url, thumb)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._prefetch_pool.shutdown(wait=False, cancel_futures=True)
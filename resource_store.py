@@ -0,0 +1,261 @@
+"""
+자료 URL 저장소 (SQLite, WAL 모드)
+
+- URL 하나를 저장할 때 행 하나만 씁니다. (config.json 전체를 다시 쓰지 않음)
+- 여러 선생님이 동시에 저장해도 트랜잭션 단위로 안전하게 반영됩니다.
+- 쓸 때마다 같은 트랜잭션에서 버전 번호를 올립니다. 읽기는 버전이 같으면 메모리 캐시를 그대로 쓰므로,
+  같은 DB 파일을 쓰는 여러 앱 프로세스가 행 하나짜리 조회로 바뀐 것을 알아챕니다.
+- 기존 config.json 형식으로 가져오기/내보내기를 지원합니다.
+
+    python resource_store.py export config.json
+    python resource_store.py import config.json
+"""
+from typing import Any, Dict, Iterator, Optional, Tuple
+from contextlib import contextmanager
+from pathlib import Path
+import copy
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+STORE_PATH = Path("resource_urls.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resource_urls (
+    card_id    TEXT NOT NULL,
+    res_id     TEXT NOT NULL,
+    url        TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (card_id, res_id)
+)
+"""
+
+_META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS store_meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+)
+"""
+
+_UPSERT_SQL = (
+    "INSERT INTO resource_urls (card_id, res_id, url, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (card_id, res_id) DO UPDATE SET url = excluded.url, updated_at = excluded.updated_at"
+)
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """WAL 모드 SQLite 연결을 엽니다. (여러 스레드에서 잠금과 함께 사용)"""
+    conn = sqlite3.connect(str(path), timeout=10.0, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# -----------------------------
+# config.json 호환
+# -----------------------------
+def read_config_json(path: Path) -> Dict[str, Dict[str, str]]:
+    """config.json 형식({"resource_urls": {...}})을 읽습니다. 형식이 틀리면 ValueError."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    urls = data.get("resource_urls", {}) if isinstance(data, dict) else None
+    if not isinstance(urls, dict):
+        raise ValueError(f"resource_urls 형식이 올바르지 않습니다: {path}")
+    return {str(card_id): {str(k): str(v) for k, v in (res or {}).items()} for card_id, res in urls.items()}
+
+
+def write_config_json(path: Path, resource_urls: Dict[str, Dict[str, str]]) -> None:
+    """config.json 형식으로 씁니다."""
+    write_json_atomic(path, {"resource_urls": resource_urls})
+
+
+def write_json_atomic(path: Path, payload: Any) -> None:
+    """임시 파일에 쓴 뒤 교체해서, 중간에 끊겨도 반쯤 쓰인 파일이 남지 않게 합니다."""
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=str(path.parent or "."))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+# -----------------------------
+# 저장소
+# -----------------------------
+class ResourceUrlStore:
+    def __init__(self, path: Path = STORE_PATH, legacy_json: Optional[Path] = None):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_META_SCHEMA)
+        self._conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0)")
+        self._cache: Optional[Dict[str, Dict[str, str]]] = None
+        self._cache_version = -1
+
+        if legacy_json is not None and legacy_json.exists() and self._is_empty():
+            try:
+                self.import_json(legacy_json)
+            except (OSError, ValueError) as e:
+                # 깨진 파일을 빈 설정으로 덮어쓰지 않고 그대로 둡니다.
+                _LOGGER.warning("%s 를 가져오지 못했습니다: %s", legacy_json, e)
+
+    def _is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM resource_urls LIMIT 1").fetchone() is None
+
+    def _read_version(self) -> int:
+        return self._conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()[0]
+
+    # --- 읽기 ---
+    def version(self) -> int:
+        """저장할 때마다 1씩 커지는 번호. 다른 프로세스가 저장해도 바로 보입니다."""
+        with self._lock:
+            return self._read_version()
+
+    def snapshot(self) -> Tuple[int, Dict[str, Dict[str, str]]]:
+        """(버전, {card_id: {res_id: url}}). 버전이 그대로면 캐시에서 바로 돌려줍니다."""
+        with self._lock:
+            version = self._read_version()
+            if self._cache is None or version != self._cache_version:
+                # 버전과 행을 한 읽기 트랜잭션에서 읽어서 둘이 어긋나지 않게 합니다.
+                self._conn.execute("BEGIN")
+                try:
+                    version = self._read_version()
+                    result: Dict[str, Dict[str, str]] = {}
+                    for card_id, res_id, url in self._conn.execute("SELECT card_id, res_id, url FROM resource_urls"):
+                        result.setdefault(card_id, {})[res_id] = url
+                finally:
+                    self._conn.execute("COMMIT")
+                self._cache = result
+                self._cache_version = version
+            return self._cache_version, copy.deepcopy(self._cache)
+
+    def get_all(self) -> Dict[str, Dict[str, str]]:
+        """{card_id: {res_id: url}} 전체."""
+        return self.snapshot()[1]
+
+    def get(self, card_id: str, res_id: str) -> str:
+        return self.get_all().get(card_id, {}).get(res_id, "")
+
+    # --- 쓰기 ---
+    @contextmanager
+    def _writing(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 트랜잭션. 끝날 때 같은 트랜잭션에서 버전을 올립니다."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'version'")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def upsert(self, card_id: str, res_id: str, url: str) -> None:
+        """URL 하나를 저장합니다. (행 하나 쓰기)"""
+        with self._writing() as conn:
+            conn.execute(_UPSERT_SQL, (card_id, res_id, url, time.time()))
+
+    def upsert_many(self, rows: Dict[str, Dict[str, str]]) -> int:
+        """여러 URL을 한 트랜잭션으로 저장합니다. 저장한 행 수를 돌려줍니다."""
+        now = time.time()
+        params = [(c, r, u, now) for c, res in rows.items() for r, u in res.items()]
+        if not params:
+            return 0
+        with self._writing() as conn:
+            conn.executemany(_UPSERT_SQL, params)
+        return len(params)
+
+    def delete(self, card_id: str, res_id: str) -> None:
+        with self._writing() as conn:
+            conn.execute("DELETE FROM resource_urls WHERE card_id = ? AND res_id = ?", (card_id, res_id))
+
+    def clear(self) -> None:
+        with self._writing() as conn:
+            conn.execute("DELETE FROM resource_urls")
+
+    # --- config.json 가져오기/내보내기 ---
+    def import_json(self, path: Path) -> int:
+        return self.upsert_many(read_config_json(path))
+
+    def export_json(self, path: Path) -> None:
+        write_config_json(path, self.get_all())
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def diff_resource_urls(
+    saved: Dict[str, Dict[str, str]], current: Dict[str, Dict[str, str]]
+) -> Dict[str, Dict[str, str]]:
+    """current 중에서 saved와 값이 다른 항목만 골라냅니다."""
+    changed: Dict[str, Dict[str, str]] = {}
+    for card_id, res in current.items():
+        old = saved.get(card_id, {})
+        for res_id, url in res.items():
+            if old.get(res_id) != url:
+                changed.setdefault(card_id, {})[res_id] = url
+    return changed
+
+
+def merge_resource_urls(
+    base: Dict[str, Dict[str, str]], current: Dict[str, Dict[str, str]], latest: Dict[str, Dict[str, str]]
+) -> Tuple[Dict[str, Dict[str, str]], Dict[str, Dict[str, str]]]:
+    """
+    세션이 마지막으로 맞춘 저장값(base) 이후에 저장소가 latest 로 바뀌었을 때, 세션 값(current)을 맞춥니다.
+    세션에서 고치고 아직 저장하지 않은 항목(current != base)은 그대로 둡니다.
+    (합친 값, 바뀐 항목 {card_id: {res_id: 새 URL 또는 ""}})을 돌려줍니다. ""는 저장값이 지워졌다는 뜻입니다.
+    """
+    merged = {card_id: dict(res) for card_id, res in current.items()}
+    changed: Dict[str, Dict[str, str]] = {}
+    for card_id in base.keys() | latest.keys():
+        old, new = base.get(card_id, {}), latest.get(card_id, {})
+        for res_id in old.keys() | new.keys():
+            if old.get(res_id) == new.get(res_id):
+                continue
+            if current.get(card_id, {}).get(res_id) != old.get(res_id):
+                continue  # 세션에서 고친 값이 우선
+            if res_id in new:
+                merged.setdefault(card_id, {})[res_id] = new[res_id]
+            else:
+                merged.get(card_id, {}).pop(res_id, None)
+            changed.setdefault(card_id, {})[res_id] = new.get(res_id, "")
+    return merged, changed
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="자료 URL 저장소 가져오기/내보내기")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("json_path", type=Path, help="config.json 형식 파일")
+    parser.add_argument("--db", type=Path, default=STORE_PATH, help="SQLite 저장소 경로")
+    args = parser.parse_args(argv)
+
+    store = ResourceUrlStore(args.db)
+    try:
+        if args.command == "import":
+            print(f"{store.import_json(args.json_path)}개 URL을 가져왔습니다.")
+        else:
+            store.export_json(args.json_path)
+            print(f"{args.json_path} 로 내보냈습니다.")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
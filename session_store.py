@@ -0,0 +1,230 @@
+"""
+학생 세션 이어 하기 (새로 고침/서버 재시작 후에도 답, 지금 카드, 체크리스트 유지)
+
+- 세션마다 짧은 이어 하기 토큰("<반 조각>.<난수>")을 주소(?s=...)에 붙입니다.
+- 수업 코드별로 SQLite 파일(.cache/sessions/<반 조각>.db)을 따로 씁니다. 토큰에 조각 이름이 들어 있어서
+  복원은 그 파일에서 (토큰) 기본 키 범위 읽기 한 번으로 끝납니다.
+- 값이 바뀐 키만 (토큰, 키) 행으로 씁니다. 빈 값(빈 답, 꺼진 체크, 0번 카드)으로 돌아간 키는 행을 지웁니다.
+- save()는 메모리에 모아 두기만 하고 바로 돌아옵니다. 백그라운드 스레드가 FLUSH_INTERVAL 마다
+  같은 (토큰, 키)의 마지막 값만 조각별 한 트랜잭션으로 씁니다.
+- SESSION_TTL 동안 바뀌지 않은 세션은 쓰기 스레드가 가끔 지웁니다.
+"""
+from typing import Any, Dict, Optional, Tuple
+from pathlib import Path
+import atexit
+import hashlib
+import json
+import logging
+import re
+import secrets
+import sqlite3
+import threading
+import time
+
+from resource_store import connect
+
+_LOGGER = logging.getLogger(__name__)
+
+SESSION_DIR = Path(".cache") / "sessions"
+COMMON_SHARD = "common"  # 수업 코드 없이 쓰는 세션
+FLUSH_INTERVAL = 1.0  # 초
+SESSION_TTL = 14 * 24 * 3600  # 초
+PURGE_INTERVAL = 3600  # 초
+MAX_VALUE_CHARS = 4000  # 답 하나에 저장하는 최대 글자 수
+
+_TOKEN_RE = re.compile(r"^([0-9a-f]{8}|common)\.([a-z2-7]{10})$")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS session_values (
+        token   TEXT NOT NULL,
+        key     TEXT NOT NULL,
+        value   TEXT NOT NULL,
+        updated REAL NOT NULL,
+        PRIMARY KEY (token, key)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS session_values_updated ON session_values (updated)",
+)
+
+# (토큰, 키) → 값. None 이면 그 키를 지웁니다.
+Pending = Dict[Tuple[str, str], Optional[str]]
+
+
+def class_shard(class_code: str) -> str:
+    """수업 코드 → 조각 이름. 코드가 없으면 공용 조각."""
+    code = class_code.strip()
+    if not code:
+        return COMMON_SHARD
+    return hashlib.sha1(code.encode("utf-8")).hexdigest()[:8]
+
+
+def new_token(class_code: str = "") -> str:
+    alphabet = "abcdefghijklmnopqrstuvwxyz234567"
+    return f"{class_shard(class_code)}.{''.join(secrets.choice(alphabet) for _ in range(10))}"
+
+
+def token_shard(token: str) -> Optional[str]:
+    """토큰의 조각 이름. 형식이 틀리면 None."""
+    m = _TOKEN_RE.match(token or "")
+    return m.group(1) if m else None
+
+
+def is_empty(value: Any) -> bool:
+    """저장하지 않는 기본값 (빈 답, 꺼진 체크, 0번 카드)."""
+    return value is None or value is False or value == "" or (type(value) is int and value == 0)
+
+
+def changed_values(last: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    last 이후 바뀐 키만. current 에 없는 키는 지우지 않습니다.
+    (Streamlit은 지금 화면에 없는 카드의 입력 칸 상태를 치우므로, 없어졌다고 지운 것은 아닙니다)
+    """
+    return {k: v for k, v in current.items() if last.get(k) != v}
+
+
+class SessionStore:
+    def __init__(self, root: Path = SESSION_DIR, flush_interval: float = FLUSH_INTERVAL, ttl: float = SESSION_TTL):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self._conns: Dict[str, sqlite3.Connection] = {}
+        self._conn_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # 연결을 쓰는 모든 곳 (쓰기 스레드, flush(), load())
+        self._pending: Dict[str, Pending] = {}  # 조각 → 쓸 값
+        self._wake = threading.Event()
+        self._stopping = False
+        self._last_purge = 0.0
+        self._writer = threading.Thread(target=self._run, name="session-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _conn(self, shard: str) -> sqlite3.Connection:
+        with self._conn_lock:
+            conn = self._conns.get(shard)
+            if conn is None:
+                conn = connect(self.root / f"{shard}.db")
+                for stmt in _SCHEMA:
+                    conn.execute(stmt)
+                self._conns[shard] = conn
+            return conn
+
+    # --- 화면 스레드 ---
+    def load(self, token: str) -> Dict[str, Any]:
+        """토큰의 저장값 전체. 아직 쓰지 않은 값도 합쳐서 돌려줍니다. (토큰이 틀리면 빈 dict)"""
+        shard = token_shard(token)
+        if shard is None:
+            return {}
+        path = self.root / f"{shard}.db"
+        values: Dict[str, Any] = {}
+        # 쓰기 스레드와 같은 연결을 쓰므로 쓰기 잠금 안에서 읽습니다. 잠금을 잡는 동안은 쓰기 묶음이
+        # 한창일 수 없어서, 디스크에서 읽은 값과 아직 쓰지 않은 값 사이에 빠지는 것이 없습니다.
+        with self._write_lock:
+            if path.exists():
+                rows = self._conn(shard).execute("SELECT key, value FROM session_values WHERE token = ?", (token,)).fetchall()
+                values = {key: json.loads(value) for key, value in rows}
+            with self._lock:
+                for (tok, key), value in self._pending.get(shard, {}).items():
+                    if tok != token:
+                        continue
+                    if not key:
+                        values.clear()
+                    elif value is None:
+                        values.pop(key, None)
+                    else:
+                        values[key] = json.loads(value)
+        return values
+
+    def save(self, token: str, delta: Dict[str, Any]) -> None:
+        """바뀐 값만 모아 둡니다. 디스크 쓰기를 기다리지 않습니다."""
+        shard = token_shard(token)
+        if shard is None or not delta:
+            return
+        encoded: Pending = {}
+        for key, value in delta.items():
+            if isinstance(value, str):
+                value = value[:MAX_VALUE_CHARS]
+            encoded[(token, key)] = None if is_empty(value) else json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._pending.setdefault(shard, {}).update(encoded)
+
+    def forget(self, token: str) -> None:
+        """토큰의 값을 모두 지웁니다. (다른 반 조각으로 옮길 때)"""
+        shard = token_shard(token)
+        if shard is None:
+            return
+        with self._lock:
+            pending = self._pending.get(shard, {})
+            for k in [k for k in pending if k[0] == token]:
+                del pending[k]
+            pending[(token, "")] = None  # 키 "" 는 토큰 전체 지우기 표시
+        self._wake.set()
+
+    # --- 백그라운드 쓰기 ---
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush_pending()
+            if time.time() - self._last_purge > PURGE_INTERVAL:
+                self._purge()
+
+    def _flush_pending(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for shard, values in pending.items():
+                try:
+                    self._write(shard, values)
+                except sqlite3.Error as e:
+                    _LOGGER.warning("세션 값 %d개를 쓰지 못했습니다 (%s): %s", len(values), shard, e)
+
+    def _write(self, shard: str, values: Pending) -> None:
+        now = time.time()
+        upserts = [(tok, key, value, now) for (tok, key), value in values.items() if value is not None]
+        deletes = [(tok, key) for (tok, key), value in values.items() if value is None and key]
+        forgets = [(tok,) for (tok, key), value in values.items() if value is None and not key]
+        conn = self._conn(shard)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM session_values WHERE token = ?", forgets)
+            conn.executemany("DELETE FROM session_values WHERE token = ? AND key = ?", deletes)
+            conn.executemany(
+                "INSERT INTO session_values (token, key, value, updated) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (token, key) DO UPDATE SET value = excluded.value, updated = excluded.updated",
+                upserts,
+            )
+            # 한 키만 바뀌어도 그 세션 전체가 만료되지 않도록 시각을 함께 올립니다.
+            conn.executemany("UPDATE session_values SET updated = ? WHERE token = ?", [(now, t) for t in {u[0] for u in upserts}])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _purge(self) -> None:
+        self._last_purge = time.time()
+        cutoff = self._last_purge - self.ttl
+        with self._write_lock:
+            for path in self.root.glob("*.db"):
+                try:
+                    self._conn(path.stem).execute("DELETE FROM session_values WHERE updated < ?", (cutoff,))
+                except sqlite3.Error as e:
+                    _LOGGER.warning("오래된 세션을 지우지 못했습니다 (%s): %s", path.name, e)
+
+    def flush(self) -> None:
+        """모아 둔 값을 바로 씁니다. (테스트/종료용)"""
+        self._flush_pending()
+
+    def close(self) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._writer.join(timeout=5)
+        self._flush_pending()
+        with self._write_lock, self._conn_lock:
+            for conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
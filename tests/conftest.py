@@ -0,0 +1,44 @@
+"""
+테스트 공용: 저장소 루트를 import 경로에 넣고, 로컬 스텁 HTTP 서버를 띄웁니다.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def stub_server():
+    """
+    stub_server(handler) → (기본 URL, 받은 요청 목록)
+    handler(request) 는 BaseHTTPRequestHandler 를 받아 응답을 씁니다.
+    """
+    servers = []
+
+    def start(handle):
+        seen = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def _dispatch(self):
+                seen.append((self.command, self.path, dict(self.headers)))
+                handle(self)
+
+            do_GET = do_POST = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}", seen
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
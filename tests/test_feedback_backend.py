@@ -0,0 +1,86 @@
+import json
+import time
+
+import pytest
+
+from feedback_backend import FIRST_TOKEN_TIMEOUT, SOURCE_CACHE, SOURCE_LLM, SOURCE_RULES, LLMFeedbackBackend, RuleFeedbackBackend
+from lesson_engine import get_card_registry
+
+ANSWER = "거리가 가까워져서 여름이 더워요"
+
+
+def _sse(chunks, delay=0.0, stall=0.0):
+    """streamGenerateContent(SSE) 흉내. stall 초 동안 첫 조각을 보내지 않습니다."""
+
+    def handle(req):
+        req.rfile.read(int(req.headers.get("Content-Length", 0)))
+        req.send_response(200)
+        req.send_header("Content-Type", "text/event-stream")
+        req.end_headers()
+        req.wfile.flush()
+        time.sleep(stall)
+        for chunk in chunks:
+            time.sleep(delay)
+            payload = chunk if isinstance(chunk, str) else json.dumps(
+                {"candidates": [{"content": {"parts": [{"text": chunk[0]}], "role": "model"}}]}, ensure_ascii=False,
+            )
+            req.wfile.write(f"data: {payload}\r\n\r\n".encode("utf-8"))
+            req.wfile.flush()
+
+    return handle
+
+
+@pytest.fixture
+def card():
+    return get_card_registry()[0]
+
+
+def _drain(backend, answer, card):
+    started = time.monotonic()
+    drafts = list(backend.stream(answer, card))
+    return drafts, time.monotonic() - started
+
+
+def test_streams_then_serves_repeat_from_cache(stub_server, card):
+    base, seen = stub_server(_sse([("좋은 생각이에요. ",), ("자전축을 떠올려 봐요.",)], delay=0.05))
+    backend = LLMFeedbackBackend(api_key="test", base_url=base)
+    try:
+        drafts, _ = _drain(backend, ANSWER, card)
+        assert [d.source for d in drafts] == [SOURCE_LLM] * len(drafts)
+        assert drafts[-1].done and drafts[-1].text == "좋은 생각이에요. 자전축을 떠올려 봐요."
+        assert any(not d.done for d in drafts)  # 끝나기 전에 중간 본문이 나옴
+
+        # 띄어쓰기/끝 문장부호만 다른 같은 답은 네트워크 없이 캐시에서
+        repeat, _ = _drain(backend, "  거리가 가까워져서  여름이 더워요!", card)
+        assert [d.source for d in repeat] == [SOURCE_CACHE]
+        assert repeat[0].text == drafts[-1].text
+        assert len(seen) == 1
+        assert len(backend.cache) == 1
+    finally:
+        backend.close()
+
+
+def test_stalled_stream_falls_back_to_rules(stub_server, card):
+    base, _ = stub_server(_sse([("늦은 답",)], stall=FIRST_TOKEN_TIMEOUT + 3))
+    backend = LLMFeedbackBackend(api_key="test", base_url=base)
+    try:
+        drafts, elapsed = _drain(backend, ANSWER, card)
+        expected = list(RuleFeedbackBackend().stream(ANSWER, card))[-1].text
+        assert drafts[-1].source == SOURCE_RULES
+        assert drafts[-1].text == expected
+        assert elapsed < FIRST_TOKEN_TIMEOUT + 0.5
+    finally:
+        backend.close()
+
+
+def test_unexpected_payload_finishes_generation(stub_server, card):
+    base, _ = stub_server(_sse(["[1, 2, 3]"]))
+    backend = LLMFeedbackBackend(api_key="test", base_url=base)
+    try:
+        drafts, elapsed = _drain(backend, ANSWER, card)
+        assert drafts[-1].source == SOURCE_RULES
+        assert elapsed < FIRST_TOKEN_TIMEOUT
+        assert backend.pending() == 0
+        assert len(backend.cache) == 0
+    finally:
+        backend.close()
@@ -0,0 +1,122 @@
+import io
+
+from PIL import Image
+
+from image_cache import ImageCache, url_key
+
+
+def _png(width: int, color=(10, 120, 200)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (width, width), color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _image_handler(bodies):
+    """경로별 본문을 ETag와 함께 돌려주고, If-None-Match 가 같으면 304."""
+
+    def handle(req):
+        body = bodies[req.path]
+        etag = f'"{len(body)}"'
+        if req.headers.get("If-None-Match") == etag:
+            req.send_response(304)
+            req.send_header("ETag", etag)
+            req.end_headers()
+            return
+        req.send_response(200)
+        req.send_header("Content-Type", "image/png")
+        req.send_header("Content-Length", str(len(body)))
+        req.send_header("ETag", etag)
+        req.end_headers()
+        req.wfile.write(body)
+
+    return handle
+
+
+def test_304_keeps_cached_bytes(tmp_path, stub_server):
+    original = _png(64)
+    bodies = {"/a.png": original}
+    base, seen = stub_server(_image_handler(bodies))
+    cache = ImageCache(tmp_path, revalidate_after=0)
+
+    first = cache.fetch(base + "/a.png")
+    # 서버 쪽 본문이 바뀌었더라도 ETag가 같으면(304) 받아 둔 바이트를 그대로 씁니다.
+    bodies["/a.png"] = b"x" * len(original)
+    second = cache.fetch(base + "/a.png")
+
+    assert first.data == second.data == original
+    assert second.content_type == "image/png"
+    assert len(seen) == 2
+    assert seen[1][2].get("If-None-Match") == f'"{len(original)}"'
+
+
+def test_fresh_entry_skips_network(tmp_path, stub_server):
+    base, seen = stub_server(_image_handler({"/a.png": _png(32)}))
+    cache = ImageCache(tmp_path)
+    cache.fetch(base + "/a.png")
+    cache.fetch(base + "/a.png")
+    assert len(seen) == 1
+
+
+def test_eviction_respects_byte_cap(tmp_path, stub_server):
+    bodies = {f"/{i}.png": _png(40 + i, (i * 20, 0, 0)) for i in range(6)}
+    base, _ = stub_server(_image_handler(bodies))
+    # 원본 + 메타 파일 두 벌 정도만 들어갈 만큼
+    cap = 2 * (max(len(b) for b in bodies.values()) + 300)
+    cache = ImageCache(tmp_path, max_bytes=cap)
+
+    for i in range(6):
+        cache.fetch(f"{base}/{i}.png")
+        assert cache.total_bytes() <= cap
+
+    on_disk = sum(p.stat().st_size for p in tmp_path.rglob("*") if p.is_file())
+    assert on_disk == cache.total_bytes() <= cap
+    # 가장 최근 항목은 남고, 가장 오래된 항목은 지워졌습니다.
+    newest, _ = cache._paths(url_key(f"{base}/5.png"))
+    oldest, _ = cache._paths(url_key(f"{base}/0.png"))
+    assert newest.exists()
+    assert not oldest.exists()
+
+
+def test_thumbnail_of_non_image_is_none(tmp_path, stub_server):
+    def handle(req):
+        body = b"<svg xmlns='http://www.w3.org/2000/svg'/>"
+        req.send_response(200)
+        req.send_header("Content-Type", "image/svg+xml")
+        req.send_header("Content-Length", str(len(body)))
+        req.end_headers()
+        req.wfile.write(body)
+
+    base, _ = stub_server(handle)
+    assert ImageCache(tmp_path).thumbnail(base + "/a.svg") is None
+
+
+def test_cached_thumbnail_skips_original(tmp_path, stub_server):
+    base, seen = stub_server(_image_handler({"/a.png": _png(64)}))
+    cache = ImageCache(tmp_path)
+    first = cache.thumbnail(base + "/a.png", width=32)
+
+    # 썸네일이 있으면 원본은 읽지 않습니다. (원본 파일이 없어도 그대로 돌려줌)
+    data_path, _ = cache._paths(url_key(base + "/a.png"))
+    data_path.unlink()
+    assert cache.thumbnail(base + "/a.png", width=32) == first
+    assert len(seen) == 1
+
+
+def test_file_removed_after_check_is_a_miss(tmp_path, stub_server, monkeypatch):
+    original = _png(48)
+    base, seen = stub_server(_image_handler({"/a.png": original}))
+    cache = ImageCache(tmp_path)
+    cache.fetch(base + "/a.png")
+
+    # exists() 와 read_bytes() 사이에 다른 키의 정리가 파일을 지운 경우
+    data_path, _ = cache._paths(url_key(base + "/a.png"))
+    real_read = cache._read
+
+    def read_after_evict(path):
+        if path == data_path and path.exists():
+            path.unlink()
+        return real_read(path)
+
+    monkeypatch.setattr(cache, "_read", read_after_evict)
+    assert cache.fetch(base + "/a.png").data == original
+    assert len(seen) == 2
@@ -0,0 +1,180 @@
+"""
+자료 URL 해석기
+
+URL을 한 번만 파싱해서 어떤 방식으로 보여 줄지(render 전략)를 담은 결과로 바꿉니다.
+- 처리기(resolver)는 등록 순서대로 시도하고, 처음으로 결과를 돌려준 처리기를 씁니다.
+- 같은 (URL, 자료 종류)는 메모이즈되어 다시 그릴 때는 dict 조회만 합니다.
+"""
+from typing import Callable, List, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from urllib.parse import SplitResult, parse_qs, urlsplit
+import re
+
+# 보여 주는 방식
+STRATEGY_VIDEO = "video"  # st.video
+STRATEGY_IMAGE = "image"  # st.image (이미지 캐시 경유)
+STRATEGY_IFRAME = "iframe"  # components.iframe
+STRATEGY_LINK = "link"  # 링크만 표시
+
+
+@dataclass(frozen=True)
+class ResolvedResource:
+    source_url: str
+    url: str  # 실제로 그릴 때 쓰는 URL (embed 주소 등)
+    strategy: str
+    provider: str = "direct"
+    start: int = 0  # 영상 시작 위치(초)
+
+    @property
+    def is_youtube(self) -> bool:
+        return self.provider == "youtube"
+
+
+Resolver = Callable[[str, SplitResult, str], Optional[ResolvedResource]]
+_RESOLVERS: List[Resolver] = []
+
+
+def register_resolver(fn: Resolver) -> Resolver:
+    """처리기를 등록합니다. (데코레이터로 사용) 새 처리기를 등록하면 메모이즈 결과를 비웁니다."""
+    _RESOLVERS.append(fn)
+    resolve_url.cache_clear()
+    return fn
+
+
+@lru_cache(maxsize=4096)
+def resolve_url(url: str, declared_type: str = "") -> ResolvedResource:
+    """
+    URL 하나를 해석합니다.
+    declared_type: 카드에 적힌 자료 종류("image"/"video"/...). 확장자로 알 수 없을 때 사용합니다.
+    """
+    u = (url or "").strip()
+    parts = urlsplit(u)
+    declared_type = (declared_type or "").lower()
+    for resolver in _RESOLVERS:
+        result = resolver(u, parts, declared_type)
+        if result is not None:
+            return result
+    return ResolvedResource(u, u, STRATEGY_LINK)
+
+
+# -----------------------------
+# 시간 표기 (t=90, t=1m30s, start=90)
+# -----------------------------
+_TIME_RE = re.compile(r"^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s?)?$")
+
+
+def parse_start_time(value: str) -> int:
+    m = _TIME_RE.match((value or "").strip().lower())
+    if not m or not any(m.groups()):
+        return 0
+    h, mnt, sec = (int(g) if g else 0 for g in m.groups())
+    return h * 3600 + mnt * 60 + sec
+
+
+# -----------------------------
+# YouTube
+# -----------------------------
+_YT_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com", "www.youtube-nocookie.com"}
+_YT_ID_RE = re.compile(r"^[A-Za-z0-9_-]{6,}$")
+_YT_PATH_RE = re.compile(r"^/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{6,})")
+
+
+@register_resolver
+def _resolve_youtube(url: str, parts: SplitResult, declared_type: str) -> Optional[ResolvedResource]:
+    host = parts.netloc.lower()
+    if host not in _YT_HOSTS and host != "youtu.be":
+        return None
+
+    query = parse_qs(parts.query)
+    start = parse_start_time((query.get("t") or query.get("start") or [""])[0])
+    if not start and parts.fragment.startswith("t="):
+        start = parse_start_time(parts.fragment[2:])
+
+    video_id = ""
+    if host == "youtu.be":
+        candidate = parts.path.lstrip("/").split("/")[0]
+        video_id = candidate if _YT_ID_RE.match(candidate) else ""
+    else:
+        m = _YT_PATH_RE.match(parts.path)
+        if m:
+            video_id = m.group(1)
+        elif parts.path == "/watch":
+            candidate = (query.get("v") or [""])[0]
+            video_id = candidate if _YT_ID_RE.match(candidate) else ""
+
+    playlist = (query.get("list") or [""])[0]
+    if not video_id and playlist:
+        # st.video는 재생목록을 재생하지 못하므로 embed 재생목록을 iframe으로 보여 줍니다.
+        embed = f"https://www.youtube.com/embed/videoseries?list={playlist}"
+        return ResolvedResource(url, embed, STRATEGY_IFRAME, "youtube", start)
+    if not video_id:
+        return ResolvedResource(url, url, STRATEGY_LINK, "youtube")
+    return ResolvedResource(url, f"https://www.youtube.com/embed/{video_id}", STRATEGY_VIDEO, "youtube", start)
+
+
+# -----------------------------
+# Google Drive / Slides
+# -----------------------------
+_DRIVE_FILE_RE = re.compile(r"^/file/d/([A-Za-z0-9_-]+)")
+_SLIDES_RE = re.compile(r"^/presentation/d/([A-Za-z0-9_-]+)")
+
+
+@register_resolver
+def _resolve_google(url: str, parts: SplitResult, declared_type: str) -> Optional[ResolvedResource]:
+    host = parts.netloc.lower()
+    if host == "drive.google.com":
+        m = _DRIVE_FILE_RE.match(parts.path)
+        file_id = m.group(1) if m else (parse_qs(parts.query).get("id") or [""])[0]
+        if not file_id:
+            return ResolvedResource(url, url, STRATEGY_LINK, "google_drive")
+        if declared_type == "image":
+            return ResolvedResource(url, f"https://drive.google.com/uc?export=view&id={file_id}", STRATEGY_IMAGE, "google_drive")
+        return ResolvedResource(url, f"https://drive.google.com/file/d/{file_id}/preview", STRATEGY_IFRAME, "google_drive")
+    if host == "docs.google.com":
+        m = _SLIDES_RE.match(parts.path)
+        if m:
+            return ResolvedResource(url, f"https://docs.google.com/presentation/d/{m.group(1)}/embed", STRATEGY_IFRAME, "google_slides")
+    return None
+
+
+# -----------------------------
+# Vimeo
+# -----------------------------
+_VIMEO_RE = re.compile(r"^/(?:video/)?(\d+)")
+
+
+@register_resolver
+def _resolve_vimeo(url: str, parts: SplitResult, declared_type: str) -> Optional[ResolvedResource]:
+    host = parts.netloc.lower()
+    if host not in {"vimeo.com", "www.vimeo.com", "player.vimeo.com"}:
+        return None
+    m = _VIMEO_RE.match(parts.path)
+    if not m:
+        return ResolvedResource(url, url, STRATEGY_LINK, "vimeo")
+    start = parse_start_time(parts.fragment[2:]) if parts.fragment.startswith("t=") else 0
+    embed = f"https://player.vimeo.com/video/{m.group(1)}"
+    if start:
+        embed += f"#t={start}s"
+    return ResolvedResource(url, embed, STRATEGY_IFRAME, "vimeo", start)
+
+
+# -----------------------------
+# 직접 링크 (확장자 → 자료 종류)
+# -----------------------------
+_IMAGE_EXT = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".bmp", ".avif")
+_VIDEO_EXT = (".mp4", ".webm", ".ogv", ".ogg", ".mov", ".m4v")
+
+
+@register_resolver
+def _resolve_direct(url: str, parts: SplitResult, declared_type: str) -> Optional[ResolvedResource]:
+    if parts.scheme.lower() not in {"http", "https"}:
+        return None
+    path = parts.path.lower()
+    if path.endswith(_VIDEO_EXT):
+        return ResolvedResource(url, url, STRATEGY_VIDEO)
+    if path.endswith(_IMAGE_EXT):
+        return ResolvedResource(url, url, STRATEGY_IMAGE)
+    if declared_type in (STRATEGY_IMAGE, STRATEGY_VIDEO):
+        return ResolvedResource(url, url, declared_type)
+    return ResolvedResource(url, url, STRATEGY_LINK)